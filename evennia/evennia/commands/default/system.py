@@ -15,6 +15,7 @@ from time import time as timemeasure
 
 from django.conf import settings
 from evennia.server.sessionhandler import SESSIONS
+from evennia.server.amp import get_codec_stats
 from evennia.scripts.models import ScriptDB
 from evennia.objects.models import ObjectDB
 from evennia.players.models import PlayerDB
@@ -643,6 +644,10 @@ class CmdServerLoad(COMMAND_DEFAULT_CLASS):
     non-persistent storage schemes. The total amount of cached objects
     are displayed plus a breakdown of database object types.
 
+    {wAMP messages{n are counted by message type. Only messages of at
+    least settings.AMP_COMPRESS_THRESHOLD bytes are compressed, others
+    are sent as they are.
+
     The {wflushmem{n switch allows to flush the object cache. Please
     note that due to how Python's memory management works, releasing
     caches may not show you a lower Residual/Virtual memory footprint,
@@ -752,6 +757,16 @@ class CmdServerLoad(COMMAND_DEFAULT_CLASS):
 
         string += "\n{w Entity idmapper cache:{n %i items\n%s" % (total_num, memtable)
 
+        # AMP wire codec statistics of the server process
+        codec_stats = get_codec_stats()
+        if codec_stats:
+            codectable = EvTable("message type", "sent", "compressed", "sent bytes",
+                                 "wire bytes", "received", "received bytes", align="l")
+            for key, stats in sorted(codec_stats.items()):
+                codectable.add_row(key, stats["sent"], stats["compressed"], stats["sent_bytes"],
+                                   stats["wire_bytes"], stats["received"], stats["received_bytes"])
+            string += "\n{w AMP messages:{n\n%s" % codectable
+
         # return to caller
         self.caller.msg(string)
 
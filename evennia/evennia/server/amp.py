@@ -30,6 +30,7 @@ except ImportError:
 from twisted.protocols import amp
 from twisted.internet import protocol
 from twisted.internet.defer import Deferred
+from django.conf import settings
 from evennia.utils import logger
 from evennia.utils.utils import to_str, variable_from_module
 
@@ -62,6 +63,41 @@ _MSGBUFFER = defaultdict(list)
 
 import zlib
 
+# Version of the wire format. The Portal tells the Server its version with
+# PSYNC and the Server answers with its own. Until a side knows the other's
+# version it sends the original format, version 0.
+#  0 - pickled payloads only
+#  1 - large payloads may be compressed with zlib, MsgBatchServer2Portal
+AMP_PROTOCOL_VERSION = 1
+
+# wire codec. Payloads are pickled with protocol 2, so they start with the
+# PROTO opcode "\x80", while zlib streams start with "\x78". No extra byte
+# is needed to tell them apart.
+_ZLIB_HEADER = "\x78"
+_COMPRESS_THRESHOLD = settings.AMP_COMPRESS_THRESHOLD
+_COMPRESS_LEVEL = settings.AMP_COMPRESS_LEVEL
+
+# codec statistics, message type -> counters
+_CODEC_STATS = defaultdict(lambda: {"sent": 0,
+                                    "sent_bytes": 0,
+                                    "wire_bytes": 0,
+                                    "compressed": 0,
+                                    "received": 0,
+                                    "received_bytes": 0})
+
+
+def get_codec_stats():
+    """
+    Get statistics of the AMP wire codec in this process.
+
+    Returns:
+        stats (dict): Message type -> counters of sent and received
+            messages, payload bytes and bytes on the wire.
+
+    """
+    return dict((key, dict(value)) for key, value in _CODEC_STATS.items())
+
+
 def get_restart_mode(restart_file):
     """
     Parse the server/portal restart status
@@ -208,8 +244,21 @@ class Compressed(amp.String):
     batch-grouping of too-long sends is borrowed from the "mediumbox"
     recipy at twisted-hacks's ~glyph/+junk/amphacks/mediumbox.
 
+    Payloads shorter than settings.AMP_COMPRESS_THRESHOLD are sent
+    as is. Longer ones are compressed if the other side supports it.
+
     """
 
+    def __init__(self, key="", optional=False):
+        """
+        Args:
+            key (str, optional): Message type, used in codec statistics.
+            optional (bool, optional): If the argument can be omitted.
+
+        """
+        amp.String.__init__(self, optional=optional)
+        self.key = key
+
     def fromBox(self, name, strings, objects, proto):
         """
         Converts from box representation to python. We
@@ -223,14 +272,15 @@ class Compressed(amp.String):
             if chunk is None:
                 break
             value.write(chunk)
-        objects[name] = value.getvalue()
+        objects[name] = self.fromString(value.getvalue())
 
     def toBox(self, name, strings, objects, proto):
         """
         Convert from data to box. We handled too-long
         batched data and put it together here.
         """
-        value = StringIO(objects[name])
+        compress = getattr(proto, "peer_version", 0) >= AMP_PROTOCOL_VERSION
+        value = StringIO(self.toString(objects[name], compress))
         strings[name] = value.read(AMP_MAXLEN)
         for counter in count(2):
             chunk = value.read(AMP_MAXLEN)
@@ -238,17 +288,41 @@ class Compressed(amp.String):
                 break
             strings["%s.%d" % (name, counter)] = chunk
 
-    def toString(self, inObject):
+    def toString(self, inObject, compress=True):
         """
-        Convert to send on the wire, with compression.
+        Convert to send on the wire, with compression if the data
+        is long enough.
+
+        Args:
+            inObject (str): Pickled data.
+            compress (bool, optional): If the data can be compressed.
+
         """
-        return zlib.compress(inObject, 9)
+        stats = _CODEC_STATS[self.key]
+        stats["sent"] += 1
+        stats["sent_bytes"] += len(inObject)
+
+        outString = inObject
+        if compress and _COMPRESS_THRESHOLD is not None and len(inObject) >= _COMPRESS_THRESHOLD:
+            compressed = zlib.compress(inObject, _COMPRESS_LEVEL)
+            if len(compressed) < len(inObject):
+                outString = compressed
+                stats["compressed"] += 1
+
+        stats["wire_bytes"] += len(outString)
+        return outString
 
     def fromString(self, inString):
         """
         Convert (decompress) from the wire to Python.
         """
-        return zlib.decompress(inString)
+        stats = _CODEC_STATS[self.key]
+        stats["received"] += 1
+        stats["received_bytes"] += len(inString)
+
+        if inString[:1] == _ZLIB_HEADER:
+            return zlib.decompress(inString)
+        return inString
 
 
 class MsgPortal2Server(amp.Command):
@@ -257,7 +331,7 @@ class MsgPortal2Server(amp.Command):
 
     """
     key = "MsgPortal2Server"
-    arguments = [('packed_data', Compressed())]
+    arguments = [('packed_data', Compressed("MsgPortal2Server"))]
     errors = {Exception: 'EXCEPTION'}
     response = []
 
@@ -268,7 +342,21 @@ class MsgServer2Portal(amp.Command):
 
     """
     key = "MsgServer2Portal"
-    arguments = [('packed_data', Compressed())]
+    arguments = [('packed_data', Compressed("MsgServer2Portal"))]
+    errors = {Exception: 'EXCEPTION'}
+    response = []
+
+
+class MsgBatchServer2Portal(amp.Command):
+    """
+    Batched messages Server -> Portal
+
+    Messages to many sessions, collected by the Server during one
+    reactor iteration, sent in one frame.
+
+    """
+    key = "MsgBatchServer2Portal"
+    arguments = [('packed_data', Compressed("MsgBatchServer2Portal"))]
     errors = {Exception: 'EXCEPTION'}
     response = []
 
@@ -282,9 +370,10 @@ class AdminPortal2Server(amp.Command):
 
     """
     key = "AdminPortal2Server"
-    arguments = [('packed_data', Compressed())]
+    arguments = [('packed_data', Compressed("AdminPortal2Server"))]
     errors = {Exception: 'EXCEPTION'}
-    response = []
+    # the Server's wire format version, answered to PSYNC
+    response = [('amp_version', amp.Integer(optional=True))]
 
 
 class AdminServer2Portal(amp.Command):
@@ -296,7 +385,7 @@ class AdminServer2Portal(amp.Command):
 
     """
     key = "AdminServer2Portal"
-    arguments = [('packed_data', Compressed())]
+    arguments = [('packed_data', Compressed("AdminServer2Portal"))]
     errors = {Exception: 'EXCEPTION'}
     response = []
 
@@ -353,6 +442,9 @@ class AMPProtocol(amp.AMP):
         self.send_mode = True
         self.send_task = None
 
+        # wire format version of the other side
+        self.peer_version = 0
+
     def connectionMade(self):
         """
         This is called when an AMP connection is (re-)established
@@ -366,14 +458,29 @@ class AMPProtocol(amp.AMP):
         if hasattr(self.factory, "portal"):
             # only the portal has the 'portal' property, so we know we are
             # on the portal side and can initialize the connection.
+            # The Server answers with its wire format version.
             sessdata = self.factory.portal.sessions.get_all_sync_data()
             self.send_AdminPortal2Server(DUMMYSESSION,
                                          PSYNC,
-                                         sessiondata=sessdata)
+                                         sessiondata=sessdata,
+                                         amp_version=AMP_PROTOCOL_VERSION
+                                         ).addCallback(self.set_peer_version)
             self.factory.portal.sessions.at_server_connection()
             if hasattr(self.factory, "server_restart_mode"):
                 del self.factory.server_restart_mode
 
+    def set_peer_version(self, response):
+        """
+        Called on the Portal with the Server's answer to PSYNC.
+
+        Args:
+            response (dict): The answer, a Server started before an
+                upgrade does not send its version.
+
+        """
+        if response:
+            self.peer_version = response.get("amp_version") or 0
+
     def connectionLost(self, reason):
         """
         We swallow connection errors here. The reason is that during a
@@ -487,6 +594,32 @@ class AMPProtocol(amp.AMP):
         """
         return self.send_data(MsgServer2Portal, session.sessid, **kwargs)
 
+    @MsgBatchServer2Portal.responder
+    def portal_receive_batchserver2portal(self, packed_data):
+        """
+        Receives batched messages arriving to Portal from Server.
+        This method is executed on the Portal.
+
+        Args:
+            packed_data (str): Pickled data {sessid: [kwargs, ...]} coming
+                over the wire.
+        """
+        self.factory.portal.sessions.data_out_batch(loads(packed_data))
+        return {}
+
+    def send_MsgBatchServer2Portal(self, batch):
+        """
+        Access method - executed on the Server for sending batched
+            data to Portal.
+
+        Args:
+            batch (dict): Messages of sessions, {sessid: [kwargs, ...]}.
+
+        """
+        return self.callRemote(MsgBatchServer2Portal,
+                               packed_data=dumps(batch)
+                               ).addErrback(self.errback, MsgBatchServer2Portal.key)
+
     # Server administration from the Portal side
     @AdminPortal2Server.responder
     def server_receive_adminportal2server(self, packed_data):
@@ -525,7 +658,11 @@ class AMPProtocol(amp.AMP):
             # contains a dict {sessid: {arg1:val1,...}}
             # representing the attributes to sync for each
             # session.
+            # A Portal started before an upgrade has no version and
+            # only understands the original wire format.
+            self.peer_version = kwargs.get("amp_version", 0)
             server_sessionhandler.portal_sessions_sync(kwargs.get("sessiondata"))
+            return {"amp_version": AMP_PROTOCOL_VERSION}
         else:
             raise Exception("operation %(op)s not recognized." % {'op': operation})
         return {}
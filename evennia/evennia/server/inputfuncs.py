@@ -183,6 +183,7 @@ def client_options(session, *args, **kwargs):
         inputdebug (bool): Debug input functions
         nomarkup (bool): Strip markup
         raw (bool): Turn off parsing
+        compact (bool): Send messages in compact form, if the session supports it
 
     """
     flags = session.protocol_flags
@@ -193,7 +194,7 @@ def client_options(session, *args, **kwargs):
                            "UTF-8", "SCREENREADER", "ENCODING",
                            "MCCP", "SCREENHEIGHT",
                            "SCREENWIDTH", "INPUTDEBUG",
-                           "RAW", "NOMARKUP"))
+                           "RAW", "NOMARKUP", "COMPACT"))
         session.msg(client_options=options)
         return
 
@@ -244,6 +245,8 @@ def client_options(session, *args, **kwargs):
             flags["NOMARKUP"] = validate_bool(value)
         elif key == "raw":
             flags["RAW"] = validate_bool(value)
+        elif key == "compact":
+            flags["COMPACT"] = validate_bool(value)
         elif key in ('Char 1', 'Char.Skills 1', 'Char.Items 1',
                 'Room 1', 'IRE.Rift 1', 'IRE.Composer 1'):
             # ignore mudlet's default send (aimed at IRE games)
@@ -428,4 +428,19 @@ class PortalSessionHandler(SessionHandler):
                     except Exception:
                         log_trace()
 
+    def data_out_batch(self, batch):
+        """
+        Called by server for relaying messages to many sessions at once.
+
+        Args:
+            batch (dict): Messages of sessions, {sessid: [kwargs, ...]},
+                each kwargs is the same as in data_out.
+
+        """
+        for sessid, messages in batch.iteritems():
+            session = self.get(sessid, None)
+            if session:
+                for kwargs in messages:
+                    self.data_out(session, **kwargs)
+
 PORTAL_SESSIONS = PortalSessionHandler()
@@ -26,6 +26,10 @@ from evennia.utils.text2html import parse_html
 _RE_SCREENREADER_REGEX = re.compile(r"%s" % settings.SCREENREADER_REGEX_STRIP, re.DOTALL + re.MULTILINE)
 _CLIENT_SESSIONS = mod_import(settings.SESSION_ENGINE).SessionStore
 
+# The last structured text and its encoded line. A broadcast relays the
+# same text object to many sessions, so it is only encoded once.
+_LAST_STRUCTURED = [None, None]
+
 
 class WebSocketClient(Protocol, Session):
     """
@@ -186,6 +190,14 @@ class WebSocketClient(Protocol, Session):
         screenreader = options.get("screenreader", flags.get("SCREENREADER", False))
         prompt = options.get("send_prompt", False)
 
+        if options.get("structured", False) and raw and not (screenreader or prompt or kwargs):
+            # structured text is sent as it is
+            if _LAST_STRUCTURED[0] is not text:
+                _LAST_STRUCTURED[0] = text
+                _LAST_STRUCTURED[1] = json.dumps(["text", [text], {}])
+            self.sendLine(_LAST_STRUCTURED[1])
+            return
+
         if screenreader:
             # screenreader mode cleans up output
             text = parse_ansi(text, strip_ansi=True, xterm256=False, mxp=False)
@@ -0,0 +1,115 @@
+"""
+Benchmarks of the message path between the Server and the Portal.
+
+These are not unit tests, they only print timings. Run them from a game
+directory, for example in `evennia shell`:
+
+    from evennia.server.profiling import benchmarks
+    benchmarks.run()
+
+"""
+from __future__ import print_function
+from time import time
+
+
+def _timeit(func, times):
+    """
+    Call func a number of times and return the seconds used.
+    """
+    begin = time()
+    for i in xrange(times):
+        func()
+    return time() - begin
+
+
+def benchmark_amp_codec(times=10):
+    """
+    Compare the codec with sending AMP payloads as they are, which is
+    what peers of version 0 exchange, and with compressing every payload
+    with zlib level 9. Messages are one second of traffic at 1k
+    msgs/sec, 1% of them are long.
+
+    """
+    import zlib
+    from evennia.server.amp import Compressed, AMPProtocol, AMP_PROTOCOL_VERSION, dumps
+
+    codec = Compressed("benchmark")
+    small = dumps((1, {"status_delta": {"hp": 84}}))
+    large = dumps((1, {"text": ("A long room description. " * 400,)}))
+    messages = [small] * 990 + [large] * 10
+
+    def roundtrip(proto):
+        wire_bytes = 0
+        for message in messages:
+            strings = {}
+            codec.toBox("packed_data", strings, {"packed_data": message}, proto)
+            codec.fromBox("packed_data", strings, {}, proto)
+            wire_bytes += sum(len(chunk) for chunk in strings.values())
+        return wire_bytes
+
+    def zlib_roundtrip():
+        wire_bytes = 0
+        for message in messages:
+            wire = zlib.compress(message, 9)
+            zlib.decompress(wire)
+            wire_bytes += len(wire)
+        return wire_bytes
+
+    raw_proto = AMPProtocol()
+    codec_proto = AMPProtocol()
+    codec_proto.peer_version = AMP_PROTOCOL_VERSION
+
+    raw_time = _timeit(lambda: roundtrip(raw_proto), times)
+    zlib_time = _timeit(zlib_roundtrip, times)
+    codec_time = _timeit(lambda: roundtrip(codec_proto), times)
+
+    print("AMP payloads x%d: raw %.4fs %d bytes, zlib-9 %.4fs %d bytes, "
+          "codec %.4fs %d bytes" %
+          (len(messages) * times, raw_time, roundtrip(raw_proto),
+           zlib_time, zlib_roundtrip(), codec_time, roundtrip(codec_proto)))
+
+
+def benchmark_clean_senddata(times=1000):
+    """
+    Compare sending structured JSON messages, such as Muddery's, with
+    validating them as normal text.
+
+    """
+    import json
+    from evennia.server.sessionhandler import ServerSessionHandler
+
+    class Session(object):
+        protocol_flags = {"ENCODING": "utf-8"}
+
+    handler = ServerSessionHandler()
+    session = Session()
+    message = {"look_around": {"name": "Street",
+                               "desc": "A long street. " * 10,
+                               "exits": [{"dbref": "#%d" % i, "name": "exit %d" % i}
+                                         for i in range(4)],
+                               "npcs": [{"dbref": "#%d" % i, "name": "npc %d" % i}
+                                        for i in range(6)]},
+               "status": {"level": 3, "exp": 20, "max_exp": 100,
+                          "hp": 84, "max_hp": 100, "attack": 10, "defence": 5}}
+    encoder = json.JSONEncoder(separators=(",", ":"))
+
+    validated_time = _timeit(lambda: handler.clean_senddata(
+        session, {"text": json.dumps(message), "options": {"raw": True}}), times)
+    structured_time = _timeit(lambda: handler.clean_senddata(
+        session, {"text": encoder.encode(message),
+                  "options": {"raw": True, "structured": True}}), times)
+
+    print("clean_senddata x%d: validated %.4fs, structured %.4fs" %
+          (times, validated_time, structured_time))
+
+
+def run():
+    """
+    Run all benchmarks.
+    """
+    benchmark_amp_codec()
+    benchmark_clean_senddata()
+
+
+if __name__ == "__main__":
+    run()
@@ -16,8 +16,10 @@ from builtins import object
 from future.utils import listvalues
 
 from time import time
+from twisted.internet import reactor
 from django.conf import settings
 from evennia.commands.cmdhandler import CMD_LOGINSTART
+from evennia.server.amp import AMP_PROTOCOL_VERSION
 from evennia.utils.logger import log_trace
 from evennia.utils.utils import (variable_from_module, is_iter,
                                  to_str, to_unicode,
@@ -64,6 +66,8 @@ _MULTISESSION_MODE = settings.MULTISESSION_MODE
 _IDLE_TIMEOUT = settings.IDLE_TIMEOUT
 _MAX_SERVER_COMMANDS_PER_SECOND = 100.0
 _MAX_SESSION_COMMANDS_PER_SECOND = 5.0
+_OUTPUT_FLUSH_INTERVAL = settings.SESSION_OUTPUT_FLUSH_INTERVAL
+_OUTPUT_BATCH_SIZE = settings.SESSION_OUTPUT_BATCH_SIZE
 _MODEL_MAP = None
 
 # input handlers
@@ -144,6 +148,9 @@ class SessionHandler(dict):
                     - {kwargs}           ->  [[], {kwargs}]
                     - [args, {kwargs}]   ->  [[arg], {kwargs}]
                     - [[args], {kwargs}] ->  [[args], {kwargs}]
+                If the "structured" option is set, each value must be a
+                serialized string, it is neither validated nor parsed for
+                inlinefuncs.
 
         Returns:
             kwargs (dict): A cleaned dictionary of cmdname:[[args],{kwargs}] pairs,
@@ -153,6 +160,16 @@ class SessionHandler(dict):
 
         """
         options = kwargs.pop("options", None) or {}
+        if options.get("structured", False):
+            # structured data has already been serialized to strings by the
+            # sender, it contains no inlinefuncs and is sent as it is.
+            rkwargs = {}
+            for key, data in kwargs.iteritems():
+                if not data and key == "text":
+                    continue
+                rkwargs[key] = [[data] if data else [], {"options": options}]
+            return rkwargs
+
         raw = options.get("raw", False)
         strip_inlinefunc = options.get("strip_inlinefunc", False)
 
@@ -240,6 +257,11 @@ class ServerSessionHandler(SessionHandler):
         self.server = None
         self.server_data = {"servername": _SERVERNAME}
 
+        # outgoing messages waiting to be sent, {sessid: [kwargs, ...]}
+        self.output_batch = {}
+        self.output_count = 0
+        self.output_flush_call = None
+
     def portal_connect(self, portalsessiondata):
         """
         Called by Portal when a new session has connected.
@@ -392,6 +414,7 @@ class ServerSessionHandler(SessionHandler):
         Called by server when shutting down the portal.
 
         """
+        self.flush_output()
         self.server.amp_protocol.send_AdminServer2Portal(DUMMYSESSION,
                                                          operation=SSHUTD)
 
@@ -441,6 +464,7 @@ class ServerSessionHandler(SessionHandler):
         session.logged_in = True
         # sync the portal to the session
         if not testmode:
+            self.flush_output()
             self.server.amp_protocol.send_AdminServer2Portal(session,
                                                          operation=SLOGIN,
                                                          sessiondata={"logged_in": True})
@@ -475,6 +499,8 @@ class ServerSessionHandler(SessionHandler):
         if sessid in self and not hasattr(self, "_disconnect_all"):
             del self[sessid]
         if sync_portal:
+            # send remaining output before the session is closed.
+            self.flush_output()
             # inform portal that session should be closed.
             self.server.amp_protocol.send_AdminServer2Portal(session,
                                                              operation=SDISCONN,
@@ -487,6 +513,7 @@ class ServerSessionHandler(SessionHandler):
 
         """
         sessdata = self.get_all_sync_data()
+        self.flush_output()
         return self.server.amp_protocol.send_AdminServer2Portal(DUMMYSESSION,
                                                          operation=SSYNC,
                                                          sessiondata=sessdata)
@@ -498,6 +525,7 @@ class ServerSessionHandler(SessionHandler):
 
         """
         sessdata = {session.sessid: session.get_sync_data()}
+        self.flush_output()
         return self.server.amp_protocol.send_AdminServer2Portal(DUMMYSESSION,
                                                                 operation=SSYNC,
                                                                 sessiondata=sessdata,
@@ -515,6 +543,7 @@ class ServerSessionHandler(SessionHandler):
         for session in self:
             del session
         # tell portal to disconnect all sessions
+        self.flush_output()
         self.server.amp_protocol.send_AdminServer2Portal(DUMMYSESSION,
                                                          operation=SDISCONNALL,
                                                          reason=reason)
@@ -674,9 +703,54 @@ class ServerSessionHandler(SessionHandler):
         # clean output for sending
         kwargs = self.clean_senddata(session, kwargs)
 
-        # send across AMP
-        self.server.amp_protocol.send_MsgServer2Portal(session,
-                                                       **kwargs)
+        # batch the output, it is sent across AMP after this
+        # reactor iteration.
+        self.output_batch.setdefault(session.sessid, []).append(kwargs)
+        self.output_count += 1
+
+        if self.output_count >= _OUTPUT_BATCH_SIZE:
+            self.flush_output()
+        elif not self.output_flush_call:
+            self.output_flush_call = reactor.callLater(_OUTPUT_FLUSH_INTERVAL, self.flush_output)
+
+    def flush_output(self):
+        """
+        Send all batched output across AMP. Messages to a single
+        session are sent as a normal message, others are sent in one
+        batch frame.
+
+        """
+        if self.output_flush_call and self.output_flush_call.active():
+            self.output_flush_call.cancel()
+        self.output_flush_call = None
+
+        if not self.output_batch:
+            return
+
+        batch = self.output_batch
+        self.output_batch = {}
+        self.output_count = 0
+
+        amp_protocol = self.server.amp_protocol
+        if amp_protocol.peer_version < AMP_PROTOCOL_VERSION:
+            # A Portal started before an upgrade does not know batch
+            # frames, send messages one by one.
+            for sessid, messages in batch.iteritems():
+                session = self.get(sessid)
+                if session:
+                    for kwargs in messages:
+                        amp_protocol.send_MsgServer2Portal(session, **kwargs)
+            return
+
+        if len(batch) == 1:
+            sessid, messages = batch.popitem()
+            session = self.get(sessid)
+            if session and len(messages) == 1:
+                amp_protocol.send_MsgServer2Portal(session, **messages[0])
+                return
+            batch[sessid] = messages
+
+        amp_protocol.send_MsgBatchServer2Portal(batch)
 
     def get_inputfuncs(self):
         """
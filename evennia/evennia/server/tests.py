@@ -45,3 +45,81 @@ class EvenniaTestSuiteRunner(DiscoverRunner):
         import evennia
         evennia._init()
         return super(EvenniaTestSuiteRunner, self).build_suite(test_labels, extra_tests=extra_tests, **kwargs)
+
+
+class TestAMPCodec(TestCase):
+    """
+    Test the wire codec of AMP messages between the Portal and the Server.
+    """
+    def setUp(self):
+        from evennia.server.amp import Compressed, dumps
+        self.codec = Compressed("test")
+        self.small = dumps((1, {"status_delta": {"hp": 84}}))
+        self.large = dumps((1, {"text": ("A long room description. " * 400,)}))
+
+    def test_codec(self):
+        from evennia.server.amp import get_codec_stats
+        compressed = get_codec_stats().get("test", {}).get("compressed", 0)
+        small_wire = self.codec.toString(self.small)
+        large_wire = self.codec.toString(self.large)
+        self.assertIs(small_wire, self.small)
+        self.assertLess(len(large_wire), len(self.large))
+        self.assertEqual(self.codec.fromString(small_wire), self.small)
+        self.assertEqual(self.codec.fromString(large_wire), self.large)
+        self.assertEqual(get_codec_stats()["test"]["compressed"], compressed + 1)
+
+    def test_old_peer(self):
+        # An old peer joins the chunks of a box and unpickles them.
+        from evennia.server.amp import AMPProtocol, loads
+        proto = AMPProtocol()
+        for payload in (self.small, self.large):
+            strings = {}
+            self.codec.toBox("packed_data", strings, {"packed_data": payload}, proto)
+            self.assertEqual(strings.keys(), ["packed_data"])
+            self.assertEqual(loads(strings["packed_data"]), loads(payload))
+            objects = {}
+            self.codec.fromBox("packed_data", strings, objects, proto)
+            self.assertEqual(objects["packed_data"], payload)
+
+    def test_negotiation(self):
+        from evennia.server.amp import AMPProtocol, AMP_PROTOCOL_VERSION
+        proto = AMPProtocol()
+        proto.set_peer_version({"amp_version": None})
+        self.assertEqual(proto.peer_version, 0)
+        proto.set_peer_version(None)
+        self.assertEqual(proto.peer_version, 0)
+        proto.set_peer_version({"amp_version": AMP_PROTOCOL_VERSION})
+        self.assertEqual(proto.peer_version, AMP_PROTOCOL_VERSION)
+        strings = {}
+        self.codec.toBox("packed_data", strings, {"packed_data": self.large}, proto)
+        self.assertLess(len(strings["packed_data"]), len(self.large))
+
+
+class TestCleanSendData(TestCase):
+    """
+    Test sending structured data, such as Muddery's JSON messages.
+    """
+    def setUp(self):
+        from evennia.server.sessionhandler import ServerSessionHandler
+
+        class Session(object):
+            protocol_flags = {"ENCODING": "utf-8"}
+
+        self.handler = ServerSessionHandler()
+        self.session = Session()
+        self.message = {"look_around": {"name": "Street",
+                                        "desc": "A long street. " * 10,
+                                        "exits": [{"dbref": "#%d" % i, "name": "exit %d" % i}
+                                                  for i in range(4)],
+                                        "npcs": [{"dbref": "#%d" % i, "name": "npc %d" % i}
+                                                 for i in range(6)]},
+                        "status": {"level": 3, "exp": 20, "max_exp": 100,
+                                   "hp": 84, "max_hp": 100, "attack": 10, "defence": 5}}
+
+    def test_structured(self):
+        import json
+        text = json.dumps(self.message)
+        options = {"raw": True, "structured": True}
+        kwargs = self.handler.clean_senddata(self.session, {"text": text, "options": options})
+        self.assertEqual(kwargs, {"text": [[text], {"options": options}]})
+        self.assertEqual(self.handler.clean_senddata(self.session, {"text": "", "options": options}), {})
@@ -166,6 +166,20 @@ SCREENREADER_REGEX_STRIP = r"\+-+|\+$|\+~|--+|~~+|==+"
 AMP_HOST = 'localhost'
 AMP_PORT = 5000
 AMP_INTERFACE = '127.0.0.1'
+# Data sent between the Portal and the Server over AMP is compressed with
+# zlib only if it is at least AMP_COMPRESS_THRESHOLD bytes long, small
+# messages are not worth the CPU. AMP_COMPRESS_LEVEL is zlib's level, from 1
+# (fastest) to 9 (smallest). Set the threshold to None to never compress.
+# Each side only compresses data after the other side has told its version,
+# so a Portal or Server started before an upgrade gets uncompressed data.
+AMP_COMPRESS_THRESHOLD = 4096
+AMP_COMPRESS_LEVEL = 1
+# Output from the Server to sessions is collected and sent to the Portal in one
+# AMP frame. It is sent at most SESSION_OUTPUT_FLUSH_INTERVAL seconds later (0
+# means after the current reactor iteration), or at once when
+# SESSION_OUTPUT_BATCH_SIZE messages are waiting.
+SESSION_OUTPUT_FLUSH_INTERVAL = 0
+SESSION_OUTPUT_BATCH_SIZE = 500
 # Database objects are cached in what is known as the idmapper. The idmapper
 # caching results in a massive speedup of the server (since it dramatically
 # limits the number of database accesses needed) and also allows for
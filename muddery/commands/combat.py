@@ -1,9 +1,11 @@
 """
-Battle commands. They only can be used when a character is in a combat.
+Battle commands. They only can be used when a character is in a combat,
+except @combatstats which shows the combat engine's status to admins.
 """
 
 from evennia import Command
 from muddery.utils.localized_strings_handler import LS
+from muddery.utils.combat_engine import COMBAT_ENGINE
 from evennia.utils import logger
 import traceback
 
@@ -38,3 +40,33 @@ class CmdCombatInfo(Command):
         message = {"combat_info": appearance,
                    "combat_commands": caller.get_combat_commands()}
         caller.msg(message)
+
+
+class CmdCombatStats(Command):
+    """
+    Show the combat engine's status.
+
+    Usage:
+      @combatstats
+
+    Shows the number of active combats and characters that cast skills
+    automatically, and the time used by the engine's ticks.
+    """
+    key = "@combatstats"
+    locks = "cmd:perm(Builders)"
+    help_category = "Builders"
+
+    def func(self):
+        """
+        Send the combat engine's metrics to the caller.
+        """
+        metrics = COMBAT_ENGINE.get_metrics()
+
+        string = "Active combats: %d\n" % metrics["combats"]
+        string += "Auto casters: %d\n" % metrics["auto_casters"]
+        string += "Ticks: %d\n" % metrics["ticks"]
+        string += "Tick time: last %.2fms, average %.2fms, max %.2fms" % \
+                  (metrics["last_tick_time"] * 1000,
+                   metrics["average_tick_time"] * 1000,
+                   metrics["max_tick_time"] * 1000)
+        self.caller.msg(string)
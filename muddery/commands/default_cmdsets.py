@@ -38,6 +38,7 @@ class CharacterCmdSet(default_cmds.CharacterCmdSet):
         self.add(worlddata.CmdImportData())
         self.add(worlddata.CmdLoadWorld())
         self.add(worlddata.CmdBuildWorld())
+        self.add(combat.CmdCombatStats())
 
         self.add(general.CmdLook())
         self.add(general.CmdGoto())
@@ -53,6 +54,7 @@ class CharacterCmdSet(default_cmds.CharacterCmdSet):
         self.add(general.CmdAttack())
         self.add(general.CmdUnlockExit())
         self.add(general.CmdGiveUpQuest())
+        self.add(general.CmdRevealedMap())
         self.add(general.CmdShopping())
         self.add(general.CmdBuy())
 
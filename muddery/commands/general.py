@@ -1043,6 +1043,36 @@ class CmdGiveUpQuest(Command):
         caller.msg(message)
 
 
+#------------------------------------------------------------
+# get revealed map
+#------------------------------------------------------------
+class CmdRevealedMap(Command):
+    """
+    Get the character's revealed map.
+
+    Usage:
+        {"cmd":"revealed_map",
+         "args":<the version of the client's cached map>
+        }
+    If the client's map can be updated, only send changes.
+    """
+    key = "revealed_map"
+    locks = "cmd:all()"
+    help_cateogory = "General"
+
+    def func(self):
+        "Send the revealed map."
+        caller = self.caller
+
+        client_version = self.args
+        if client_version:
+            message = caller.get_revealed_map_delta(client_version)
+        else:
+            message = {"revealed_map": caller.get_revealed_map()}
+
+        caller.msg(message)
+
+
 #------------------------------------------------------------
 # unlock exit
 #------------------------------------------------------------
@@ -6,8 +6,9 @@ Add three commands: @importdata, @datainfo and @batchbuilder
 """
 
 import os
+import re
 from django.conf import settings
-from muddery.utils.importer import import_model, import_local_all
+from muddery.utils.importer import import_models, import_local_all
 from muddery.utils.builder import build_all
 from muddery.utils.exception import MudderyError
 from evennia import default_cmds
@@ -20,9 +21,10 @@ import traceback
 class CmdImportData(default_cmds.MuxCommand):
     """
     Usage:
-      @importdata
+      @importdata [--jobs <number>] [<modelname>[, <modelname>...]]
 
       If <modelname> is empty, it will import all data files in settings.OBJECT_DATA_MODELS.
+      --jobs sets the number of processes which parse data files.
     """
     key = "@importdata"
     locks = "perm(Builders)"
@@ -34,31 +36,38 @@ class CmdImportData(default_cmds.MuxCommand):
 
         caller = self.caller
 
-        # count the number of files loaded
-        count = 0
+        # get the number of jobs
+        args = self.args
+        jobs = None
+        match = re.search(r"--jobs\s+(\d+)", args)
+        if match:
+            jobs = int(match.group(1))
+            args = args[:match.start()] + args[match.end():]
 
         # get model_name, can specify the model name in args
         # if no args is given, load all models in settings.OBJECT_DATA_MODELS
-        models = self.args
+        models = args.strip()
         if models:
             models = [arg.strip() for arg in models.split(',')]
         else:
             models = settings.OBJECT_DATA_MODELS + settings.OTHER_DATA_MODELS
 
-        # import models one by one
+        # import models
+        try:
+            imported = import_models(models, jobs=jobs)
+        except Exception, e:
+            ostring = "Can not import data: %s" % e
+            caller.msg(ostring)
+            logger.log_tracemsg(ostring)
+            return
+
         for model_name in models:
-            try:
-                import_model(model_name)
+            if model_name in imported:
                 caller.msg("%s imported." % model_name)
-                count += 1
-            except MudderyError, e:
-                caller.msg(e)
-                continue
-            except Exception, e:
+            else:
                 caller.msg("Can not import %s." % model_name)
-                continue
 
-        caller.msg("Total %d files imported." % count)
+        caller.msg("Total %d files imported." % len(imported))
 
 
 #------------------------------------------------------------
@@ -16,45 +16,29 @@ at_server_cold_stop()
 
 """
 
-from muddery.utils.dialogue_handler import DIALOGUE_HANDLER
+from django.conf import settings
 from muddery.utils.object_key_handler import OBJECT_KEY_HANDLER
-from muddery.utils.equip_type_handler import EQUIP_TYPE_HANDLER
-from muddery.utils.quest_dependency_handler import QUEST_DEP_HANDLER
-from muddery.utils.localized_strings_handler import LOCALIZED_STRINGS_HANDLER
-from muddery.utils.game_settings import GAME_SETTINGS, CLIENT_SETTINGS
+from muddery.utils.world_data_handler import WORLD_DATA_HANDLER
+from muddery.utils.world_map_handler import WORLD_MAP_HANDLER
+from muddery.utils.event_data_handler import EVENT_DATA_HANDLER
 from muddery.typeclasses.character_skills import MudderySkill
 from muddery.utils import builder
-from muddery.utils.localiztion_handler import localize_model_fields
 
 def at_server_start():
     """
     This is called every time the server starts up, regardless of
     how it was shut down.
     """
-    # reset settings
-    GAME_SETTINGS.reset()
-    CLIENT_SETTINGS.reset()
+    # load world data
+    WORLD_DATA_HANDLER.reload(settings.WORLD_DATA_BUNDLE)
+    WORLD_MAP_HANDLER.reload()
+    EVENT_DATA_HANDLER.reload()
 
     # reload keys
     OBJECT_KEY_HANDLER.reload()
 
-    # reset default locations
-    builder.reset_default_locations()
-    
-    # clear dialogues
-    DIALOGUE_HANDLER.clear()
-
-    # clear quest dependencies
-    QUEST_DEP_HANDLER.clear()
-
-    # reload equipment types
-    EQUIP_TYPE_HANDLER.reload()
-
-    # reload local strings
-    LOCALIZED_STRINGS_HANDLER.reload()
-
-    # localize model fields
-    localize_model_fields()
+    # reload settings, dialogues, localized strings and other handlers' data
+    builder.reload_handlers()
 
 
 def at_server_stop():
@@ -22,10 +22,129 @@ settings file:
 """
 
 import json
+from django.conf import settings
 from evennia.server.serversession import ServerSession as BaseServerSession
 from evennia.utils import logger
 
 
+# Messages are encoded by one encoder, in compact form.
+_JSON_ENCODER = json.JSONEncoder(separators=(",", ":"))
+
+
+# The message sent when a message can not be encoded.
+_ENCODE_ERROR = {"err": "There is an error occurred while outputing messages."}
+
+
+def encode_message(message):
+    """
+    Encode a message to JSON.
+
+    Args:
+        message: (any) a message, usually a dict
+
+    Returns:
+        (string) JSON string
+    """
+    try:
+        return _JSON_ENCODER.encode(message)
+    except Exception, e:
+        logger.log_tracemsg("json.dumps failed: %s" % e)
+        return _JSON_ENCODER.encode(_ENCODE_ERROR)
+
+
+# The mark of compact messages and literal field names.
+COMPACT_MARK = "~"
+
+_BASE36_DIGITS = "0123456789abcdefghijklmnopqrstuvwxyz"
+
+
+def _base36(number):
+    """
+    Convert a non-negative integer to a base36 string.
+    """
+    digits = []
+    while True:
+        number, digit = divmod(number, 36)
+        digits.append(_BASE36_DIGITS[digit])
+        if not number:
+            break
+    return "".join(reversed(digits))
+
+
+class KeyTable(object):
+    """
+    Field names of compact messages are replaced by short ids. Only names in a
+    fixed list have ids, other keys, like rooms' keys and dbrefs, are sent as
+    they are. Keys which look like ids are marked.
+    """
+    def __init__(self, names):
+        """
+        Initialize the table.
+
+        Args:
+            names: (list) field names
+        """
+        # names in the order of their ids
+        self.names = []
+
+        # name -> id
+        self.ids = {}
+
+        for name in names:
+            if name not in self.ids:
+                self.ids[name] = _base36(len(self.names))
+                self.names.append(name)
+
+        self.id_set = set(self.ids.values())
+
+    def get_key(self, name):
+        """
+        Get the key of a field name in compact messages.
+
+        Args:
+            name: (string) field name
+
+        Returns:
+            (string) the name's id, or the name itself
+        """
+        id = self.ids.get(name)
+        if id is not None:
+            return id
+
+        if name in self.id_set or name.startswith(COMPACT_MARK):
+            # Mark the name, so it will not be taken as an id.
+            return COMPACT_MARK + name
+
+        return name
+
+    def compact(self, data):
+        """
+        Replace field names in data with their ids.
+
+        Args:
+            data: (any) message data
+
+        Returns:
+            (any) compacted data
+        """
+        if isinstance(data, dict):
+            compacted = {}
+            for key, value in data.iteritems():
+                if not isinstance(key, basestring):
+                    # JSON converts keys to strings.
+                    key = _JSON_ENCODER.encode(key)
+                compacted[self.get_key(key)] = self.compact(value)
+            return compacted
+        elif isinstance(data, (list, tuple)):
+            return [self.compact(value) for value in data]
+
+        return data
+
+
+# main key table
+KEY_TABLE = KeyTable(settings.COMPACT_MESSAGE_FIELDS)
+
+
 class ServerSession(BaseServerSession):
     """
     This class represents a player's session and is a template for
@@ -35,6 +154,33 @@ class ServerSession(BaseServerSession):
     to the game server. All communication between game and player goes
     through their session(s).
     """
+    # number of key table's names which the client has received
+    compact_names_sent = 0
+
+    def encode_compact(self, message):
+        """
+        Encode a message in compact form. The message is
+        ["~", <position of new names>, [<new names>], <compacted message>].
+
+        Args:
+            message: (dict) a message
+
+        Returns:
+            (string) JSON string
+        """
+        start = self.compact_names_sent
+        names = KEY_TABLE.names[start:]
+
+        try:
+            text = _JSON_ENCODER.encode([COMPACT_MARK, start, names, KEY_TABLE.compact(message)])
+        except Exception, e:
+            logger.log_tracemsg("json.dumps failed: %s" % e)
+            return _JSON_ENCODER.encode(_ENCODE_ERROR)
+
+        # The client gets new names with this message.
+        self.compact_names_sent = len(KEY_TABLE.names)
+        return text
+
     def data_out(self, text=None, **kwargs):
         """
         Send Evennia -> User
@@ -42,19 +188,19 @@ class ServerSession(BaseServerSession):
         """
         options = kwargs.get("options", {})
         raw = options.get("raw", False)
-        if not raw:
-            try:
-                if text:
-                    text = json.dumps(text)
-            except Exception, e:
-                text = json.dumps({"err": "There is an error occurred while outputing messages."})
-                logger.log_tracemsg("json.dumps failed: %s" % e)
+        if not raw and text:
+            if isinstance(text, dict) and self.protocol_flags.get("COMPACT"):
+                text = self.encode_compact(text)
+            else:
+                text = encode_message(text)
+
+        # The JSON text is structured data that needs no more validation or
+        # inlinefunc parsing. Other send-commands still need to be cleaned.
+        # Broadcasts send text which has already been encoded as structured.
+        structured = options.get("structured", False) or \
+                     (not raw and not [key for key in kwargs if key != "options"])
 
         # set raw=True
-        if kwargs:
-            kwargs["options"] = {"raw": True}
-        else:
-            kwargs = {"options": {"raw": True}}
+        kwargs["options"] = {"raw": True, "structured": structured}
 
         return super(ServerSession, self).data_out(text=text, **kwargs)
-
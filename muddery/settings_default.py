@@ -57,6 +57,27 @@ COMMAND_PARSER = "muddery.server.conf.cmdparser.cmdparser"
 # Server-side session class used.
 SERVER_SESSION_CLASS = "muddery.server.conf.serversession.ServerSession"
 
+# Field names of messages. Clients that ask for compact messages receive short
+# ids instead of these names. Other keys, like rooms' keys and dbrefs, are sent
+# as they are.
+COMPACT_MESSAGE_FIELDS = ("msg", "alert", "err", "status", "status_delta", "equipments",
+                          "inventory", "skills", "quests", "revealed_map", "reveal_map",
+                          "map_version", "current_location", "look_around", "look_obj",
+                          "puppet", "login", "logout", "settings", "dialogues_list",
+                          "combat_info", "combat_commands", "combat_finish", "joined_combat",
+                          "left_combat", "skill_cd", "skill_result", "skill_results",
+                          "get_object", "get_exp", "obj_moved_in", "obj_moved_out",
+                          "player_online", "player_offline", "shop", "escaped",
+                          "dbref", "key", "name", "desc", "icon", "cmds", "cmd", "args",
+                          "level", "exp", "max_exp", "hp", "max_hp", "mp", "max_mp",
+                          "attack", "defence", "number", "equipped", "cd", "cd_remain",
+                          "gcd", "skill", "caller", "target", "effect", "characters",
+                          "npcs", "players", "things", "exits", "rooms", "version",
+                          "objectives", "accomplished", "quest", "provide_quest",
+                          "complete_quest", "dialogue", "sentence", "speaker", "content",
+                          "npc", "win", "lose", "accepted", "rejected", "goods", "price",
+                          "unit", "background", "type", "object", "location")
+
 # These are paths that will be prefixed to the paths given if the
 # immediately entered path fail to find a typeclass. It allows for
 # shorter input strings. They must either base off the game directory
@@ -109,9 +130,20 @@ CONDITION_FUNC_SET = "muddery.statements.default_statement_func_set.ConditionFun
 # Skill functions set
 SKILL_FUNC_SET = "muddery.statements.default_statement_func_set.SkillFuncSet"
 
+# Max number of compiled statements kept in the statement handler's cache.
+STATEMENT_CACHE_SIZE = 4096
+
 # Handler of the combat
 COMBAT_HANDLER = "muddery.typeclasses.combat_handler.MudderyCombatHandler"
 
+# The interval in seconds of the combat engine's loop, which drives all
+# characters that cast skills automatically.
+COMBAT_TICK_INTERVAL = 0.1
+
+# Tag category of clones which characters attack in combats. Clones are reused
+# after combats.
+COMBAT_CLONE_CATEGORY = "combat_clone"
+
 ######################################################################
 # World data features
 ######################################################################
@@ -125,6 +157,12 @@ WORLD_DATA_APP = "worlddata"
 # data file's folder under user's game directory.
 WORLD_DATA_FOLDER = os.path.join("worlddata", "data")
 
+# Number of records written to the db at a time when importing data files.
+IMPORT_BATCH_SIZE = 500
+
+# Number of processes that parse data files when importing all data files.
+IMPORT_JOBS = 1
+
 # game settings
 GAME_SETTINGS = "game_settings"
 
@@ -140,6 +178,34 @@ REVERSE_EXIT_TYPECLASS_PATH = "typeclasses.exits.ReverseExit"
 # Reverse exit's key's prefix.
 REVERSE_EXIT_PREFIX = "__reverse__"
 
+# If it is True, characters send the version of their revealed maps when they are
+# puppeted, instead of the whole map. The client requests the map's changes with
+# the version of its cached map.
+REVEALED_MAP_DELTA = False
+
+# Fields that link world data records to unique objects. When rebuilding the world,
+# an object is updated only if its own records or records linked to it changed.
+OBJECT_LINK_FIELDS = ("provider", "trigger_obj", "npc")
+
+# If it is True, the world editor applies changes to the running server instead of
+# reloading the server.
+HOT_APPLY_WORLD_CHANGES = True
+
+# The file name of the world data bundle. If it is set, the world data snapshot is
+# loaded from the bundle when the server starts, and the bundle is written every
+# time the world is built. For example: os.path.join(GAME_DIR, "server", "worlddata.bundle")
+WORLD_DATA_BUNDLE = None
+
+# Fields that world data records are indexed by in memory.
+WORLD_DATA_INDEX_FIELDS = ("key",
+                           "provider",
+                           "trigger_obj",
+                           "npc",
+                           "shop",
+                           "quest",
+                           "dialogue",
+                           "character")
+
 ###################################
 # Basic data
 ###################################
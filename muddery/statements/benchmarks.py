@@ -0,0 +1,71 @@
+"""
+Benchmarks of statements.
+
+These are not unit tests, they only print timings. Run them in the game's
+shell:
+
+    from muddery.statements import benchmarks
+    benchmarks.run()
+"""
+
+from __future__ import print_function
+
+import time
+from muddery.statements.statement_handler import StatementHandler, exec_condition, exec_function
+from muddery.statements.tests import TestFuncSet, FakeCaller
+
+
+def timeit(func, times):
+    """
+    Call func a number of times and return the seconds used.
+    """
+    begin = time.time()
+    for i in xrange(times):
+        func()
+    return time.time() - begin
+
+
+def benchmark_conditions(times=2000):
+    """
+    Compare compiled conditions with the legacy regex and eval path.
+    """
+    func_set = TestFuncSet()
+    handler = StatementHandler()
+    handler.condition_func_set = func_set
+
+    condition = 'has_flag("a")'
+    caller = FakeCaller("a")
+
+    legacy_time = timeit(lambda: eval(exec_condition(func_set, condition, caller, None)), times)
+    compiled_time = timeit(lambda: handler.match_condition(condition, caller, None), times)
+
+    print("match_condition x%d: legacy %.4fs, compiled %.4fs" % (times, legacy_time, compiled_time))
+
+
+def benchmark_actions(times=2000):
+    """
+    Compare compiled actions with parsing them on every call.
+    """
+    func_set = TestFuncSet()
+    handler = StatementHandler()
+    handler.action_func_set = func_set
+
+    action = 'add_flag("a"); add_flag("b")'
+    caller = FakeCaller()
+
+    def legacy():
+        for function in action.split(";"):
+            exec_function(func_set, function.strip(), caller, None)
+
+    legacy_time = timeit(legacy, times)
+    compiled_time = timeit(lambda: handler.do_action(action, caller, None), times)
+
+    print("do_action x%d: legacy %.4fs, compiled %.4fs" % (times, legacy_time, compiled_time))
+
+
+def run():
+    """
+    Run all benchmarks.
+    """
+    benchmark_conditions()
+    benchmark_actions()
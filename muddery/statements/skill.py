@@ -15,6 +15,9 @@ class SkillFunction(StatementFunction):
     """
     msg_escape = re.compile(r'%[%|n|c|t|e]')
 
+    # message -> escaped message model
+    message_models = {}
+
     @staticmethod
     def escape_fun(word):
         """
@@ -27,6 +30,17 @@ class SkillFunction(StatementFunction):
         else:
             return "%(" + char + ")s"
 
+    @classmethod
+    def get_message_model(cls, message):
+        """
+        Get the escaped message model, messages are only escaped once.
+        """
+        model = cls.message_models.get(message)
+        if model is None:
+            model = cls.msg_escape.sub(cls.escape_fun, message)
+            cls.message_models[message] = model
+        return model
+
     def __init__(self):
         """
         Init default attributes.
@@ -47,8 +61,7 @@ class SkillFunction(StatementFunction):
 
         self.key = kwargs.get("key", "")
         self.name = kwargs.get("name", "")
-        message_model = kwargs.get("message", "")
-        self.message_model = self.msg_escape.sub(self.escape_fun, message_model)
+        self.message_model = self.get_message_model(kwargs.get("message", ""))
 
     def result_message(self, effect=None, status=None, message_model=None):
         """
@@ -0,0 +1,291 @@
+"""
+Compiles statement strings into python callables.
+
+A condition such as 'is_quest_completed("quest_1") and not has_object("key")'
+is parsed only once into a tree of closures. Evaluating a compiled condition
+calls the statement functions directly, no regex substitution or eval() is
+needed.
+
+Actions and skills such as 'hit(10); heal(5)' are compiled into a tuple of
+function callables with their args parsed.
+"""
+
+import ast
+import operator
+from collections import OrderedDict
+from evennia.utils import logger
+
+
+class StatementCompileError(Exception):
+    """
+    Raised when a statement can not be compiled.
+    """
+    pass
+
+
+# Operators that can be used in conditions.
+_UNARY_OPS = {ast.Not: operator.not_,
+              ast.USub: operator.neg,
+              ast.UAdd: operator.pos}
+
+_BINARY_OPS = {ast.Add: operator.add,
+               ast.Sub: operator.sub,
+               ast.Mult: operator.mul,
+               ast.Div: operator.div,
+               ast.FloorDiv: operator.floordiv,
+               ast.Mod: operator.mod}
+
+_COMPARE_OPS = {ast.Eq: operator.eq,
+                ast.NotEq: operator.ne,
+                ast.Lt: operator.lt,
+                ast.LtE: operator.le,
+                ast.Gt: operator.gt,
+                ast.GtE: operator.ge,
+                ast.Is: operator.is_,
+                ast.IsNot: operator.is_not,
+                ast.In: lambda a, b: a in b,
+                ast.NotIn: lambda a, b: a not in b}
+
+
+def get_function_key(node):
+    """
+    Get a statement function's key from a call node's func.
+
+    Args:
+        node: (ast node) the func part of a call, such as a Name or a dotted Attribute
+
+    Returns:
+        (string) function's key
+    """
+    if isinstance(node, ast.Name):
+        return node.id
+    elif isinstance(node, ast.Attribute):
+        return get_function_key(node.value) + "." + node.attr
+
+    raise StatementCompileError("Invalid function name.")
+
+
+def compile_function(func_set, node):
+    """
+    Compile a function call node.
+
+    Args:
+        func_set: (object) function set
+        node: (ast.Call) function call
+
+    Returns:
+        (callable) function(caller, obj, kwargs)
+    """
+    func_key = get_function_key(node.func)
+
+    if node.keywords or getattr(node, "starargs", None) or getattr(node, "kwargs", None):
+        raise StatementCompileError("Function %s can only have positional args." % func_key)
+
+    # Args must be literals, parse them once.
+    try:
+        func_args = tuple(ast.literal_eval(arg) for arg in node.args)
+    except ValueError:
+        raise StatementCompileError("Function %s's args must be literals." % func_key)
+
+    func_class = func_set.get_func_class(func_key)
+    if not func_class:
+        logger.log_errmsg("Statement error: Can not find function: %s." % func_key)
+        return lambda caller, obj, kwargs: None
+
+    def function(caller, obj, kwargs):
+        try:
+            func_obj = func_class()
+            func_obj.set(caller, obj, func_args, **kwargs)
+            return func_obj.func()
+        except Exception, e:
+            logger.log_errmsg("Exec function error: %s %s" % (func_key, e))
+            return None
+
+    return function
+
+
+def compile_node(func_set, node):
+    """
+    Compile an expression node.
+
+    Args:
+        func_set: (object) function set
+        node: (ast node) expression
+
+    Returns:
+        (callable) function(caller, obj, kwargs)
+    """
+    if isinstance(node, ast.Call):
+        return compile_function(func_set, node)
+
+    elif isinstance(node, ast.BoolOp):
+        values = [compile_node(func_set, value) for value in node.values]
+        if isinstance(node.op, ast.And):
+            def bool_op(caller, obj, kwargs):
+                result = True
+                for value in values:
+                    result = value(caller, obj, kwargs)
+                    if not result:
+                        break
+                return result
+        else:
+            def bool_op(caller, obj, kwargs):
+                result = False
+                for value in values:
+                    result = value(caller, obj, kwargs)
+                    if result:
+                        break
+                return result
+        return bool_op
+
+    elif isinstance(node, ast.UnaryOp):
+        op = _UNARY_OPS.get(type(node.op))
+        if not op:
+            raise StatementCompileError("Unsupported operator.")
+        operand = compile_node(func_set, node.operand)
+        return lambda caller, obj, kwargs: op(operand(caller, obj, kwargs))
+
+    elif isinstance(node, ast.BinOp):
+        op = _BINARY_OPS.get(type(node.op))
+        if not op:
+            raise StatementCompileError("Unsupported operator.")
+        left = compile_node(func_set, node.left)
+        right = compile_node(func_set, node.right)
+        return lambda caller, obj, kwargs: op(left(caller, obj, kwargs), right(caller, obj, kwargs))
+
+    elif isinstance(node, ast.Compare):
+        ops = []
+        for op in node.ops:
+            if type(op) not in _COMPARE_OPS:
+                raise StatementCompileError("Unsupported operator.")
+            ops.append(_COMPARE_OPS[type(op)])
+        left = compile_node(func_set, node.left)
+        comparators = [compile_node(func_set, comparator) for comparator in node.comparators]
+        pairs = zip(ops, comparators)
+
+        def compare(caller, obj, kwargs):
+            left_value = left(caller, obj, kwargs)
+            for op, comparator in pairs:
+                right_value = comparator(caller, obj, kwargs)
+                if not op(left_value, right_value):
+                    return False
+                left_value = right_value
+            return True
+        return compare
+
+    # Others must be literals.
+    try:
+        value = ast.literal_eval(node)
+    except ValueError:
+        raise StatementCompileError("Unsupported expression.")
+    return lambda caller, obj, kwargs: value
+
+
+def compile_condition(func_set, condition):
+    """
+    Compile a condition string.
+
+    Args:
+        func_set: (object) condition function set
+        condition: (string) condition statement
+
+    Returns:
+        (callable) function(caller, obj, kwargs), returns the condition's value
+    """
+    try:
+        tree = ast.parse(condition.strip(), mode="eval")
+    except SyntaxError, e:
+        raise StatementCompileError("Syntax error: %s" % e)
+
+    return compile_node(func_set, tree.body)
+
+
+def compile_statements(func_set, statements):
+    """
+    Compile action or skill statements separated by ";".
+
+    Args:
+        func_set: (object) function set
+        statements: (string) statements, such as: 'hit(10); heal(5)'
+
+    Returns:
+        (tuple) callables function(caller, obj, kwargs)
+    """
+    functions = []
+    for statement in statements.split(";"):
+        statement = statement.strip()
+        if not statement:
+            continue
+
+        # Statements are independent, a bad statement does not stop others.
+        try:
+            try:
+                node = ast.parse(statement, mode="eval").body
+            except SyntaxError, e:
+                raise StatementCompileError("Syntax error: %s" % e)
+
+            if not isinstance(node, ast.Call):
+                # A function without args.
+                node = ast.Call(func=node, args=[], keywords=[], starargs=None, kwargs=None)
+
+            functions.append(compile_function(func_set, node))
+        except StatementCompileError, e:
+            logger.log_errmsg("Compile statement error:%s %s" % (statement, e))
+
+    return tuple(functions)
+
+
+class StatementCache(object):
+    """
+    A bounded LRU cache of compiled statements, keyed by the statement string.
+    """
+    def __init__(self, size):
+        """
+        Args:
+            size: (int) max number of compiled statements.
+        """
+        self.size = size
+        self.items = OrderedDict()
+
+    def get(self, key):
+        """
+        Get a compiled statement.
+
+        Args:
+            key: (string) statement string
+
+        Returns:
+            compiled statement or None
+        """
+        try:
+            value = self.items.pop(key)
+        except KeyError:
+            return None
+
+        # Move it to the newest end.
+        self.items[key] = value
+        return value
+
+    def add(self, key, value):
+        """
+        Add a compiled statement.
+
+        Args:
+            key: (string) statement string
+            value: compiled statement
+
+        Returns:
+            None
+        """
+        self.items[key] = value
+        while len(self.items) > self.size:
+            self.items.popitem(last=False)
+
+    def clear(self):
+        """
+        Remove all compiled statements.
+        """
+        self.items.clear()
+
+    def __len__(self):
+        return len(self.items)
@@ -8,6 +8,8 @@ import traceback
 from evennia.utils import logger
 from evennia.utils.utils import class_from_module
 from django.conf import settings
+from muddery.statements.statement_compiler import compile_condition, compile_statements
+from muddery.statements.statement_compiler import StatementCache, StatementCompileError
 
 
 #re_words = re.compile(r'([a-zA-Z_][a-zA-Z0-9_]*)|("(.*)")')
@@ -119,6 +121,13 @@ class StatementHandler(object):
         skill_func_set_class = class_from_module(settings.SKILL_FUNC_SET)
         self.skill_func_set = skill_func_set_class()
 
+        # compiled conditions
+        self.condition_cache = StatementCache(settings.STATEMENT_CACHE_SIZE)
+
+        # compiled actions and skills
+        self.action_cache = StatementCache(settings.STATEMENT_CACHE_SIZE)
+        self.skill_cache = StatementCache(settings.STATEMENT_CACHE_SIZE)
+
     def do_action(self, action, caller, obj, **kwargs):
         """
         Do a function.
@@ -135,12 +144,9 @@ class StatementHandler(object):
             return
 
         # execute the statement
-        functions = action.split(";")
+        functions = self.get_compiled_statements(self.action_cache, self.action_func_set, action)
         for function in functions:
-            try:
-                exec_function(self.action_func_set, function, caller, obj, **kwargs)
-            except Exception, e:
-                logger.log_errmsg("Exec function error: %s %s" % (function, e))
+            function(caller, obj, kwargs)
 
         return
 
@@ -160,12 +166,9 @@ class StatementHandler(object):
             return
 
         # execute the statement
-        functions = action.split(";")
+        functions = self.get_compiled_statements(self.skill_cache, self.skill_func_set, action)
         for function in functions:
-            try:
-                exec_function(self.skill_func_set, function, caller, obj, **kwargs)
-            except Exception, e:
-                logger.log_errmsg("Exec function error: %s %s" % (function, e))
+            function(caller, obj, kwargs)
 
         return
 
@@ -184,17 +187,57 @@ class StatementHandler(object):
         if not condition:
             return True
 
-        # calculate functions first
-        exec_string = exec_condition(self.condition_func_set, condition, caller, obj, **kwargs)
+        compiled = self.get_compiled_condition(condition)
 
         try:
             # do condition
-            result = eval(exec_string)
+            result = compiled(caller, obj, kwargs)
         except Exception, e:
             logger.log_tracemsg("Exec condition error:%s %s" % (condition, e))
             return False
 
         return result
 
+    def get_compiled_condition(self, condition):
+        """
+        Get a compiled condition from the cache, compile it if it is not in the cache.
+
+        Args:
+            condition: (string) a condition expression
+
+        Returns:
+            (callable) function(caller, obj, kwargs)
+        """
+        compiled = self.condition_cache.get(condition)
+        if compiled is None:
+            try:
+                compiled = compile_condition(self.condition_func_set, condition)
+            except StatementCompileError, e:
+                # Cache the failure too, so the error only logs once.
+                logger.log_errmsg("Compile condition error:%s %s" % (condition, e))
+                compiled = lambda caller, obj, kwargs: False
+            self.condition_cache.add(condition, compiled)
+
+        return compiled
+
+    def get_compiled_statements(self, cache, func_set, statements):
+        """
+        Get compiled statements from the cache, compile them if they are not in the cache.
+
+        Args:
+            cache: (StatementCache) the cache of compiled statements
+            func_set: (object) function set
+            statements: (string) statements separated by ";"
+
+        Returns:
+            (tuple) callables function(caller, obj, kwargs)
+        """
+        compiled = cache.get(statements)
+        if compiled is None:
+            compiled = compile_statements(func_set, statements)
+            cache.add(statements, compiled)
+
+        return compiled
+
 
 STATEMENT_HANDLER = StatementHandler()
@@ -0,0 +1,117 @@
+"""
+Unit tests of statements.
+"""
+
+from django.test import TestCase
+from muddery.statements.statement_function import StatementFunction
+from muddery.statements.statement_func_set import BaseStatementFuncSet
+from muddery.statements.statement_compiler import compile_condition, compile_statements
+from muddery.statements.statement_compiler import StatementCache, StatementCompileError
+from muddery.statements.statement_handler import StatementHandler
+
+
+class FuncHasFlag(StatementFunction):
+    key = "has_flag"
+    const = True
+
+    def func(self):
+        return self.args[0] in self.caller.flags
+
+
+class FuncFlagCount(StatementFunction):
+    key = "flag_count"
+    const = True
+
+    def func(self):
+        return len(self.caller.flags)
+
+
+class FuncRaise(StatementFunction):
+    key = "raise_error"
+    const = True
+
+    def func(self):
+        raise ValueError("error")
+
+
+class FuncAddFlag(StatementFunction):
+    key = "add_flag"
+    const = False
+
+    def func(self):
+        self.caller.flags.add(self.args[0])
+
+
+class TestFuncSet(BaseStatementFuncSet):
+    def at_creation(self):
+        self.add(FuncHasFlag)
+        self.add(FuncFlagCount)
+        self.add(FuncRaise)
+        self.add(FuncAddFlag)
+
+
+class FakeCaller(object):
+    def __init__(self, *flags):
+        self.flags = set(flags)
+
+
+class TestConditionCompiler(TestCase):
+    def setUp(self):
+        self.func_set = TestFuncSet()
+        self.handler = StatementHandler()
+        self.handler.condition_func_set = self.func_set
+        self.handler.condition_cache.clear()
+
+    def check(self, condition, caller):
+        return compile_condition(self.func_set, condition)(caller, None, {})
+
+    def test_function(self):
+        self.assertTrue(self.check('has_flag("a")', FakeCaller("a")))
+        self.assertFalse(self.check('has_flag("a")', FakeCaller("b")))
+
+    def test_expression(self):
+        caller = FakeCaller("a", "b")
+        self.assertTrue(self.check('has_flag("a") and has_flag("b")', caller))
+        self.assertTrue(self.check('has_flag("c") or not has_flag("d")', caller))
+        self.assertFalse(self.check('has_flag("a") and (has_flag("c") or has_flag("d"))', caller))
+        self.assertTrue(self.check('1 < flag_count() <= 2', caller))
+        self.assertEqual(self.check('flag_count() * 2 + 1', caller), 5)
+
+    def test_function_error(self):
+        self.assertFalse(self.check('raise_error()', FakeCaller()))
+        self.assertTrue(self.check('not raise_error()', FakeCaller()))
+
+    def test_compile_error(self):
+        self.assertRaises(StatementCompileError, compile_condition, self.func_set, 'has_flag(')
+        self.assertRaises(StatementCompileError, compile_condition, self.func_set, '().__class__')
+        self.assertRaises(StatementCompileError, compile_condition, self.func_set, 'has_flag(x)')
+        self.assertFalse(self.handler.match_condition('has_flag(', FakeCaller(), None))
+
+    def test_cache(self):
+        cache = StatementCache(2)
+        cache.add("a", 1)
+        cache.add("b", 2)
+        cache.get("a")
+        cache.add("c", 3)
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.get("a"), 1)
+        self.assertEqual(cache.get("b"), None)
+
+        self.handler.match_condition('has_flag("a")', FakeCaller("a"), None)
+        self.handler.match_condition('has_flag("a")', FakeCaller("b"), None)
+        self.assertEqual(len(self.handler.condition_cache), 1)
+
+
+class TestStatementCompiler(TestCase):
+    def setUp(self):
+        self.func_set = TestFuncSet()
+        self.handler = StatementHandler()
+        self.handler.action_func_set = self.func_set
+        self.handler.action_cache.clear()
+
+    def test_statements(self):
+        caller = FakeCaller()
+        self.handler.do_action('add_flag("a"); raise_error(); add_flag(; add_flag("b")', caller, None)
+        self.assertEqual(caller.flags, {"a", "b"})
+        self.assertEqual(len(compile_statements(self.func_set, 'flag_count;add_flag("c")')), 2)
+        self.assertEqual(len(self.handler.action_cache), 1)
@@ -13,8 +13,8 @@ from muddery.utils.dialogue_handler import DIALOGUE_HANDLER
 from muddery.utils.loot_handler import LootHandler
 from muddery.utils.localized_strings_handler import LS
 from muddery.utils.game_settings import GAME_SETTINGS
+from muddery.utils.world_data_handler import WORLD_DATA_HANDLER
 from django.conf import settings
-from django.apps import apps
 from evennia.utils import logger
 from evennia.utils.utils import lazy_property
 
@@ -58,11 +58,7 @@ class MudderyQuest(MudderyObject):
             return
 
         # Get objectives.
-        obj_records = []
-        model_objectives = apps.get_model(settings.WORLD_DATA_APP, settings.QUEST_OBJECTIVES)
-        if model_objectives:
-            # Get records.
-            obj_records = model_objectives.objects.filter(quest=key)
+        obj_records = WORLD_DATA_HANDLER.filter(settings.QUEST_OBJECTIVES, quest=key)
 
         for obj_record in obj_records:
             objective_type = obj_record.type
@@ -73,7 +69,7 @@ class MudderyQuest(MudderyObject):
                          "desc": obj_record.desc}
             self.objectives[obj_record.ordinal] = objective
 
-            accomplished = self.db.accomplished.get(key, 0)
+            accomplished = self.db.accomplished.get(obj_record.ordinal, 0)
             if accomplished < obj_record.number:
                 if not objective_type in self.not_accomplished:
                     self.not_accomplished[objective_type] = [obj_record.ordinal]
@@ -89,91 +85,85 @@ class MudderyQuest(MudderyObject):
             commands.append({"name": LS("Give Up"), "cmd": "giveup_quest", "args": self.get_data_key()})
         return commands
 
+    def get_objective_descriptors(self):
+        """
+        Get the descriptors of all objectives. Descriptors are the same to all
+        quests of the same key, so they are cached in world data's caches.
+
+        Returns:
+            (list) a list of (objective's ordinal, descriptor), the descriptor is
+            None if the objective can not be shown.
+        """
+        cache = WORLD_DATA_HANDLER.get_cache("quest_objectives")
+        cache_key = (self.get_data_key(), settings.LANGUAGE_CODE)
+        if cache_key in cache:
+            return cache[cache_key]
+
+        descriptors = []
+        for ordinal in self.objectives:
+            objective = self.objectives[ordinal]
+            descriptor = None
+
+            if objective["desc"]:
+                # If an objective has desc, use its desc.
+                descriptor = {"desc": objective["desc"]}
+            elif objective["type"] == defines.OBJECTIVE_TALK:
+                # talking
+                descriptor = {"target": LS("Talk to"),
+                              "object": DIALOGUE_HANDLER.get_npc_name(objective["object"])}
+            elif objective["type"] == defines.OBJECTIVE_OBJECT:
+                # getting
+                descriptor = {"target": LS("Get"),
+                              "object": self.get_object_name(objective["object"],
+                                                             settings.COMMON_OBJECTS)}
+            elif objective["type"] == defines.OBJECTIVE_KILL:
+                # killing
+                descriptor = {"target": LS("Kill"),
+                              "object": self.get_object_name(objective["object"],
+                                                             settings.COMMON_OBJECTS + (settings.WORLD_NPCS,))}
+
+            if descriptor and "desc" not in descriptor:
+                descriptor["total"] = objective["number"]
+
+            descriptors.append((ordinal, descriptor))
+
+        cache[cache_key] = descriptors
+        return descriptors
+
+    def get_object_name(self, object_key, model_names):
+        """
+        Get the name of an object in world data.
+
+        Args:
+            object_key: (string) object's key
+            model_names: (list) models to find the object in
+
+        Returns:
+            (string) object's name
+        """
+        for model_name in model_names:
+            record = WORLD_DATA_HANDLER.get(model_name, object_key)
+            if record:
+                return record.name
+
+        return ""
+
     def return_objectives(self):
         """
         Get the information of all objectives.
         Set desc to an objective can hide the details of the objective.
         """
         objectives = []
-        for ordinal in self.objectives:
-            desc = self.objectives[ordinal]["desc"]
-            if desc:
-                # If an objective has desc, use its desc.
-                objectives.append({"desc": self.objectives[ordinal]["desc"]})
+        for ordinal, descriptor in self.get_objective_descriptors():
+            if not descriptor:
+                continue
+
+            if "desc" in descriptor:
+                objectives.append(descriptor.copy())
             else:
-                # Or make a desc by other data.
-                obj_num = self.objectives[ordinal]["number"]
-                accomplished = self.db.accomplished.get(ordinal, 0)
-                
-                if self.objectives[ordinal]["type"] == defines.OBJECTIVE_TALK:
-                    # talking
-                    target = LS("Talk to")
-                    name = DIALOGUE_HANDLER.get_npc_name(self.objectives[ordinal]["object"])
-        
-                    objectives.append({"target": target,
-                                       "object": name,
-                                       "accomplished": accomplished,
-                                       "total": obj_num,
-                                       })
-                elif self.objectives[ordinal]["type"] == defines.OBJECTIVE_OBJECT:
-                    # getting
-                    target = LS("Get")
-                    name = ""
-                    
-                    # Get the name of the objective object.
-                    for model_name in settings.COMMON_OBJECTS:
-                        model = apps.get_model(settings.WORLD_DATA_APP, model_name)
-                        if model:
-                            # Get record.
-                            try:
-                                record = model.objects.get(key=self.objectives[ordinal]["object"])
-                                name = record.name
-                                break
-                            except Exception, e:
-                                pass
-        
-                    objectives.append({"target": target,
-                                       "object": name,
-                                       "accomplished": accomplished,
-                                       "total": obj_num,
-                                       })
-                elif self.objectives[ordinal]["type"] == defines.OBJECTIVE_KILL:
-                    # getting
-                    target = LS("Kill")
-                    name = ""
-
-                    # Get the name of the objective character.
-                    for model_name in settings.COMMON_OBJECTS:
-                        # find in common objects
-                        model = apps.get_model(settings.WORLD_DATA_APP, model_name)
-                        if model:
-                            # Get record.
-                            try:
-                                record = model.objects.get(key=self.objectives[ordinal]["object"])
-                                name = record.name
-                                break
-                            except Exception, e:
-                                pass
-
-                    if not name:
-                        # find in world_npcs
-                        for model_name in settings.WORLD_NPCS:
-                            # find in common objects
-                            model = apps.get_model(settings.WORLD_DATA_APP, model_name)
-                            if model:
-                                # Get record.
-                                try:
-                                    record = model.objects.get(key=self.objectives[ordinal]["object"])
-                                    name = record.name
-                                    break
-                                except Exception, e:
-                                    pass
-
-                    objectives.append({"target": target,
-                                       "object": name,
-                                       "accomplished": accomplished,
-                                       "total": obj_num,
-                                       })
+                objective = descriptor.copy()
+                objective["accomplished"] = self.db.accomplished.get(ordinal, 0)
+                objectives.append(objective)
 
         return objectives
 
@@ -216,6 +206,47 @@ class MudderyQuest(MudderyObject):
         if obj_list:
             owner.remove_objects(obj_list)
 
+    def get_not_accomplished_objectives(self):
+        """
+        Get objectives that are not accomplished.
+
+        Returns:
+            (list) a list of (objective's type, object's key, objective's ordinal)
+        """
+        objectives = []
+        for type in self.not_accomplished:
+            for ordinal in self.not_accomplished[type]:
+                objectives.append((type, self.objectives[ordinal]["object"], ordinal))
+
+        return objectives
+
+    def add_accomplished(self, ordinal, number=1):
+        """
+        Add the accomplished number of an objective.
+
+        Args:
+            ordinal: (int) objective's ordinal
+            number: (int) the number of the object
+
+        Returns:
+            if the objective is accomplished.
+        """
+        accomplished = self.db.accomplished.get(ordinal, 0)
+        accomplished += number
+        self.db.accomplished[ordinal] = accomplished
+
+        if accomplished < self.objectives[ordinal]["number"]:
+            return False
+
+        # if this objectives is accomplished, remove it
+        type = self.objectives[ordinal]["type"]
+        if ordinal in self.not_accomplished.get(type, []):
+            self.not_accomplished[type].remove(ordinal)
+            if not self.not_accomplished[type]:
+                del(self.not_accomplished[type])
+
+        return True
+
     def at_objective(self, type, object_key, number=1):
         """
         Called when the owner may complete some objectives.
@@ -232,30 +263,12 @@ class MudderyQuest(MudderyObject):
             return False
 
         status_changed = False
-        index = 0
 
         # search all object objectives
-        while index < len(self.not_accomplished[type]):
-            ordinal = self.not_accomplished[type][index]
-            index += 1
-
+        for ordinal in list(self.not_accomplished[type]):
             if self.objectives[ordinal]["object"] == object_key:
                 # if this object matches an objective
                 status_changed = True
+                self.add_accomplished(ordinal, number)
 
-                # add accomplished number
-                accomplished = self.db.accomplished.get(ordinal, 0)
-                accomplished += number
-                self.db.accomplished[ordinal] = accomplished
-
-                if self.db.accomplished[ordinal] >= self.objectives[ordinal]["number"]:
-                    # if this objectives is accomplished, remove it
-                    index -= 1
-                    del(self.not_accomplished[type][index])
-                                                                    
-                    if not self.not_accomplished[type]:
-                        # if all objectives are accomplished
-                        del(self.not_accomplished[type])
-                        break
-                                                                                
         return status_changed
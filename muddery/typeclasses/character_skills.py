@@ -102,7 +102,37 @@ class MudderySkill(MudderyObject):
             # Set skill cd. Add gcd to new the skill.
             gcd = GAME_SETTINGS.get("global_cd")
             if gcd > 0:
-                self.db.cd_finish_time = time.time() + gcd
+                self.set_cd_finish_time(time.time() + gcd)
+
+    def get_cd_finish_time(self):
+        """
+        Get the time when the skill's cd finishes. Skills' cd are kept by
+        owners' skill handlers.
+
+        Returns:
+            (float) the finish time
+        """
+        owner = self.db.owner
+        if owner:
+            return owner.skill_handler.get_cd_finish_time(self.get_data_key())
+
+        return self.db.cd_finish_time or 0
+
+    def set_cd_finish_time(self, finish_time):
+        """
+        Set the time when the skill's cd finishes.
+
+        Args:
+            finish_time: (float) the finish time
+
+        Returns:
+            None
+        """
+        owner = self.db.owner
+        if owner:
+            owner.skill_handler.set_cd_finish_time(self.get_data_key(), finish_time)
+        else:
+            self.db.cd_finish_time = finish_time
 
     def cast_skill(self, target):
         """
@@ -120,7 +150,7 @@ class MudderySkill(MudderyObject):
         time_now = time.time()
 
         if not self.passive:
-            if time_now < self.db.cd_finish_time:
+            if time_now < self.get_cd_finish_time():
                 # skill in CD
                 if owner:
                     owner.msg({"msg": LS("This skill is not ready yet!")})
@@ -135,7 +165,7 @@ class MudderySkill(MudderyObject):
             # set cd
             time_now = time.time()
             if self.cd > 0:
-                self.db.cd_finish_time = time_now + self.cd
+                self.set_cd_finish_time(time_now + self.cd)
 
         return
 
@@ -172,9 +202,8 @@ class MudderySkill(MudderyObject):
         If this skill is cooling down.
         """
         if self.cd > 0:
-            if self.db.cd_finish_time:
-                if time.time() < self.db.cd_finish_time:
-                    return True
+            if time.time() < self.get_cd_finish_time():
+                return True
         return False
 
     def get_remain_cd(self):
@@ -184,7 +213,7 @@ class MudderySkill(MudderyObject):
         Returns:
             (float) Remain CD in seconds.
         """
-        remain_cd = self.db.cd_finish_time - time.time()
+        remain_cd = self.get_cd_finish_time() - time.time()
         if remain_cd < 0:
             remain_cd = 0
         return remain_cd
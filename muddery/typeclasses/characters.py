@@ -12,7 +12,6 @@ from __future__ import print_function
 
 import random
 from django.conf import settings
-from django.apps import apps
 from evennia.objects.objects import DefaultCharacter
 from evennia import create_script
 from evennia.utils import logger
@@ -21,8 +20,10 @@ from muddery.typeclasses.objects import MudderyObject
 from muddery.utils.localized_strings_handler import LS
 from muddery.utils import utils
 from muddery.utils.builder import build_object
+from muddery.utils.combat_clone_pool import COMBAT_CLONE_POOL
 from muddery.utils.skill_handler import SkillHandler
 from muddery.utils.loot_handler import LootHandler
+from muddery.utils.world_data_handler import WORLD_DATA_HANDLER
 
 
 class MudderyCharacter(MudderyObject, DefaultCharacter):
@@ -55,6 +56,20 @@ class MudderyCharacter(MudderyObject, DefaultCharacter):
     def loot_handler(self):
         return LootHandler(self, settings.CHARACTER_LOOT_LIST)
 
+    def at_server_reload(self):
+        """
+        Save data kept in memory before the server reloads.
+        """
+        super(MudderyCharacter, self).at_server_reload()
+        self.skill_handler.save_cd()
+
+    def at_server_shutdown(self):
+        """
+        Save data kept in memory before the server shuts down.
+        """
+        super(MudderyCharacter, self).at_server_shutdown()
+        self.skill_handler.save_cd()
+
     def at_object_creation(self):
         """
         Called once, when this object is first created. This is the
@@ -103,11 +118,9 @@ class MudderyCharacter(MudderyObject, DefaultCharacter):
         self.db.position_names = {}
 
         # reset equipment's position
-        model_position = apps.get_model(settings.WORLD_DATA_APP, settings.EQUIPMENT_POSITIONS)
-        if model_position:
-            for record in model_position.objects.all():
-                positions.append(record.key)
-                self.db.position_names[record.key] = record.name
+        for record in WORLD_DATA_HANDLER.all(settings.EQUIPMENT_POSITIONS):
+            positions.append(record.key)
+            self.db.position_names[record.key] = record.name
 
         for position in self.db.equipments:
             if position not in positions:
@@ -180,9 +193,8 @@ class MudderyCharacter(MudderyObject, DefaultCharacter):
             model_name = self.get_data_key()
 
         try:
-            # get data from db
-            model_obj = apps.get_model(settings.WORLD_DATA_APP, settings.CHARACTER_MODELS)
-            model_data = model_obj.objects.get(key=model_name, level=self.db.level)
+            # get level data
+            model_data = WORLD_DATA_HANDLER.filter(settings.CHARACTER_MODELS, key=model_name, level=self.db.level)[0]
 
             reserved_fields = {"id", "key", "level"}
             for field in model_data._meta.fields:
@@ -250,11 +262,7 @@ class MudderyCharacter(MudderyObject, DefaultCharacter):
             model_name = self.get_data_key()
 
         # default skills
-        skill_records = []
-        default_skills = apps.get_model(settings.WORLD_DATA_APP, settings.DEFAULT_SKILLS)
-        if default_skills:
-            # Get records.
-            skill_records = default_skills.objects.filter(character=model_name)
+        skill_records = WORLD_DATA_HANDLER.filter(settings.DEFAULT_SKILLS, character=model_name)
 
         default_skill_ids = set([record.skill for record in skill_records])
 
@@ -354,7 +362,7 @@ class MudderyCharacter(MudderyObject, DefaultCharacter):
     def auto_cast_skill(self):
         """
         Auto cast an available skill.
-        Put this method on the character because TICKER_HANDLER needs a typeclass.
+        The combat engine calls this method when the character's cd is over.
 
         Returns:
             None
@@ -495,8 +503,8 @@ class MudderyCharacter(MudderyObject, DefaultCharacter):
 
     def attack_clone_target(self, target_key, target_level=0, desc=""):
         """
-        Attack the image of a target. This creates a new character object for attack.
-        The origin target will not be affected.
+        Attack the image of a target. This gets a clone of the target from the clone
+        pool for attack. The origin target will not be affected.
 
         Args:
             target_key: (string) the info key of the target.
@@ -515,8 +523,8 @@ class MudderyCharacter(MudderyObject, DefaultCharacter):
             obj = obj[0]
             target_level = obj.db.level
 
-        # Create a target.
-        target = build_object(target_key)
+        # Get a clone of the target.
+        target = COMBAT_CLONE_POOL.acquire(target_key)
         if not target:
             logger.log_errmsg("Can not create the target %s." % target_key)
             return False
@@ -611,6 +619,31 @@ class MudderyCharacter(MudderyObject, DefaultCharacter):
         # remove combat commands
         self.cmdset.delete("muddery.commands.default_cmdsets.CombatCmdSet")
 
+        if self.is_combat_clone():
+            # put the clone back to the pool
+            COMBAT_CLONE_POOL.release(self)
+
+    def set_location(self, location):
+        """
+        Set character's location. Combat clones stay out of the world.
+
+        Args:
+            location: (string) Location's name. Must be the key of data info.
+        """
+        if self.is_combat_clone():
+            return
+
+        super(MudderyCharacter, self).set_location(location)
+
+    def is_combat_clone(self):
+        """
+        Check if the character is a clone created for combats.
+
+        Returns:
+            (boolean) is a clone or not
+        """
+        return bool(self.tags.get(category=settings.COMBAT_CLONE_CATEGORY))
+
     def is_in_combat(self):
         """
         Check if the character is in combat.
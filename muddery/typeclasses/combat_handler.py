@@ -8,9 +8,11 @@ import random
 import traceback
 from django.conf import settings
 from evennia import DefaultScript
-from evennia import TICKER_HANDLER
 from evennia.utils import logger
+from evennia.utils.utils import delay
 from muddery.utils import builder, defines
+from muddery.utils.combat_engine import COMBAT_ENGINE
+from muddery.utils.loot_handler import roll_loots
 
 
 class MudderyCombatHandler(DefaultScript):
@@ -25,12 +27,39 @@ class MudderyCombatHandler(DefaultScript):
         self.interval = 0  # keep running until the battle ends
         self.persistent = True
 
-        # store all combatants
+        # store all combatants, they are saved only when the server stops
         self.db.characters = {}
+        self.ndb.characters = {}
 
         # if battle is finished
         self.db.finished = False
 
+    @property
+    def characters(self):
+        """
+        Combatants are kept in memory while the combat is running.
+        """
+        if self.ndb.characters is None:
+            # Load combatants after the server restarted.
+            self.ndb.characters = dict(self.db.characters or {})
+        return self.ndb.characters
+
+    def _init_outbox(self):
+        """
+        Messages to players are buffered during a command or a tick of the
+        combat engine, then they are merged into one message per player.
+        """
+        self.ndb.skill_results = []
+
+        # characters whose status changed, dbref -> character
+        self.ndb.status_changed = {}
+
+        # the status sent to each player in this combat, dbref -> status
+        self.ndb.sent_status = {}
+
+        self.ndb.combat_info_changed = False
+        self.ndb.flush_call = None
+
     def _init_character(self, character):
         """
         This initializes handler back-reference 
@@ -53,16 +82,31 @@ class MudderyCombatHandler(DefaultScript):
         after a server reboot. We need to re-assign this combat handler to 
         all characters as well as re-assign the cmdset.
         """
-        for character in self.db.characters.values():
+        self._init_outbox()
+
+        for character in self.characters.values():
             self._init_character(character)
+
+        if self.characters:
+            COMBAT_ENGINE.add_combat(self)
         self.start_combat()
 
     def at_stop(self):
         "Called just before the script is stopped/destroyed."
-        for character in self.db.characters.values():
-            # note: the list() call above disconnects list from database
+        COMBAT_ENGINE.remove_combat(self)
+        self.flush_messages()
+
+        for character in self.characters.values():
             self._cleanup_character(character)
 
+    def at_server_reload(self):
+        "Save combatants before the server reloads."
+        self.db.characters = self.characters
+
+    def at_server_shutdown(self):
+        "Save combatants before the server shuts down."
+        self.db.characters = self.characters
+
 
     # Combat-handler methods
 
@@ -90,18 +134,20 @@ class MudderyCombatHandler(DefaultScript):
         for team in teams:
             for character in teams[team]:
                 character.set_team(team)
-                self.db.characters[character.dbref] = character
+                self.characters[character.dbref] = character
 
-        for character in self.db.characters.values():
+        for character in self.characters.values():
             self._init_character(character)
 
+        COMBAT_ENGINE.add_combat(self)
         self.start_combat()
 
     def remove_character(self, character):
         "Remove combatant from handler"
-        if character.dbref in self.db.characters:
+        if character.dbref in self.characters:
+            self.flush_messages()
             self._cleanup_character(character)
-            del self.db.characters[character.dbref]
+            del self.characters[character.dbref]
 
             if self.can_finish():
                 # if we have no more characters in battle, kill this handler
@@ -109,7 +155,7 @@ class MudderyCombatHandler(DefaultScript):
 
     def msg_all(self, message):
         "Send message to all combatants"
-        for character in self.db.characters.values():
+        for character in self.characters.values():
             character.msg(message)
 
     def can_finish(self):
@@ -119,14 +165,14 @@ class MudderyCombatHandler(DefaultScript):
 
         Return True or False
         """
-        if not self.db.characters:
+        if not self.characters:
             return False
 
-        if not len(self.db.characters):
+        if not len(self.characters):
             return False
 
         teams = set()
-        for character in self.db.characters.values():
+        for character in self.characters.values():
             if character.is_alive():
                 teams.add(character.get_team())
                 if len(teams) > 1:
@@ -143,24 +189,30 @@ class MudderyCombatHandler(DefaultScript):
             self.finish()
             return
 
-        for character in self.db.characters.values():
+        for character in self.characters.values():
             character.at_combat_start()
 
     def finish(self):
         """
         Finish a combat. Send results to players, and kill all failed characters.
         """
-        if self.db.characters:
+        # Send the last skills' results before the combat's results.
+        self.flush_messages()
+
+        if self.characters:
             # get winners and losers
             winner_team = None
-            for character in self.db.characters.values():
+            for character in self.characters.values():
                 if character.is_alive():
                     winner_team = character.get_team()
                     break
 
-            winners = [c for c in self.db.characters.values() if c.get_team() == winner_team]
-            losers = [c for c in self.db.characters.values() if c.get_team() != winner_team]
-            
+            winners = [c for c in self.characters.values() if c.get_team() == winner_team]
+            losers = [c for c in self.characters.values() if c.get_team() != winner_team]
+
+            # Roll loots before losers die.
+            self.prepare_loots(winners, losers)
+
             for character in winners:
                 character.at_combat_win(winners, losers)
                 
@@ -170,6 +222,38 @@ class MudderyCombatHandler(DefaultScript):
         self.db.finished = True
         self.stop()
 
+    def prepare_loots(self, winners, losers):
+        """
+        Roll loots of all player winners from all losers at once.
+
+        Args:
+            winners: (List) all combat winners.
+            losers: (List) all combat losers.
+
+        Returns:
+            None
+        """
+        looters = [c for c in winners if c.is_typeclass(settings.BASE_CHARACTER_TYPECLASS, exact=False)]
+        rolls = [(loser.loot_handler, looter) for looter in looters for loser in losers]
+
+        # looter's dbref -> dropped objects
+        loots = {}
+        for (loot_handler, looter), obj_list in zip(rolls, roll_loots(rolls)):
+            loots.setdefault(looter.dbref, []).extend(obj_list)
+        self.ndb.loots = loots
+
+    def get_loots(self, looter):
+        """
+        Get objects dropped for a winner when the combat finished.
+
+        Args:
+            looter: (object) a winner
+
+        Returns:
+            (list) a list of dropped objects
+        """
+        return (self.ndb.loots or {}).get(looter.dbref, [])
+
     def get_appearance(self):
         """
         Get the combat appearance.
@@ -177,7 +261,7 @@ class MudderyCombatHandler(DefaultScript):
         appearance = {"characters": [],
                       "desc": self.db.desc}
         
-        for character in self.db.characters.values():
+        for character in self.characters.values():
             info = {"dbref": character.dbref,
                     "name": character.get_name(),
                     "max_hp": character.max_hp,
@@ -194,19 +278,17 @@ class MudderyCombatHandler(DefaultScript):
         """
         Get all characters in combat.
         """
-        if not self.db.characters:
+        if not self.characters:
             return []
 
-        return self.db.characters.values()
+        return self.characters.values()
 
     def msg_all_combat_info(self):
         """
         Send combat info to all player characters.
         """
-        appearance = self.get_appearance()
-        for character in self.db.characters.values():
-            if character.has_player:
-                character.msg({"combat_info": appearance})
+        self.ndb.combat_info_changed = True
+        self.schedule_flush()
 
     def prepare_skill(self, skill_key, caller, target):
         """
@@ -230,12 +312,13 @@ class MudderyCombatHandler(DefaultScript):
             None
         """
         if caller:
+            self.flush_messages()
             caller.at_combat_escape()
 
             # Skill function will call finish func later, so should not check finish here.
-            if caller.dbref in self.db.characters:
+            if caller.dbref in self.characters:
                 self._cleanup_character(caller)
-                del self.db.characters[caller.dbref]
+                del self.characters[caller.dbref]
             
     def send_skill_result(self, result):
         """
@@ -247,6 +330,75 @@ class MudderyCombatHandler(DefaultScript):
         Returns:
             None
         """
-        for character in self.db.characters.values():
-            if character.has_player:
-                character.msg({"skill_result": result})
+        self.ndb.skill_results.append(result)
+        self.schedule_flush()
+
+    def show_status(self, character):
+        """
+        Send the character's status to its player.
+
+        Args:
+            character: (object) the character whose status changed
+
+        Returns:
+            None
+        """
+        self.ndb.status_changed[character.dbref] = character
+        self.schedule_flush()
+
+    def schedule_flush(self):
+        """
+        Send buffered messages after the current command or tick.
+        """
+        if not self.ndb.flush_call:
+            self.ndb.flush_call = delay(0, self.flush_messages)
+
+    def flush_messages(self):
+        """
+        Send buffered messages. Each player gets one message with all skills'
+        results and changed fields of its status.
+        """
+        flush_call = self.ndb.flush_call
+        if flush_call and flush_call.active():
+            flush_call.cancel()
+        self.ndb.flush_call = None
+
+        skill_results = self.ndb.skill_results
+        status_changed = self.ndb.status_changed
+        combat_info_changed = self.ndb.combat_info_changed
+        if not (skill_results or status_changed or combat_info_changed):
+            return
+
+        self.ndb.skill_results = []
+        self.ndb.status_changed = {}
+        self.ndb.combat_info_changed = False
+
+        appearance = None
+        if combat_info_changed:
+            appearance = self.get_appearance()
+
+        for character in self.characters.values():
+            if not character.has_player:
+                continue
+
+            message = {}
+            if skill_results:
+                message["skill_results"] = skill_results
+
+            if appearance:
+                message["combat_info"] = appearance
+
+            if character.dbref in status_changed:
+                status = character.return_status()
+                sent_status = self.ndb.sent_status.get(character.dbref)
+                if sent_status is None:
+                    message["status"] = status
+                else:
+                    delta = dict((key, value) for key, value in status.iteritems()
+                                 if sent_status.get(key) != value)
+                    if delta:
+                        message["status_delta"] = delta
+                self.ndb.sent_status[character.dbref] = status
+
+            if message:
+                character.msg(message)
@@ -95,6 +95,10 @@ class MudderyMonster(MudderyCharacter):
         """
         try:
             super(MudderyMonster, self).die(killers)
+
+            if self.is_combat_clone():
+                # Clones go back to the clone pool after the combat.
+                return
             
             # delete itself and notify its location
             location = self.location
@@ -6,7 +6,6 @@ MudderyNPC is NPC's base class.
 import json
 import traceback
 from django.conf import settings
-from django.apps import apps
 from evennia import TICKER_HANDLER
 from evennia.utils import logger
 from muddery.typeclasses.characters import MudderyCharacter
@@ -14,6 +13,7 @@ from muddery.utils.localized_strings_handler import LS
 from muddery.utils.dialogue_handler import DIALOGUE_HANDLER
 from muddery.utils.builder import build_object, delete_object
 from muddery.utils.game_settings import GAME_SETTINGS
+from muddery.utils.world_data_handler import WORLD_DATA_HANDLER
 
 
 class MudderyNPC(MudderyCharacter):
@@ -52,12 +52,8 @@ class MudderyNPC(MudderyCharacter):
         """
         Load dialogues.
         """
-        dialogues = []
-        model_npc_dialogues = apps.get_model(settings.WORLD_DATA_APP, settings.NPC_DIALOGUES)
-        if model_npc_dialogues:
-            # Get records.
-            npc_key = self.get_data_key()
-            dialogues = model_npc_dialogues.objects.filter(npc=npc_key)
+        npc_key = self.get_data_key()
+        dialogues = WORLD_DATA_HANDLER.filter(settings.NPC_DIALOGUES, npc=npc_key)
 
         self.default_dialogues = [dialogue.dialogue for dialogue in dialogues if dialogue.default]
         self.dialogues = [dialogue.dialogue for dialogue in dialogues if not dialogue.default]
@@ -67,11 +63,7 @@ class MudderyNPC(MudderyCharacter):
         Load character's shop.
         """
         # shops records
-        shop_records = []
-        nps_shops_model = apps.get_model(settings.WORLD_DATA_APP, settings.NPC_SHOPS)
-        if nps_shops_model:
-            # Get records.
-            shop_records = nps_shops_model.objects.filter(npc=self.get_data_key())
+        shop_records = WORLD_DATA_HANDLER.filter(settings.NPC_SHOPS, npc=self.get_data_key())
 
         shop_keys = set([record.shop for record in shop_records])
 
@@ -128,6 +120,10 @@ class MudderyNPC(MudderyCharacter):
         """
         super(MudderyNPC, self).die(killers)
 
+        if self.is_combat_clone():
+            # Clones go back to the clone pool after the combat.
+            return
+
         location = self.location
 
         if self.reborn_cd <= 0:
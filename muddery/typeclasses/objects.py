@@ -10,7 +10,6 @@ import json
 import ast
 from django.conf import settings
 from django.db import models
-from django.apps import apps
 from evennia.objects.objects import DefaultObject
 from evennia.utils import logger
 from evennia.utils.utils import to_str
@@ -22,9 +21,12 @@ from muddery.utils.data_field_handler import DataFieldHandler
 from muddery.utils import utils
 from muddery.utils.exception import MudderyError
 from muddery.utils.object_key_handler import OBJECT_KEY_HANDLER
+from muddery.utils.world_data_handler import WORLD_DATA_HANDLER
+from muddery.utils.object_index_handler import OBJECT_INDEX_HANDLER
 from muddery.utils.event_handler import EventHandler
 from muddery.utils.localized_strings_handler import LS
 from muddery.utils.game_settings import GAME_SETTINGS
+from muddery.server.conf.serversession import encode_message
 
 
 class MudderyObject(DefaultObject):
@@ -102,6 +104,16 @@ class MudderyObject(DefaultObject):
         """
         pass
 
+    def delete(self):
+        """
+        Deletes this object and removes it from the data key index.
+        """
+        obj_id = self.id
+        result = super(MudderyObject, self).delete()
+        if result:
+            OBJECT_INDEX_HANDLER.remove_object(obj_id)
+        return result
+
     def at_post_unpuppet(self, player, session=None):
         """
         We stove away the character when the player goes ooc/logs off,
@@ -187,16 +199,9 @@ class MudderyObject(DefaultObject):
         models = OBJECT_KEY_HANDLER.get_models(key)
 
         for model in models:
-            # Get db model
-            model_obj = apps.get_model(settings.WORLD_DATA_APP, model)
-            if not model_obj:
-                logger.log_errmsg("%s can not open model %s" % (key, model))
-                continue
-
             # Get data record.
-            try:
-                data = model_obj.objects.get(key=key)
-            except Exception, e:
+            data = WORLD_DATA_HANDLER.get(model, key)
+            if not data:
                 logger.log_errmsg("%s can not find key %s" % (key, key))
                 continue
 
@@ -242,12 +247,9 @@ class MudderyObject(DefaultObject):
             typeclass_key: (string) Typeclass's key.
         """
         typeclass_path = ""
-        try:
-            model_typeclass = apps.get_model(settings.WORLD_DATA_APP, settings.TYPECLASSES)
-            data = model_typeclass.objects.get(key=typeclass_key)
+        data = WORLD_DATA_HANDLER.get(settings.TYPECLASSES, typeclass_key)
+        if data:
             typeclass_path = data.path
-        except Exception, e:
-            pass
 
         if not typeclass_path:
             if typeclass_key:
@@ -417,10 +419,8 @@ class MudderyObject(DefaultObject):
         icon_key = getattr(self.dfield, "icon", None)
         if icon_key:
             try:
-                model_resource = apps.get_model(settings.WORLD_DATA_APP, settings.ICON_RESOURCES)
-                if model_resource:
-                    resource_info = model_resource.objects.get(key=icon_key)
-                    self.icon = resource_info.resource.url
+                resource_info = WORLD_DATA_HANDLER.get(settings.ICON_RESOURCES, icon_key)
+                self.icon = resource_info.resource.url
             except Exception, e:
                 logger.log_errmsg("Load icon %s error: %s" % (icon_key, e))
 
@@ -534,3 +534,69 @@ class MudderyObject(DefaultObject):
         sessions = make_iter(session) if session else self.sessions.all()
         for session in sessions:
             session.msg(text=text, **kwargs)
+
+    def msg_encoded(self, message, text, from_obj=None):
+        """
+        Emits a message which has already been encoded. Hooks get the
+        message, sessions get the encoded text.
+
+        Args:
+            message (str or dict): The message.
+            text (str): The message encoded by encode_message().
+            from_obj (obj, optional): object that is sending. If
+                given, at_msg_send will be called
+        """
+        # try send hooks
+        if from_obj:
+            try:
+                from_obj.at_msg_send(text=message, to_obj=self)
+            except Exception:
+                logger.log_trace()
+        try:
+            if not self.at_msg_receive(text=message):
+                # if at_msg_receive returns false, we abort message to this object
+                return
+        except Exception:
+            logger.log_trace()
+
+        # relay to session(s)
+        options = {"raw": True, "structured": True}
+        for session in self.sessions.all():
+            session.msg(text=text, options=options)
+
+    def msg_contents(self, message, exclude=None, from_obj=None, mapping=None, **kwargs):
+        """
+        Emits a message to all objects inside this object.
+
+        The message is the same to all receivers, so it is encoded only once
+        and the encoded text is sent to all receivers' sessions. Receivers'
+        hooks still get the message.
+
+        Args:
+            message (str or dict): Message to send.
+            exclude (list, optional): A list of objects not to send to.
+            from_obj (Object, optional): An object designated as the
+                "sender" of the message.
+            mapping (dict, optional): A mapping of formatting keys, the message
+                is formatted for each receiver.
+        """
+        if mapping or kwargs:
+            # Formatted messages and other send-commands are sent one by one.
+            super(MudderyObject, self).msg_contents(message, exclude=exclude, from_obj=from_obj,
+                                                    mapping=mapping, **kwargs)
+            return
+
+        contents = self.contents
+        if exclude:
+            exclude = make_iter(exclude)
+            contents = [obj for obj in contents if obj not in exclude]
+
+        if not contents:
+            return
+
+        text = encode_message(message)
+        for obj in contents:
+            if hasattr(obj, "msg_encoded"):
+                obj.msg_encoded(message, text, from_obj=from_obj)
+            else:
+                obj.msg(message, from_obj=from_obj)
@@ -11,7 +11,6 @@ creation commands.
 import traceback
 import random
 from django.conf import settings
-from django.apps import apps
 from muddery.typeclasses.characters import MudderyCharacter
 from muddery.typeclasses.common_objects import MudderyEquipment
 from muddery.utils import defines, utils
@@ -23,6 +22,8 @@ from muddery.utils.exception import MudderyError
 from muddery.utils.localized_strings_handler import LS
 from muddery.utils.game_settings import GAME_SETTINGS
 from muddery.utils.dialogue_handler import DIALOGUE_HANDLER
+from muddery.utils.world_data_handler import WORLD_DATA_HANDLER
+from muddery.utils.world_map_handler import WORLD_MAP_HANDLER
 from evennia.utils.utils import lazy_property
 from evennia.utils import logger
 from evennia import TICKER_HANDLER
@@ -70,20 +71,16 @@ class MudderyPlayerCharacter(MudderyCharacter):
         self.db.career = ""
         self.db.unlocked_exits = set()
         self.db.revealed_map = set()
+        self.db.revealed_history = []
 
         # set custom attributes
         self.db.attributes = {}
 
         # Choose a random career.
-        try:
-            model_career = apps.get_model(settings.WORLD_DATA_APP, settings.CHARACTER_CAREERS)
-            if model_career:
-                careers = model_career.objects.all()
-                if careers:
-                    career = random.choice(careers)
-                    self.db.career = career.key
-        except Exception, e:
-            pass
+        careers = WORLD_DATA_HANDLER.all(settings.CHARACTER_CAREERS)
+        if careers:
+            career = random.choice(careers)
+            self.db.career = career.key
         
     def load_data(self):
         """
@@ -163,8 +160,14 @@ class MudderyPlayerCharacter(MudderyCharacter):
                    "equipments": self.return_equipments(),
                    "inventory": self.return_inventory(),
                    "skills": self.return_skills(),
-                   "quests": self.quest_handler.return_quests(),
-                   "revealed_map": self.get_revealed_map()}
+                   "quests": self.quest_handler.return_quests()}
+
+        if settings.REVEALED_MAP_DELTA:
+            # The client requests the map with its cached map's version.
+            message["map_version"] = self.get_revealed_map_version()
+        else:
+            message["revealed_map"] = self.get_revealed_map()
+
         self.msg(message)
 
         self.show_location()
@@ -193,6 +196,9 @@ class MudderyPlayerCharacter(MudderyCharacter):
                           "name": self.get_name()}
                 self.location.msg_contents({"player_offline":change}, exclude=self)
 
+        # save skills' cd
+        self.skill_handler.save_cd()
+
     def set_nickname(self, nickname):
         """
         Set player character's nickname.
@@ -241,29 +247,79 @@ class MudderyPlayerCharacter(MudderyCharacter):
                           ...}
             }
         """
-        rooms = {}
-        exits = {}
+        revealed_map = WORLD_MAP_HANDLER.get_map(self.db.revealed_map)
+        revealed_map["version"] = self.get_revealed_map_version()
+        return revealed_map
+
+    def get_revealed_history(self):
+        """
+        Get the keys of revealed rooms in the order of revealing.
+        """
+        history = self.db.revealed_history
+        revealed_map = self.db.revealed_map
+        if history is None:
+            # Build the history of old characters.
+            self.db.revealed_history = sorted(revealed_map)
+            history = self.db.revealed_history
+        elif len(history) != len(revealed_map):
+            # The history does not match the revealed map. Keep the order which
+            # clients have seen and add missing rooms at the end, then clients
+            # need to load the whole map again.
+            recorded = set(history)
+            missing = sorted(room for room in revealed_map if room not in recorded)
+            self.db.revealed_history = [room for room in history if room in revealed_map] + missing
+            self.db.revealed_history_revision = (self.db.revealed_history_revision or 0) + 1
+            history = self.db.revealed_history
+        return history
+
+    def get_revealed_map_base_version(self):
+        """
+        Get the version of the character's revealed map without the number of revealed
+        rooms. It is the world map's version and the revision of the revealing history.
+        """
+        revision = self.db.revealed_history_revision
+        if not revision:
+            return WORLD_MAP_HANDLER.version
+        return "%s.%d" % (WORLD_MAP_HANDLER.version, revision)
+
+    def get_revealed_map_version(self):
+        """
+        Get the version of the character's revealed map. It is made up of the world map's
+        version, the revision of the revealing history and the number of revealed rooms.
+        """
+        return "%s:%d" % (self.get_revealed_map_base_version(), len(self.db.revealed_map))
+
+    def get_revealed_map_delta(self, client_version):
+        """
+        Get the changes of the revealed map since the version held by the client.
+
+        Args:
+            client_version: (string) the version of the client's map
+
+        Returns:
+            (dict) {"reveal_map": changes} if the client's map can be updated by changes,
+                   or {"revealed_map": the whole map}.
+        """
+        # Repair the history before comparing versions.
+        history = self.get_revealed_history()
 
-        for room_key in self.db.revealed_map:
-            # get room's information
-            room = utils.search_obj_data_key(room_key)
-            if room:
-                room = room[0]
-                rooms[room_key] = (room.get_name(), room.position)
+        version = self.get_revealed_map_version()
+        if client_version == version:
+            return {"reveal_map": {"rooms": {}, "exits": {}, "version": version}}
 
-                new_exits = room.get_exits()
-                if new_exits:
-                    exits.update(new_exits)
+        try:
+            map_version, count = client_version.split(":")
+            count = int(count)
+        except Exception:
+            map_version = None
 
-        for path in exits.values():
-            # add room's neighbours
-            if not path[1] in rooms:
-                neighbour = utils.search_obj_data_key(path[1])
-                if neighbour:
-                    neighbour = neighbour[0]
-                    rooms[neighbour.get_data_key()] = (neighbour.get_name(), neighbour.position)
+        if map_version != self.get_revealed_map_base_version() or count > len(self.db.revealed_map):
+            # The client's map is out of date.
+            return {"revealed_map": self.get_revealed_map()}
 
-        return {"rooms": rooms, "exits": exits}
+        reveal_map = WORLD_MAP_HANDLER.get_map(history[count:])
+        reveal_map["version"] = version
+        return {"reveal_map": reveal_map}
 
     def show_location(self):
         """
@@ -288,20 +344,13 @@ class MudderyPlayerCharacter(MudderyCharacter):
             reveal_map = None
             if not location_key in self.db.revealed_map:
                 # reveal map
-                self.db.revealed_map.add(self.location.get_data_key())
-
-                rooms = {location_key: (self.location.get_name(), self.location.position)}
-                exits = self.location.get_exits()
-
-                for path in exits.values():
-                    # add room's neighbours
-                    if not path[1] in rooms:
-                        neighbour = utils.search_obj_data_key(path[1])
-                        if neighbour:
-                            neighbour = neighbour[0]
-                            rooms[neighbour.get_data_key()] = (neighbour.get_name(), neighbour.position)
+                history = self.get_revealed_history()
+                self.db.revealed_map.add(location_key)
+                history.append(location_key)
 
-                msg["reveal_map"] = {"rooms": rooms, "exits": exits}
+                reveal_map = WORLD_MAP_HANDLER.get_map([location_key])
+                reveal_map["version"] = self.get_revealed_map_version()
+                msg["reveal_map"] = reveal_map
 
             # get appearance
             appearance = self.location.get_appearance(self)
@@ -320,11 +369,7 @@ class MudderyPlayerCharacter(MudderyCharacter):
             model_name = self.get_data_key()
         
         # default objects
-        object_records = []
-        default_objects = apps.get_model(settings.WORLD_DATA_APP, settings.DEFAULT_OBJECTS)
-        if default_objects:
-            # Get records.
-            object_records = default_objects.objects.filter(character=model_name)
+        object_records = WORLD_DATA_HANDLER.filter(settings.DEFAULT_OBJECTS, character=model_name)
 
         default_object_ids = set([record.object for record in object_records])
 
@@ -690,6 +735,11 @@ class MudderyPlayerCharacter(MudderyCharacter):
         """
         Send status to player.
         """
+        if self.ndb.combat_handler:
+            # The combat handler sends changed fields with skills' results.
+            self.ndb.combat_handler.show_status(self)
+            return
+
         status = self.return_status()
         self.msg({"status": status})
 
@@ -909,15 +959,10 @@ class MudderyPlayerCharacter(MudderyCharacter):
         self.msg({"combat_finish": {"win": True}})
 
         # loot
-        # get object list
-        loots = None
-        for loser in losers:
-            obj_list = loser.loot_handler.get_obj_list(self)
-            if obj_list:
-                if not loots:
-                    loots = obj_list
-                else:
-                    loots.extend(obj_list)
+        # The combat rolls all winners' loots at once.
+        loots = []
+        if self.ndb.combat_handler:
+            loots = self.ndb.combat_handler.get_loots(self)
 
         if loots:
             # give objects to winner
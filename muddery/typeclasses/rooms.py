@@ -8,9 +8,9 @@ Rooms are simple containers that has no location of their own.
 import ast
 import traceback
 from django.conf import settings
-from django.apps import apps
 from muddery.typeclasses.objects import MudderyObject
 from muddery.utils.game_settings import GAME_SETTINGS
+from muddery.utils.world_data_handler import WORLD_DATA_HANDLER
 from evennia.utils import logger
 from evennia.objects.objects import DefaultRoom
 
@@ -63,10 +63,8 @@ class MudderyRoom(MudderyObject, DefaultRoom):
         resource_key = getattr(self.dfield, "background", None)
         if resource_key:
             try:
-                model_resource = apps.get_model(settings.WORLD_DATA_APP, settings.IMAGE_RESOURCES)
-                if model_resource:
-                    resource_info = model_resource.objects.get(key=resource_key)
-                    self.background = resource_info.resource.url
+                resource_info = WORLD_DATA_HANDLER.get(settings.IMAGE_RESOURCES, resource_key)
+                self.background = resource_info.resource.url
             except Exception, e:
                 logger.log_tracemsg("Load background %s error: %s" % (resource_key, e))
 
@@ -4,13 +4,13 @@ Shop goods is the object in shops. They have some special attributes to record g
 """
 
 from django.conf import settings
-from django.apps import apps
 from evennia.objects.objects import DefaultObject
 from evennia.utils import logger
 from muddery.typeclasses.objects import MudderyObject
 from muddery.utils.exception import MudderyError
 from muddery.utils.builder import build_object, get_object_record
 from muddery.utils.localized_strings_handler import LS
+from muddery.utils.world_data_handler import WORLD_DATA_HANDLER
 
 
 class MudderyShopGoods(DefaultObject):
@@ -70,10 +70,7 @@ class MudderyShopGoods(DefaultObject):
         # Get goods record.
         goods_record = None
         try:
-            goods_model = apps.get_model(settings.WORLD_DATA_APP, settings.SHOP_GOODS)
-            if goods_model:
-                # Get records.
-                goods_record = goods_model.objects.get(shop=shop_key, goods=goods_key)
+            goods_record = WORLD_DATA_HANDLER.filter(settings.SHOP_GOODS, shop=shop_key, goods=goods_key)[0]
         except Exception, e:
             logger.log_errmsg("Can not find goods %s in shop %s." % (shop_key, goods_key))
             return
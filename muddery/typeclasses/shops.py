@@ -7,10 +7,10 @@ The DialogueHandler maintains a pool of dialogues.
 
 from evennia.utils import logger, create
 from django.conf import settings
-from django.apps import apps
 from muddery.typeclasses.objects import MudderyObject
 from muddery.utils.builder import build_object, get_object_record
 from muddery.utils.game_settings import GAME_SETTINGS
+from muddery.utils.world_data_handler import WORLD_DATA_HANDLER
 
 
 class MudderyShop(MudderyObject):
@@ -36,11 +36,7 @@ class MudderyShop(MudderyObject):
         Load shop goods.
         """
         # shops records
-        goods_records = []
-        goods_model = apps.get_model(settings.WORLD_DATA_APP, settings.SHOP_GOODS)
-        if goods_model:
-            # Get records.
-            goods_records = goods_model.objects.filter(shop=self.get_data_key())
+        goods_records = WORLD_DATA_HANDLER.filter(settings.SHOP_GOODS, shop=self.get_data_key())
 
         goods_keys = set([record.goods for record in goods_records])
 
@@ -56,18 +52,12 @@ class MudderyShop(MudderyObject):
 
         # add new goods
 
-        # get typeclass model
-        model_typeclass = apps.get_model(settings.WORLD_DATA_APP, settings.TYPECLASSES)
-
         for goods_record in goods_records:
             goods_key = goods_record.goods
             if goods_key not in current_goods:
                 # Create goods object.
-
-                typeclass = None
-                try:
-                    typeclass = model_typeclass.objects.get(key=goods_record.typeclass)
-                except Exception, e:
+                typeclass = WORLD_DATA_HANDLER.get(settings.TYPECLASSES, goods_record.typeclass)
+                if not typeclass:
                     logger.log_errmsg("Can't create goods: %s" % goods_key)
                     continue
 
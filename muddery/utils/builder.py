@@ -5,11 +5,22 @@ This module handles importing data from csv files and creating the whole game wo
 from __future__ import print_function
 
 from muddery.utils import utils
+from muddery.utils import exporter
 from muddery.utils.object_key_handler import OBJECT_KEY_HANDLER
-from muddery.utils.game_settings import GAME_SETTINGS
+from muddery.utils.world_data_handler import WORLD_DATA_HANDLER, get_record_hash
+from muddery.utils.world_map_handler import WORLD_MAP_HANDLER
+from muddery.utils.event_data_handler import EVENT_DATA_HANDLER
+from muddery.utils.object_index_handler import OBJECT_INDEX_HANDLER
+from muddery.utils.dialogue_handler import DIALOGUE_HANDLER
+from muddery.utils.quest_dependency_handler import QUEST_DEP_HANDLER
+from muddery.utils.equip_type_handler import EQUIP_TYPE_HANDLER
+from muddery.utils.localized_strings_handler import LOCALIZED_STRINGS_HANDLER
+from muddery.utils.game_settings import GAME_SETTINGS, CLIENT_SETTINGS
 from django.conf import settings
 from django.apps import apps
+from evennia.objects.models import ObjectDB
 from evennia.utils import create, search, logger
+import hashlib
 import traceback
 
 
@@ -26,16 +37,12 @@ def get_object_record(obj_key):
     record = None
     model_names = OBJECT_KEY_HANDLER.get_models(obj_key)
     for model_name in model_names:
-        try:
-            # Get record.
-            model_obj = apps.get_model(settings.WORLD_DATA_APP, model_name)
-            record = model_obj.objects.get(key=obj_key)
+        # Get record.
+        record = WORLD_DATA_HANDLER.get(model_name, obj_key)
+        if record:
             break
-        except Exception, e:
-            ostring = "Can not get record %s: %s." % (obj_key, e)
-            print(ostring)
-            print(traceback.print_exc())
-            continue
+
+        print("Can not get record %s in %s." % (obj_key, model_name))
 
     return record
 
@@ -55,9 +62,8 @@ def build_object(obj_key, caller=None):
     try:
         record = get_object_record(obj_key)
 
-        # get typeclass model
-        model_typeclass = apps.get_model(settings.WORLD_DATA_APP, settings.TYPECLASSES)
-        typeclass = model_typeclass.objects.get(key=record.typeclass)
+        # get typeclass
+        typeclass = WORLD_DATA_HANDLER.get(settings.TYPECLASSES, record.typeclass)
     except Exception, e:
         ostring = "Can not get typeclass of %s: %s." % (obj_key, e)
         print(ostring)
@@ -122,31 +128,97 @@ def build_object(obj_key, caller=None):
     return obj
 
 
-def build_unique_objects(model_name, caller=None):
+def get_shared_data_hash():
+    """
+    Get the hash of world data that is not linked to any unique object, such as
+    typeclasses and common objects. All unique objects may depend on it.
+
+    Returns:
+        (string) hash
+    """
+    excluded = set((settings.WORLD_ROOMS,
+                    settings.WORLD_EXITS,
+                    settings.WORLD_OBJECTS,
+                    settings.WORLD_NPCS) +
+                   settings.OBJECT_ADDITIONAL_DATA +
+                   settings.EVENT_ADDITIONAL_DATA)
+
+    model_names = settings.BASIC_DATA_MODELS +\
+                  settings.OBJECT_DATA_MODELS +\
+                  settings.OTHER_DATA_MODELS
+
+    hashes = []
+    for model_name in model_names:
+        if model_name in excluded or WORLD_DATA_HANDLER.is_linked_model(model_name):
+            continue
+
+        hashes.append(model_name)
+        hashes.extend(get_record_hash(record) for record in WORLD_DATA_HANDLER.all(model_name))
+
+    return hashlib.md5(repr(hashes)).hexdigest()
+
+
+def get_object_data_hash(obj_key, shared_hash):
     """
-    Build all objects in a model.
+    Get the hash of an unique object's data. It includes the object's records,
+    records linked to the object and the shared data.
+
+    Args:
+        obj_key: (string) The key of the object.
+        shared_hash: (string) The hash of shared data.
+
+    Returns:
+        (string) hash
+    """
+    if obj_key.startswith(settings.REVERSE_EXIT_PREFIX):
+        # Reverse exits use their exits' data.
+        obj_key = obj_key[len(settings.REVERSE_EXIT_PREFIX):]
+
+    hashes = []
+    for model_name in OBJECT_KEY_HANDLER.get_models(obj_key):
+        record = WORLD_DATA_HANDLER.get(model_name, obj_key)
+        if record:
+            hashes.append(get_record_hash(record))
+
+    for model_name, record in WORLD_DATA_HANDLER.get_linked_records(obj_key):
+        hashes.append(get_record_hash(record))
+
+        if model_name == settings.EVENT_DATA:
+            # Add event's additional data.
+            for additional_model in settings.EVENT_ADDITIONAL_DATA:
+                additional_record = WORLD_DATA_HANDLER.get(additional_model, record.key)
+                if additional_record:
+                    hashes.append(get_record_hash(additional_record))
+
+    hashes.sort()
+    hashes.append(shared_hash)
+    return hashlib.md5(repr(hashes)).hexdigest()
+
+
+def build_unique_objects(model_name, caller=None, shared_hash=None):
+    """
+    Build all objects in a model. Existing objects are updated only when their
+    data changed since the last build.
 
     Args:
         model_name: (string) The name of the data model.
         caller: (command caller) If provide, running messages will send to the caller.
+        shared_hash: (string) The hash of shared data. If it's None, rebuild all objects.
     """
     ostring = "Building %s." % model_name
     print(ostring)
     if caller:
         caller.msg(ostring)
 
-    # get typeclass model
-    model_typeclass = apps.get_model(settings.WORLD_DATA_APP, settings.TYPECLASSES)
-
-    # get model
-    model_obj = apps.get_model(settings.WORLD_DATA_APP, model_name)
+    # get records
+    records = WORLD_DATA_HANDLER.all(model_name)
 
     # new objects
-    new_obj_keys = set(record.key for record in model_obj.objects.all())
+    new_obj_keys = set(record.key for record in records)
 
     # reverse exits
     reverse_exits = set(settings.REVERSE_EXIT_PREFIX + record.key
-                        for record in model_obj.objects.all()
+                        for record in records
                             if record.typeclass==settings.TWO_WAY_EXIT_TYPECLASS_KEY)
 
     new_obj_keys.update(reverse_exits)
@@ -185,11 +257,24 @@ def build_unique_objects(model_name, caller=None):
             count_remove += 1
             continue
 
+        current_obj_keys.add(obj_key)
+
+        data_hash = None
+        if shared_hash:
+            data_hash = get_object_data_hash(obj_key, shared_hash)
+            if data_hash == utils.get_obj_data_hash(obj):
+                # Its data does not change.
+                continue
+
         try:
             # set data
             obj.load_data()
             # put obj to its default location
             obj.reset_location()
+            count_update += 1
+
+            if data_hash:
+                utils.set_obj_data_hash(obj, data_hash)
         except Exception, e:
             ostring = "%s can not load data:%s" % (obj.dbref, e)
             print(ostring)
@@ -197,10 +282,8 @@ def build_unique_objects(model_name, caller=None):
             if caller:
                 caller.msg(ostring)
 
-        current_obj_keys.add(obj_key)
-
     # Create new objects.
-    for record in model_obj.objects.all():
+    for record in records:
         if not record.key in current_obj_keys:
             # Create new objects.
             ostring = "Creating %s." % record.key
@@ -209,7 +292,7 @@ def build_unique_objects(model_name, caller=None):
                 caller.msg(ostring)
 
             try:
-                typeclass = model_typeclass.objects.get(key=record.typeclass)
+                typeclass = WORLD_DATA_HANDLER.get(settings.TYPECLASSES, record.typeclass)
                 obj = create.create_object(typeclass.path, record.name)
                 count_create += 1
             except Exception, e:
@@ -223,6 +306,8 @@ def build_unique_objects(model_name, caller=None):
             try:
                 obj.set_data_key(record.key)
                 utils.set_obj_unique_type(obj, model_name)
+                if shared_hash:
+                    utils.set_obj_data_hash(obj, get_object_data_hash(record.key, shared_hash))
             except Exception, e:
                 ostring = "Can not set data info to obj %s: %s" % (record.key, e)
                 print(ostring)
@@ -256,6 +341,8 @@ def build_unique_objects(model_name, caller=None):
                     # Set data info.
                     obj.set_data_key(reverse_exit_key)
                     utils.set_obj_unique_type(obj, model_name)
+                    if shared_hash:
+                        utils.set_obj_data_hash(obj, get_object_data_hash(reverse_exit_key, shared_hash))
                 except Exception, e:
                     ostring = "Can not set data info to obj %s: %s" % (reverse_exit_key, e)
                     print(ostring)
@@ -265,33 +352,114 @@ def build_unique_objects(model_name, caller=None):
                     return
 
     ostring = "Removed %d object(s). Created %d object(s). Updated %d object(s). Total %d objects.\n"\
-              % (count_remove, count_create, count_update, len(model_obj.objects.all()) + len(reverse_exits))
+              % (count_remove, count_create, count_update, len(records) + len(reverse_exits))
     print(ostring)
     if caller:
         caller.msg(ostring)
 
 
-def build_all(caller=None):
+def build_all(caller=None, incremental=True):
     """
     Build all objects in the world.
 
     Args:
         caller: (command caller) If provide, running messages will send to the caller.
+        incremental: (boolean) Only update objects whose data changed since the last build.
     """
+    # Reload world data.
+    WORLD_DATA_HANDLER.reload()
+    WORLD_MAP_HANDLER.reload()
+    EVENT_DATA_HANDLER.reload()
+
+    if settings.WORLD_DATA_BUNDLE:
+        # Save world data for the next start.
+        try:
+            exporter.export_bundle(settings.WORLD_DATA_BUNDLE)
+        except Exception, e:
+            ostring = "Can not export world data bundle: %s" % e
+            print(ostring)
+            if caller:
+                caller.msg(ostring)
+
     # Reset object key's info.
     OBJECT_KEY_HANDLER.reload()
 
+    # Objects will be rebuilt, search them again.
+    OBJECT_INDEX_HANDLER.clear()
+
+    shared_hash = None
+    if incremental:
+        shared_hash = get_shared_data_hash()
+
     # Build rooms.
-    build_unique_objects(settings.WORLD_ROOMS, caller)
+    build_unique_objects(settings.WORLD_ROOMS, caller, shared_hash)
 
     # Build exits.
-    build_unique_objects(settings.WORLD_EXITS, caller)
+    build_unique_objects(settings.WORLD_EXITS, caller, shared_hash)
 
     # Build objects.
-    build_unique_objects(settings.WORLD_OBJECTS, caller)
+    build_unique_objects(settings.WORLD_OBJECTS, caller, shared_hash)
 
     # Build NPCs.
-    build_unique_objects(settings.WORLD_NPCS, caller)
+    build_unique_objects(settings.WORLD_NPCS, caller, shared_hash)
+
+
+def reload_handlers():
+    """
+    Reload handlers' data from world data. It is called when the server starts and
+    when world changes are applied to the running server. World data should have
+    been reloaded before.
+    """
+    # The combat clone pool builds clones by this module.
+    from muddery.utils.combat_clone_pool import COMBAT_CLONE_POOL
+    from muddery.utils.localiztion_handler import localize_model_fields
+
+    # reset settings
+    GAME_SETTINGS.reset()
+    CLIENT_SETTINGS.reset()
+
+    # reset default locations
+    reset_default_locations()
+
+    # reload dialogues
+    DIALOGUE_HANDLER.reload()
+
+    # reload quest dependencies
+    QUEST_DEP_HANDLER.reload()
+
+    # reload equipment types
+    EQUIP_TYPE_HANDLER.reload()
+
+    # reload local strings
+    LOCALIZED_STRINGS_HANDLER.reload()
+
+    # localize model fields
+    localize_model_fields()
+
+    # collect idle combat clones
+    COMBAT_CLONE_POOL.reload()
+
+
+def refresh_world():
+    """
+    Apply new world data to the running server without reloading it. Unique objects
+    should have been rebuilt by build_all(), other objects in memory reload their data.
+    """
+    reload_handlers()
+
+    # Reload data of objects in memory, like what the server does when it reloads.
+    for obj in ObjectDB.get_all_cached_instances():
+        if not hasattr(obj, "load_data"):
+            continue
+
+        if obj.attributes.has(key="type", category=settings.DATA_KEY_CATEGORY):
+            # Unique objects have been rebuilt.
+            continue
+
+        try:
+            obj.load_data()
+        except Exception, e:
+            logger.log_tracemsg("%s can not load data:%s" % (obj.dbref, e))
 
 
 def reset_default_locations():
@@ -0,0 +1,163 @@
+"""
+CombatClonePool keeps idle combat clones for reuse.
+
+Characters attack clones of targets in events and quests. Creating a character
+object creates its attributes and skills in the db too, so clones are not
+deleted after combats. They are put back to the pool and reused in other
+combats against the same target. Attributes which change in combats are kept
+in memory, so combats do not write clones to the db.
+"""
+
+from django.conf import settings
+from evennia.typeclasses.models import DbHolder
+from evennia.utils import logger, search
+from muddery.utils.builder import build_object
+from muddery.utils.object_index_handler import OBJECT_INDEX_HANDLER
+
+
+_GA = object.__getattribute__
+_SA = object.__setattr__
+
+# Attributes which change in combats, clones keep them in ndb.
+_COMBAT_ATTRIBUTES = {"hp", "mp", "level", "team"}
+
+
+class CloneDbHolder(DbHolder):
+    """
+    A clone's db holder. Combat attributes are set to the clone's ndb, they
+    are read from the db until they are set.
+    """
+    def __init__(self, clone):
+        DbHolder.__init__(self, clone, "attributes")
+        _SA(self, "nattributes", _GA(clone, "nattributes"))
+
+    def __getattribute__(self, attrname):
+        if attrname in _COMBAT_ATTRIBUTES:
+            nattributes = _GA(self, "nattributes")
+            if nattributes.has(attrname):
+                return nattributes.get(attrname)
+        return DbHolder.__getattribute__(self, attrname)
+
+    def __setattr__(self, attrname, value):
+        if attrname in _COMBAT_ATTRIBUTES:
+            _GA(self, "nattributes").add(attrname, value)
+        else:
+            DbHolder.__setattr__(self, attrname, value)
+
+
+class CombatClonePool(object):
+    """
+    The pool maintains a dict of target's key -> a list of idle clones.
+    """
+    def __init__(self):
+        """
+        Initialize the pool.
+        """
+        self.clear()
+
+
+    def clear(self):
+        """
+        Clear data.
+        """
+        # target's key -> a list of idle clones
+        self.idle_clones = {}
+
+
+    def reload(self):
+        """
+        Collect idle clones in the db.
+        """
+        self.clear()
+
+        clones = search.search_object_by_tag(category=settings.COMBAT_CLONE_CATEGORY)
+        for clone in clones:
+            self.init_clone(clone)
+            if not clone.is_in_combat():
+                self.release(clone)
+
+
+    def init_clone(self, clone):
+        """
+        Keep a clone's combat attributes in memory and keep it out of the
+        object index, because it has its target's data key.
+
+        Args:
+            clone: (object) the clone
+
+        Returns:
+            None
+        """
+        if not isinstance(clone.db, CloneDbHolder):
+            clone._db_holder = CloneDbHolder(clone)
+        OBJECT_INDEX_HANDLER.exclude_object(clone.id)
+
+
+    def acquire(self, target_key):
+        """
+        Get a clone of the target.
+
+        Args:
+            target_key: (string) the data key of the target
+
+        Returns:
+            (object) a clone or None
+        """
+        clones = self.idle_clones.get(target_key)
+        while clones:
+            clone = clones.pop()
+            if clone.pk and not clone.is_in_combat():
+                self.init_clone(clone)
+                return clone
+
+        # Create a new clone.
+        clone = build_object(target_key)
+        if clone:
+            clone.tags.add(target_key, category=settings.COMBAT_CLONE_CATEGORY)
+            self.init_clone(clone)
+        return clone
+
+
+    def release(self, clone):
+        """
+        Put a clone back to the pool after a combat. Clones are only created
+        when all idle clones are in combats, so the pool does not grow beyond
+        the most combats against a target at the same time.
+
+        Args:
+            clone: (object) the clone
+
+        Returns:
+            None
+        """
+        if clone.location:
+            clone.move_to(None, quiet=True, to_none=True)
+
+        target_key = clone.get_data_key()
+        clones = self.idle_clones.setdefault(target_key, [])
+        if clone in clones:
+            return
+
+        # Drop changes of the last combat, they are all in memory.
+        changed = False
+        for name in _COMBAT_ATTRIBUTES:
+            if clone.nattributes.has(name):
+                clone.nattributes.remove(name)
+                changed = True
+
+        clone.skill_handler.reset_cd()
+        if changed:
+            # Recalculate attributes at the clone's original level.
+            try:
+                clone.refresh_data()
+            except Exception, e:
+                logger.log_tracemsg("Can not reset clone %s: %s" % (clone.dbref, e))
+
+        clone.db.hp = clone.max_hp
+        clone.db.mp = clone.max_mp
+
+        clones.append(clone)
+
+
+# main combat clone pool
+COMBAT_CLONE_POOL = CombatClonePool()
@@ -0,0 +1,177 @@
+"""
+CombatEngine drives all combats in one loop.
+
+Characters which cast skills automatically are registered in the engine. The
+engine checks them every tick and lets the characters whose cd is over cast
+skills, so there is only one timer however many combats are running.
+"""
+
+import time
+from django.conf import settings
+from twisted.internet.task import LoopingCall
+from evennia.utils import logger
+
+
+class CombatEngine(object):
+    """
+    The engine maintains active combats and characters that cast skills automatically.
+    """
+    def __init__(self):
+        """
+        Initialize the engine.
+        """
+        self.task = None
+        self.clear()
+
+
+    def clear(self):
+        """
+        Clear data.
+        """
+        self.stop()
+
+        # combat handler's id -> combat handler
+        self.combats = {}
+
+        # character's id -> [character, auto cast cd, next cast time]
+        self.auto_casters = {}
+
+        # metrics
+        self.tick_count = 0
+        self.last_tick_time = 0
+        self.max_tick_time = 0
+        self.total_tick_time = 0
+
+
+    def add_combat(self, combat_handler):
+        """
+        Add an active combat.
+
+        Args:
+            combat_handler: (script) the combat's handler
+
+        Returns:
+            None
+        """
+        self.combats[combat_handler.id] = combat_handler
+
+
+    def remove_combat(self, combat_handler):
+        """
+        Remove a combat.
+
+        Args:
+            combat_handler: (script) the combat's handler
+
+        Returns:
+            None
+        """
+        self.combats.pop(combat_handler.id, None)
+
+
+    def add_auto_caster(self, character, cd):
+        """
+        Let a character cast skills automatically.
+
+        Args:
+            character: (object) the character
+            cd: (float) the interval of casting skills
+
+        Returns:
+            None
+        """
+        self.auto_casters[character.id] = [character, cd, time.time() + cd]
+        self.start()
+
+
+    def remove_auto_caster(self, character):
+        """
+        Stop a character casting skills automatically.
+
+        Args:
+            character: (object) the character
+
+        Returns:
+            None
+        """
+        self.auto_casters.pop(character.id, None)
+
+
+    def start(self):
+        """
+        Start the loop.
+        """
+        if self.task and self.task.running:
+            return
+
+        self.task = LoopingCall(self.tick)
+        self.task.start(settings.COMBAT_TICK_INTERVAL, now=False)
+
+
+    def stop(self):
+        """
+        Stop the loop.
+        """
+        if self.task and self.task.running:
+            self.task.stop()
+        self.task = None
+
+
+    def tick(self):
+        """
+        Let characters whose cd is over cast skills.
+        """
+        begin = time.time()
+
+        casters = [caster for caster in self.auto_casters.values() if caster[2] <= begin]
+        for caster in casters:
+            character, cd, next_time = caster
+            if self.auto_casters.get(character.id) is not caster:
+                # Removed by other characters' skills.
+                continue
+
+            next_time += cd
+            if next_time < begin:
+                # Do not cast skills in bursts after a delay.
+                next_time = begin + cd
+            caster[2] = next_time
+
+            try:
+                character.auto_cast_skill()
+            except Exception, e:
+                logger.log_tracemsg("%s auto cast skill error: %s" % (character.dbref, e))
+                self.remove_auto_caster(character)
+
+        if not self.auto_casters:
+            # No combat needs the loop.
+            self.stop()
+
+        cost = time.time() - begin
+        self.tick_count += 1
+        self.last_tick_time = cost
+        self.total_tick_time += cost
+        if cost > self.max_tick_time:
+            self.max_tick_time = cost
+
+
+    def get_metrics(self):
+        """
+        Get the engine's running status.
+
+        Returns:
+            (dict) metrics
+        """
+        average_tick_time = 0
+        if self.tick_count:
+            average_tick_time = self.total_tick_time / self.tick_count
+
+        return {"combats": len(self.combats),
+                "auto_casters": len(self.auto_casters),
+                "ticks": self.tick_count,
+                "last_tick_time": self.last_tick_time,
+                "max_tick_time": self.max_tick_time,
+                "average_tick_time": average_tick_time}
+
+
+# main combat engine
+COMBAT_ENGINE = CombatEngine()
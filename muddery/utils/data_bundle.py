@@ -0,0 +1,216 @@
+"""
+This module reads and writes world data bundles.
+
+A bundle is a single binary file which contains the data of many models. Values
+are stored by columns. Integers, floats and booleans are stored as arrays,
+strings are stored as indexes of a string table. So a bundle can be loaded
+without parsing text or querying the db.
+
+The layout of a bundle is:
+    MAGIC
+    the length of the manifest (unsigned int, little-endian)
+    the manifest (json)
+    data blocks
+
+The manifest describes models, columns and the positions of their data blocks.
+"""
+
+import array
+import json
+import mmap
+import struct
+import sys
+from django.db import models
+
+
+MAGIC = "MUDDERY_BUNDLE\n"
+
+VERSION = 1
+
+# column types: (array typecode, default value)
+# Integers out of the range of int32 are stored in the string table as "long".
+COLUMN_TYPES = {"int": ("i", 0),
+                "long": ("I", 0),
+                "float": ("d", 0.0),
+                "bool": ("b", 0),
+                "string": ("I", 0)}
+
+INT_MIN = -2 ** 31
+INT_MAX = 2 ** 31 - 1
+
+
+def get_column_type(field):
+    """
+    Get the column type of a model field.
+
+    Args:
+        field: (Field) model's field
+
+    Returns:
+        (string) column type
+    """
+    if isinstance(field, models.BooleanField):
+        return "bool"
+    elif isinstance(field, (models.IntegerField, models.AutoField)):
+        return "int"
+    elif isinstance(field, models.FloatField):
+        return "float"
+    return "string"
+
+
+def write_bundle(file_name, tables):
+    """
+    Write models' records to a bundle.
+
+    Args:
+        file_name: (string) bundle file's name
+        tables: (iterable) a list of (model, records)
+
+    Returns:
+        None
+    """
+    # The first string is None.
+    strings = [u""]
+    string_index = {}
+
+    blocks = []
+    position = [0]
+
+    def add_block(data):
+        blocks.append(data)
+        start = position[0]
+        position[0] += len(data)
+        return [start, len(data)]
+
+    model_list = []
+    for model_obj, records in tables:
+        fields = model_obj._meta.fields
+
+        columns = []
+        for field in fields:
+            column_type = get_column_type(field)
+            typecode, default = COLUMN_TYPES[column_type]
+            values = [record.serializable_value(field.name) for record in records]
+            nulls = None
+
+            if column_type == "int":
+                if any(value is not None and not INT_MIN <= value <= INT_MAX for value in values):
+                    column_type = "long"
+                    typecode, default = COLUMN_TYPES[column_type]
+
+            if column_type in ("string", "long"):
+                indexes = []
+                for value in values:
+                    if value is None:
+                        indexes.append(0)
+                        continue
+
+                    value = unicode(value)
+                    index = string_index.get(value)
+                    if index is None:
+                        index = len(strings)
+                        strings.append(value)
+                        string_index[value] = index
+                    indexes.append(index)
+                values = indexes
+            elif None in values:
+                nulls = array.array("b", [value is None for value in values])
+                values = [default if value is None else value for value in values]
+
+            column = {"name": field.name,
+                      "type": column_type,
+                      "data": add_block(array.array(typecode, values).tostring())}
+            if nulls:
+                column["nulls"] = add_block(nulls.tostring())
+            columns.append(column)
+
+        model_list.append({"model": model_obj._meta.object_name,
+                           "count": len(records),
+                           "columns": columns})
+
+    # string table
+    offsets = array.array("I", [0])
+    for value in strings[1:]:
+        offsets.append(offsets[-1] + len(value))
+    string_data = add_block(u"".join(strings).encode("utf-8"))
+    string_offsets = add_block(offsets.tostring())
+
+    manifest = json.dumps({"version": VERSION,
+                           "byteorder": sys.byteorder,
+                           "strings": {"data": string_data, "offsets": string_offsets},
+                           "models": model_list})
+
+    with open(file_name, "wb") as bundle:
+        bundle.write(MAGIC)
+        bundle.write(struct.pack("<I", len(manifest)))
+        bundle.write(manifest)
+        for data in blocks:
+            bundle.write(data)
+
+
+def read_bundle(file_name):
+    """
+    Read models' records from a bundle.
+
+    Args:
+        file_name: (string) bundle file's name
+
+    Returns:
+        (generator) yields (model's name, fields' names, a list of value tuples)
+    """
+    with open(file_name, "rb") as bundle:
+        content = mmap.mmap(bundle.fileno(), 0, access=mmap.ACCESS_READ)
+
+    try:
+        if content[:len(MAGIC)] != MAGIC:
+            raise ValueError("%s is not a data bundle." % file_name)
+
+        position = len(MAGIC)
+        length = struct.unpack("<I", content[position:position + 4])[0]
+        position += 4
+        manifest = json.loads(content[position:position + length])
+        if manifest["version"] != VERSION:
+            raise ValueError("Unsupported bundle version: %s." % manifest["version"])
+        base = position + length
+        byteswap = manifest["byteorder"] != sys.byteorder
+
+        def read_array(typecode, block):
+            values = array.array(typecode)
+            values.fromstring(content[base + block[0]:base + block[0] + block[1]])
+            if byteswap:
+                values.byteswap()
+            return values
+
+        # load the string table
+        block = manifest["strings"]["data"]
+        text = content[base + block[0]:base + block[0] + block[1]].decode("utf-8")
+        offsets = read_array("I", manifest["strings"]["offsets"])
+        strings = [None]
+        strings.extend(text[offsets[i]:offsets[i + 1]] for i in xrange(len(offsets) - 1))
+
+        for model in manifest["models"]:
+            names = []
+            columns = []
+            for column in model["columns"]:
+                typecode, default = COLUMN_TYPES[column["type"]]
+                values = read_array(typecode, column["data"])
+
+                if column["type"] == "string":
+                    values = [strings[index] for index in values]
+                elif column["type"] == "long":
+                    values = [None if index == 0 else int(strings[index]) for index in values]
+                elif column["type"] == "bool":
+                    values = [bool(value) for value in values]
+                else:
+                    values = values.tolist()
+
+                if "nulls" in column:
+                    nulls = read_array("b", column["nulls"])
+                    values = [None if null else value for value, null in zip(values, nulls)]
+
+                names.append(column["name"])
+                columns.append(values)
+
+            yield model["model"], names, zip(*columns)
+    finally:
+        content.close()
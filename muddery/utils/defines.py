@@ -14,6 +14,11 @@ DEPENDENCY_QUEST_NOT_ACCOMPLISHED = "DPD_NOT_ACCOMPLISHED"  # quest accepted but
 DEPENDENCY_QUEST_COMPLETED = "DPD_COMPLETED"                # quest complete
 DEPENDENCY_QUEST_NOT_COMPLETED = "DPD_NOT_COMPLETED"        # quest accepted but not complete
 
+# quest states, a character's quest state is a combination of these bits
+QUEST_STATE_NONE = 0
+QUEST_STATE_IN_PROGRESS = 1
+QUEST_STATE_COMPLETED = 2
+
 # quest objective types
 OBJECTIVE_NONE = ""
 OBJECTIVE_TALK = "OBJECTIVE_TALK"           # finish a dialogue, object: dialogue_id
@@ -10,6 +10,7 @@ from muddery.utils import defines
 from muddery.utils.quest_dependency_handler import QUEST_DEP_HANDLER
 from muddery.statements.statement_handler import STATEMENT_HANDLER
 from muddery.utils.game_settings import GAME_SETTINGS
+from muddery.utils.world_data_handler import WORLD_DATA_HANDLER
 from django.conf import settings
 from django.apps import apps
 from evennia.utils import logger
@@ -37,84 +38,79 @@ class DialogueHandler(object):
         """
         Initialize the handler.
         """
-        self.dialogue_storage = {}
-    
-    
-    def load_cache(self, dialogue):
+        self.clear()
+
+    def reload(self):
         """
-        To reduce database accesses, add a cache.
+        Load all dialogues from world data.
         """
-        if not dialogue:
-            return
+        self.clear()
 
-        if dialogue in self.dialogue_storage:
-            # already cached
-            return
+        # Load dialogues.
+        for record in WORLD_DATA_HANDLER.all(settings.DIALOGUES):
+            self.dialogue_storage[record.key] = {"condition": record.condition,
+                                                 "dependencies": [],
+                                                 "sentences": [],
+                                                 "nexts": []}
 
-        # Add cache of the whole dialogue.
-        self.dialogue_storage[dialogue] = {}
-        
-        # Get db model
-        try:
-            model_dialogues = apps.get_model(settings.WORLD_DATA_APP, settings.DIALOGUES)
-            dialogue_record = model_dialogues.objects.get(key=dialogue)
-        except Exception, e:
-            return
+        for record in WORLD_DATA_HANDLER.all(settings.DIALOGUE_QUEST_DEPENDENCIES):
+            if record.dialogue in self.dialogue_storage:
+                self.dialogue_storage[record.dialogue]["dependencies"].append({"quest": record.dependency,
+                                                                               "type": record.type})
 
-        sentences = []
-        model_sentences = apps.get_model(settings.WORLD_DATA_APP, settings.DIALOGUE_SENTENCES)
-        if model_sentences:
-            # Get records.
-            sentences = model_sentences.objects.filter(dialogue=dialogue)
-
-        nexts = []
-        model_nexts = apps.get_model(settings.WORLD_DATA_APP, settings.DIALOGUE_RELATIONS)
-        if model_nexts:
-            # Get records.
-            nexts = model_nexts.objects.filter(dialogue=dialogue)
-
-        dependencies = []
-        model_dependencies = apps.get_model(settings.WORLD_DATA_APP, settings.DIALOGUE_QUEST_DEPENDENCIES)
-        if model_dependencies:
-            # Get records.
-            dependencies = model_dependencies.objects.filter(dialogue=dialogue)
-
-        # Add db fields to data object.
-        data = {}
-
-        data["condition"] = dialogue_record.condition
-
-        data["dependencies"] = []
-        for dependency in dependencies:
-            data["dependencies"].append({"quest": dependency.dependency,
-                                         "type": dependency.type})
-
-        data["sentences"] = []
-        for sentence in sentences:
-            speaker_model = self.speaker_escape.sub(self.escape_fun, sentence.speaker)
-
-            data["sentences"].append({"dialogue": dialogue,
-                                      "ordinal": sentence.ordinal,
-                                      "speaker_model": speaker_model,
-                                      "icon": sentence.icon,
-                                      "content": sentence.content,
-                                      "action": sentence.action,
-                                      "provide_quest": sentence.provide_quest,
-                                      "complete_quest": sentence.complete_quest})
-
-        # sort sentences by ordinal
-        data["sentences"].sort(key=lambda x:x["ordinal"])
-        count = 0
-        for sentence in data["sentences"]:
-            sentence["sentence"] = count
-            sentence["is_last"] = False
-            count += 1
-        data["sentences"][-1]["is_last"] = True
-
-        data["nexts"] = [next_one.next_dlg for next_one in nexts]
-
-        # Add to cache.
-        self.dialogue_storage[dialogue] = data
+        for record in WORLD_DATA_HANDLER.all(settings.DIALOGUE_SENTENCES):
+            if record.dialogue in self.dialogue_storage:
+                speaker_model = self.speaker_escape.sub(self.escape_fun, record.speaker)
+
+                self.dialogue_storage[record.dialogue]["sentences"].append({"dialogue": record.dialogue,
+                                                                            "ordinal": record.ordinal,
+                                                                            "speaker_model": speaker_model,
+                                                                            "icon": record.icon,
+                                                                            "content": record.content,
+                                                                            "action": record.action,
+                                                                            "provide_quest": record.provide_quest,
+                                                                            "complete_quest": record.complete_quest})
+
+        for record in WORLD_DATA_HANDLER.all(settings.DIALOGUE_RELATIONS):
+            if record.dialogue in self.dialogue_storage:
+                self.dialogue_storage[record.dialogue]["nexts"].append(record.next_dlg)
+
+        for dialogue, data in self.dialogue_storage.items():
+            if not data["sentences"]:
+                # Dialogues without sentences can not be used.
+                del self.dialogue_storage[dialogue]
+                continue
+
+            # sort sentences by ordinal
+            data["sentences"].sort(key=lambda x:x["ordinal"])
+            count = 0
+            for sentence in data["sentences"]:
+                sentence["sentence"] = count
+                sentence["is_last"] = False
+                count += 1
+            data["sentences"][-1]["is_last"] = True
+
+        # Find quests in dialogues and their next dialogues.
+        for dialogue in self.dialogue_storage:
+            provide_quests = set()
+            complete_quests = set()
+
+            visited = set([dialogue])
+            stack = [dialogue]
+            while stack:
+                data = self.dialogue_storage[stack.pop()]
+                for sentence in data["sentences"]:
+                    if sentence["provide_quest"]:
+                        provide_quests.add(sentence["provide_quest"])
+                    if sentence["complete_quest"]:
+                        complete_quests.add(sentence["complete_quest"])
+
+                for next_dlg in data["nexts"]:
+                    if next_dlg in self.dialogue_storage and next_dlg not in visited:
+                        visited.add(next_dlg)
+                        stack.append(next_dlg)
+
+            self.dialogue_quests[dialogue] = (frozenset(provide_quests), frozenset(complete_quests))
 
     def get_dialogue(self, dialogue):
         """
@@ -123,14 +119,7 @@ class DialogueHandler(object):
         if not dialogue:
             return
 
-        # Load cache.
-        self.load_cache(dialogue)
-
-        if not dialogue in self.dialogue_storage:
-            # Can not find dialogue.
-            return
-
-        return self.dialogue_storage[dialogue]
+        return self.dialogue_storage.get(dialogue)
 
     def get_sentence(self, dialogue, sentence):
         """
@@ -482,20 +471,21 @@ class DialogueHandler(object):
         """
         clear cache
         """
+        # dialogue's key -> dialogue's data
         self.dialogue_storage = {}
 
+        # dialogue's key -> (quests can be provided, quests can be completed)
+        # in the dialogue and its next dialogues
+        self.dialogue_quests = {}
+
     def get_npc_name(self, dialogue):
         """
         Get who says this dialogue.
         """
-        model_npc_dialogues = apps.get_model(settings.WORLD_DATA_APP, settings.NPC_DIALOGUES)
-        if model_npc_dialogues:
-            # Get record.
-            try:
-                record = model_npc_dialogues.objects.get(dialogue=dialogue)
-                return record.npc.name
-            except Exception, e:
-                pass
+        for record in WORLD_DATA_HANDLER.filter(settings.NPC_DIALOGUES, dialogue=dialogue):
+            npc = WORLD_DATA_HANDLER.get(settings.WORLD_NPCS, record.npc)
+            if npc:
+                return npc.name
 
         return ""
 
@@ -513,13 +503,28 @@ class DialogueHandler(object):
         if not npc:
             return (provide_quest, complete_quest)
 
-        accomplished_quests = caller.quest_handler.get_accomplished_quests()
+        # get quests in npc's dialogues
+        provide_quests = set()
+        complete_quests = set()
+        for dlg_key in npc.dialogues:
+            if dlg_key in self.dialogue_quests:
+                provides, completes = self.dialogue_quests[dlg_key]
+                provide_quests.update(provides)
+                complete_quests.update(completes)
+
+        quest_handler = caller.quest_handler
+        accomplished_quests = set(quest for quest in complete_quests if quest_handler.is_accomplished(quest))
+        available_quests = set(quest for quest in provide_quests if quest_handler.can_provide(quest))
+
+        if not accomplished_quests and not available_quests:
+            # No need to check dialogues' conditions.
+            return (provide_quest, complete_quest)
 
-        # get npc's default dialogues
         for dlg_key in npc.dialogues:
             # find quests by recursion
-            provide, complete = self.dialogue_have_quest(caller, npc, dlg_key, accomplished_quests)
-                
+            provide, complete = self.dialogue_have_quest(caller, npc, dlg_key,
+                                                         accomplished_quests, available_quests)
+
             provide_quest = (provide_quest or provide)
             complete_quest = (complete_quest or complete)
 
@@ -529,21 +534,34 @@ class DialogueHandler(object):
             if not accomplished_quests:
                 if provide_quest:
                     break
-        
+
         return (provide_quest, complete_quest)
 
-    def dialogue_have_quest(self, caller, npc, dialogue, accomplished_quests):
+    def dialogue_have_quest(self, caller, npc, dialogue, accomplished_quests, available_quests):
         """
         Find quests by recursion.
+
+        Args:
+            caller: (object) the character who want to start a talk.
+            npc: (object) the NPC that the character want to talk to.
+            dialogue: (string) the key of the dialogue.
+            accomplished_quests: (set) quests that the caller can complete.
+            available_quests: (set) quests that can be provided to the caller.
         """
         provide_quest = False
         complete_quest = False
 
-        # check if the dialogue is available
-        npc_dlg = self.get_dialogue(dialogue)
-        if not npc_dlg:
+        if dialogue not in self.dialogue_quests:
             return (provide_quest, complete_quest)
 
+        # check if there are quests in this dialogue and its next dialogues
+        provides, completes = self.dialogue_quests[dialogue]
+        if completes.isdisjoint(accomplished_quests) and provides.isdisjoint(available_quests):
+            return (provide_quest, complete_quest)
+
+        # check if the dialogue is available
+        npc_dlg = self.dialogue_storage[dialogue]
+
         if not STATEMENT_HANDLER.match_condition(npc_dlg["condition"], caller, npc):
             return (provide_quest, complete_quest)
 
@@ -561,17 +579,16 @@ class DialogueHandler(object):
                 complete_quest = True
                 return (provide_quest, complete_quest)
 
-            if not provide_quest and sen["provide_quest"]:
-                quest_key = sen["provide_quest"]
-                if caller.quest_handler.can_provide(quest_key):
-                    provide_quest = True
-                    if not accomplished_quests:
-                        return (provide_quest, complete_quest)
+            if sen["provide_quest"] in available_quests:
+                provide_quest = True
+                if not accomplished_quests:
+                    return (provide_quest, complete_quest)
 
         for dlg_key in npc_dlg["nexts"]:
             # get next dialogue
-            provide, complete = self.dialogue_have_quest(caller, npc, dlg_key, accomplished_quests)
-                
+            provide, complete = self.dialogue_have_quest(caller, npc, dlg_key,
+                                                         accomplished_quests, available_quests)
+
             provide_quest = (provide_quest or provide)
             complete_quest = (complete_quest or complete)
 
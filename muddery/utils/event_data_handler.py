@@ -0,0 +1,77 @@
+"""
+EventDataHandler keeps all events' data in memory.
+
+Events are indexed by their trigger objects and trigger types, so objects'
+event handlers can find their events without loading anything.
+"""
+
+from django.conf import settings
+from muddery.utils.world_data_handler import WORLD_DATA_HANDLER
+
+
+class EventDataHandler(object):
+    """
+    The handler maintains a dict of trigger object's key -> trigger type -> events.
+    """
+    def __init__(self):
+        """
+        Initialize handler
+        """
+        self.clear()
+
+
+    def clear(self):
+        """
+        Clear data.
+        """
+        # trigger object's key -> {trigger type -> a list of events}
+        self.events = {}
+
+
+    def reload(self):
+        """
+        Load events from world data.
+        """
+        self.clear()
+
+        for record in WORLD_DATA_HANDLER.all(settings.EVENT_DATA):
+            event = {}
+
+            # Set data.
+            for field in record._meta.fields:
+                event[field.name] = record.serializable_value(field.name)
+
+            # Set additional data.
+            for model_name in settings.EVENT_ADDITIONAL_DATA:
+                add_record = WORLD_DATA_HANDLER.get(model_name, record.key)
+                if add_record:
+                    # Set data.
+                    for add_field in add_record._meta.fields:
+                        event[add_field.name] = add_record.serializable_value(add_field.name)
+                    break
+
+
+            object_events = self.events.setdefault(record.trigger_obj, {})
+            object_events.setdefault(record.trigger_type, []).append(event)
+
+
+    def get_events(self, trigger_obj, trigger_type):
+        """
+        Get events of an object.
+
+        Args:
+            trigger_obj: (string) the key of the trigger object
+            trigger_type: (string) the type of the trigger
+
+        Returns:
+            (list) events, they should not be modified.
+        """
+        object_events = self.events.get(trigger_obj)
+        if not object_events:
+            return ()
+
+        return object_events.get(trigger_type, ())
+
+
+# main event data handler
+EVENT_DATA_HANDLER = EventDataHandler()
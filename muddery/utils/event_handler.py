@@ -9,84 +9,27 @@ from muddery.utils.builder import build_object
 from muddery.statements.statement_handler import STATEMENT_HANDLER
 from muddery.utils.dialogue_handler import DIALOGUE_HANDLER
 from muddery.utils import utils
+from muddery.utils.event_data_handler import EVENT_DATA_HANDLER
 from django.conf import settings
-from django.apps import apps
 from evennia.utils import logger
 from evennia import create_script
 
 PERMISSION_BYPASS_EVENTS = {perm.lower() for perm in settings.PERMISSION_BYPASS_EVENTS}
 
-def get_event_additional_model():
-    """
-    Set a dict of additional model names.
-    """
-    additional_model = {}
-
-    # list event's additional data's model
-    for model_name in settings.EVENT_ADDITIONAL_DATA:
-        model_data = apps.get_model(settings.WORLD_DATA_APP, model_name)
-        if model_data:
-            # Get records.
-            for record in model_data.objects.all():
-                key = record.serializable_value("key")
-                additional_model[key] = model_name
-
-    return additional_model
-
-
 class EventHandler(object):
     """
     """
-    _additional_model = get_event_additional_model()
-
     def __init__(self, owner):
         """
         Initialize the handler.
         """
         self.owner = owner
-        self.events = {}
-
-        # Load events.
-        event_records = []
-        model_events = apps.get_model(settings.WORLD_DATA_APP, settings.EVENT_DATA)
-        if model_events:
-            # Get records.
-            event_records = model_events.objects.filter(trigger_obj=owner.get_data_key())
-
-            for record in event_records:
-                event = {}
-
-                # Set data.
-                event_type = record.type
-                trigger_type = record.trigger_type
-
-                for field in record._meta.fields:
-                    event[field.name] = record.serializable_value(field.name)
-                event["type"] = event_type
-
-                # Set additional data.
-                if record.key in self._additional_model:
-                    model_name = self._additional_model[record.key]
-                    model_additional = apps.get_model(settings.WORLD_DATA_APP, model_name)
-
-                    try:
-                        add_record = model_additional.objects.get(key = record.key)
-                        # Set data.
-                        for add_field in add_record._meta.fields:
-                            event[add_field.name] = add_record.serializable_value(add_field.name)
-                    except Exception, e:
-                        pass
-
-                """
-                if event_record.type == defines.EVENT_ATTACK:
-                    self.create_event_attack(event)
-                elif event_record.type == defines.EVENT_DIALOGUE:
-                    self.create_event_dialogue(event)
-                """
-
-                if not trigger_type in self.events:
-                    self.events[trigger_type] = []
-                self.events[trigger_type].append(event)
+
+    def get_events(self, trigger_type):
+        """
+        Get the owner's events of the trigger type.
+        """
+        return EVENT_DATA_HANDLER.get_events(self.owner.get_data_key(), trigger_type)
 
     def can_bypass(self, character):
         """
@@ -128,17 +71,20 @@ class EventHandler(object):
         if not character:
             return
 
+        events = self.get_events(defines.EVENT_TRIGGER_ARRIVE)
+        if not events:
+            return
+
         if self.can_bypass(character):
             return
 
-        if defines.EVENT_TRIGGER_ARRIVE in self.events:
-            for event in self.events[defines.EVENT_TRIGGER_ARRIVE]:
-                # If has arrive event.
-                if STATEMENT_HANDLER.match_condition(event["condition"], character, self.owner):
-                    # If matches the condition.
-                    function = self.get_function(event["type"])
-                    if function:
-                        function(event, character)
+        for event in events:
+            # If has arrive event.
+            if STATEMENT_HANDLER.match_condition(event["condition"], character, self.owner):
+                # If matches the condition.
+                function = self.get_function(event["type"])
+                if function:
+                    function(event, character)
 
 
     def at_character_move_out(self, character):
@@ -157,17 +103,20 @@ class EventHandler(object):
         if not owner:
             return
 
+        events = self.get_events(defines.EVENT_TRIGGER_DIE)
+        if not events:
+            return
+
         if self.can_bypass(owner):
             return
 
-        if defines.EVENT_TRIGGER_DIE in self.events:
-            for event in self.events[defines.EVENT_TRIGGER_DIE]:
-                #If has die event.
-                if STATEMENT_HANDLER.match_condition(event["condition"], owner, None):
-                    # If matches the condition, run event on the owner.
-                    function = self.get_function(event["type"])
-                    if function:
-                        function(event, self)
+        for event in events:
+            #If has die event.
+            if STATEMENT_HANDLER.match_condition(event["condition"], owner, None):
+                # If matches the condition, run event on the owner.
+                function = self.get_function(event["type"])
+                if function:
+                    function(event, self)
 
 
     def at_character_kill(self, killers):
@@ -175,17 +124,16 @@ class EventHandler(object):
         Called when a character kills others.
         This event is set on the character who is killed, and take effect on the killer!
         """
-        if defines.EVENT_TRIGGER_KILL in self.events:
-            for event in self.events[defines.EVENT_TRIGGER_KILL]:
-                # If has kill event.
-                for killer in killers:
-                    if self.can_bypass(killer):
-                        continue
+        for event in self.get_events(defines.EVENT_TRIGGER_KILL):
+            # If has kill event.
+            for killer in killers:
+                if self.can_bypass(killer):
+                    continue
 
-                    if STATEMENT_HANDLER.match_condition(event["condition"], killer, self.owner):
-                        function = self.get_function(event["type"])
-                        if function:
-                            function(event, killer)
+                if STATEMENT_HANDLER.match_condition(event["condition"], killer, self.owner):
+                    function = self.get_function(event["type"])
+                    if function:
+                        function(event, killer)
 
 
     def at_character_traverse(self, character):
@@ -196,19 +144,22 @@ class EventHandler(object):
         if not character:
             return True
 
+        events = self.get_events(defines.EVENT_TRIGGER_TRAVERSE)
+        if not events:
+            return True
+
         if self.can_bypass(character):
             return True
 
         triggered = False
-        if defines.EVENT_TRIGGER_TRAVERSE in self.events:
-            for event in self.events[defines.EVENT_TRIGGER_TRAVERSE]:
-                # If has traverse event.
-                if STATEMENT_HANDLER.match_condition(event["condition"], character, self.owner):
-                    # If matches the condition.
-                    triggered = True
-                    function = self.get_function(event["type"])
-                    if function:
-                        function(event, character)
+        for event in events:
+            # If has traverse event.
+            if STATEMENT_HANDLER.match_condition(event["condition"], character, self.owner):
+                # If matches the condition.
+                triggered = True
+                function = self.get_function(event["type"])
+                if function:
+                    function(event, character)
 
         return not triggered
 
@@ -219,31 +170,6 @@ class EventHandler(object):
     #
     #########################
 
-    def create_event_attack(self, event):
-        """
-        Create a combat event, load combat infos.
-        """
-        event["type"] = defines.EVENT_ATTACK
-        event["function"] = self.do_attack
-
-        mob_records = []
-        model_mobs = apps.get_model(settings.WORLD_DATA_APP, settings.EVENT_MOBS)
-        if model_mobs:
-            # Get records.
-            mob_records = model_mobs.objects.filter(key=event["key"])
-
-        data = []
-        for mob_record in mob_records:
-            mob = {"mob": mob_record.mob,
-                   "level": mob_record.level,
-                   "odds": mob_record.odds,
-                   "desc": mob_record.desc}
-            data.append(mob)
-        event["data"] = data
-
-        return event
-
-
     def do_attack(self, event, character):
         """
         Start a combat.
@@ -257,27 +183,6 @@ class EventHandler(object):
             character.attack_clone_target(event["mob"], event["level"], event["desc"])
 
 
-    def create_event_dialogue(self, event):
-        """
-        Create a dialogue event, load dialog info.
-        """
-        event["type"] = defines.EVENT_DIALOGUE
-        event["function"] = self.do_dialogue
-
-        try:
-            model_dialogues = apps.get_model(settings.WORLD_DATA_APP, settings.EVENT_DIALOGUES)
-            if model_dialogues:
-                # Get record.
-                dialogue_record = model_dialogues.objects.get(key=event["key"])
-                data = {"dialogue": dialogue_record.dialogue,
-                        "npc": dialogue_record.npc}
-                event["data"] = data
-        except Exception, e:
-            logger.log_errmsg("Can't load event dialogue %s: %s" % (event["key"], e))
-
-        return event
-
-
     def do_dialogue(self, event, character):
         """
         Start a dialogue.
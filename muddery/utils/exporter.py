@@ -12,6 +12,8 @@ from django.conf import settings
 from evennia.utils import logger
 from muddery.utils.exception import MudderyError
 from muddery.utils import writers
+from muddery.utils.zip_stream import ZipStream
+from muddery.utils.data_bundle import write_bundle
 
 
 def get_header(model_name):
@@ -25,20 +27,19 @@ def get_header(model_name):
 
 def get_lines(model_name):
     """
-    Import data from a data file to the db model
+    Get a model's data lines, the first line is fields' names.
 
     Args:
-        file_name: (string) file's name
         model_name: (string) db model's name.
     """
     # get model
     model_obj = apps.get_model(settings.WORLD_DATA_APP, model_name)
-    fields = model_obj._meta.fields
-    yield [field.name for field in fields]
+    field_names = [field.name for field in model_obj._meta.fields]
+    yield field_names
 
-    # get records
-    for record in model_obj.objects.all():
-        line = [str(record.serializable_value(field.name)) for field in fields]
+    # get records, do not cache them
+    for values in model_obj.objects.values_list(*field_names).iterator():
+        line = [value.encode("utf-8") if isinstance(value, unicode) else str(value) for value in values]
         yield line
 
 
@@ -96,6 +97,109 @@ def export_zip_all(file, file_type=None):
             os.remove(temp)
 
 
+def export_bundle(file_name, model_names=None):
+    """
+    Export tables to a data bundle.
+
+    Args:
+        file_name: (string) bundle file's name.
+        model_names: (list) models' names. If it's None, export all tables.
+    """
+    if model_names is None:
+        app_config = apps.get_app_config(settings.WORLD_DATA_APP)
+        model_objs = app_config.get_models()
+    else:
+        model_objs = [apps.get_model(settings.WORLD_DATA_APP, model_name) for model_name in model_names]
+
+    write_bundle(file_name, ((model_obj, list(model_obj.objects.all())) for model_obj in model_objs))
+
+
+def join_chunks(chunks, chunk_size):
+    """
+    Join small pieces of data to big chunks.
+
+    Args:
+        chunks: (iterable) pieces of data
+        chunk_size: (int) the min size of output chunks
+
+    Returns:
+        (generator) chunks
+    """
+    buffer = []
+    size = 0
+    for data in chunks:
+        buffer.append(data)
+        size += len(data)
+        if size >= chunk_size:
+            yield "".join(buffer)
+            buffer = []
+            size = 0
+
+    if buffer:
+        yield "".join(buffer)
+
+
+def stream_file(model_name, file_type=None, chunk_size=65536):
+    """
+    Export a table as a stream.
+
+    Args:
+        model_name: (string) db model's name.
+        file_type: (string) the type of the file, it must be streamable.
+        chunk_size: (int) the size of output chunks
+
+    Returns:
+        (generator) chunks of the file
+    """
+    if not file_type:
+        # Set default file type.
+        file_type = "csv"
+
+    writer_class = writers.get_writer(file_type)
+    if not writer_class or not writer_class.streamable:
+        raise MudderyError("Can not stream %s files." % file_type)
+
+    return writer_class.stream(get_lines(model_name), chunk_size)
+
+
+def stream_zip_all(file_type=None, chunk_size=65536):
+    """
+    Export all tables to a zip stream which contains a group of csv files. Records
+    are read and compressed while the stream is being sent, no temp files are used.
+
+    Args:
+        file_type: (string) the type of data files, it must be streamable.
+        chunk_size: (int) the size of output chunks
+
+    Returns:
+        (generator) chunks of the zip file
+    """
+    if not file_type:
+        # Set default file type.
+        file_type = "csv"
+
+    writer_class = writers.get_writer(file_type)
+    if not writer_class or not writer_class.streamable:
+        raise MudderyError("Can not stream %s files." % file_type)
+
+    def zip_chunks():
+        stream = ZipStream()
+
+        # get model names
+        app_config = apps.get_app_config(settings.WORLD_DATA_APP)
+        for model in app_config.get_models():
+            model_name = model._meta.object_name
+            filename = model_name + "." + writer_class.file_ext
+            lines = writer_class.stream(get_lines(model_name), chunk_size)
+            for data in stream.write_file(filename, lines):
+                yield data
+
+        for data in stream.close():
+            yield data
+
+    return join_chunks(zip_chunks(), chunk_size)
+
+
 def export_resources(file):
     """
     Export all resource files to a zip file.
@@ -6,18 +6,314 @@ from __future__ import print_function
 
 import os
 import glob
+import multiprocessing
 import tempfile
 import zipfile
 import shutil
-from django.db import models
+import time
+from django.db import models, transaction
 from django.apps import apps
 from django.conf import settings
 from evennia.utils import logger
 from muddery.utils.exception import MudderyError
 from muddery.utils import readers
+from muddery.utils.data_bundle import read_bundle
 
 
-def import_file(file_name, model_name, file_type=None, widecard=True, clear=True):
+def parse_bool(value):
+    """
+    Convert a cell to a boolean value.
+    """
+    if value == 'True':
+        return True
+    elif value == 'False':
+        return False
+    else:
+        return (int(value) != 0)
+
+
+def get_field_converter(field):
+    """
+    Get the function which converts cells to the field's values.
+
+    Args:
+        field: (Field) model's field
+
+    Returns:
+        (callable) converter, or None if cells can be used directly.
+    """
+    if isinstance(field, models.BooleanField):
+        return parse_bool
+    elif isinstance(field, models.IntegerField):
+        return int
+    elif isinstance(field, models.FloatField):
+        return float
+    return None
+
+
+def get_columns(model_obj, title):
+    """
+    Get the columns that can be imported to the model.
+
+    Args:
+        model_obj: (model) db model
+        title: (list) field names in the data file
+
+    Returns:
+        (list) a list of (column's index, field's name, converter)
+    """
+    columns = []
+    for index, field_name in enumerate(title):
+        # skip "id" field
+        if field_name == "id":
+            continue
+
+        try:
+            # get field info
+            field = model_obj._meta.get_field(field_name)
+        except Exception, e:
+            logger.log_errmsg("Field error: %s" % e)
+            continue
+
+        if isinstance(field, (models.ForeignKey, models.ManyToManyField)):
+            # not support
+            continue
+
+        columns.append((index, field_name, get_field_converter(field)))
+
+    return columns
+
+
+def get_unique_fields(model_obj):
+    """
+    Get field groups whose values must be unique.
+
+    Args:
+        model_obj: (model) db model
+
+    Returns:
+        (list) a list of field names' tuples
+    """
+    unique_fields = [(field.name,) for field in model_obj._meta.fields
+                     if field.unique and not field.primary_key]
+    unique_fields.extend(tuple(fields) for fields in model_obj._meta.unique_together)
+    return unique_fields
+
+
+def write_records(model_obj, records, failed):
+    """
+    Write a batch of records to the db.
+
+    Args:
+        model_obj: (model) db model
+        records: (list) a list of (line number, record)
+        failed: (list) failed lines will be appended to it
+
+    Returns:
+        (int) number of written records
+    """
+    try:
+        with transaction.atomic():
+            model_obj.objects.bulk_create([record for line, record in records])
+        return len(records)
+    except Exception:
+        pass
+
+    # Write records one by one to find out failed ones.
+    count = 0
+    for line, record in records:
+        try:
+            with transaction.atomic():
+                record.save(force_insert=True)
+            count += 1
+        except Exception, e:
+            failed.append((line, e))
+
+    return count
+
+
+def parse_rows(reader, columns):
+    """
+    Convert data lines to field values.
+
+    Args:
+        reader: (DataReader) data reader, its title line has been read
+        columns: (list) columns got from get_columns()
+
+    Returns:
+        (generator) yields (line number, field values, error)
+    """
+    line = 1
+    for values in reader:
+        line += 1
+        data = {}
+        error = None
+        try:
+            for index, field_name, converter in columns:
+                if index >= len(values):
+                    break
+
+                value = values[index]
+                if converter:
+                    if value is None or value == "":
+                        # use the default value
+                        continue
+                    value = converter(value)
+                data[field_name] = value
+        except Exception, e:
+            error = e
+
+        yield line, data, error
+
+
+def write_rows(model_obj, rows, clear=True, batch_size=None):
+    """
+    Validate rows and write them to the db model in one transaction.
+
+    Args:
+        model_obj: (model) db model
+        rows: (iterable) (line number, field values, error), comes from parse_rows()
+        clear: (boolean) clear old data or not.
+        batch_size: (int) number of records written at a time.
+
+    Returns:
+        (tuple) number of imported records, a list of failed (line number, error)
+    """
+    if not batch_size:
+        batch_size = settings.IMPORT_BATCH_SIZE
+
+    count = 0
+    failed = []
+
+    with transaction.atomic():
+        if clear:
+            # clear old data
+            model_obj.objects.all().delete()
+            unique_values = {fields: set() for fields in get_unique_fields(model_obj)}
+        else:
+            unique_values = {fields: set(model_obj.objects.values_list(*fields))
+                             for fields in get_unique_fields(model_obj)}
+
+        records = []
+        for line, data, error in rows:
+            if error:
+                failed.append((line, error))
+                continue
+
+            try:
+                record = model_obj(**data)
+
+                # validate unique values
+                record_values = []
+                for fields, exist_values in unique_values.items():
+                    value = tuple(getattr(record, field_name) for field_name in fields)
+                    if value in exist_values:
+                        raise MudderyError("Duplicate %s: %s" % (", ".join(fields), value))
+                    record_values.append((exist_values, value))
+
+                for exist_values, value in record_values:
+                    exist_values.add(value)
+
+                records.append((line, record))
+            except Exception, e:
+                failed.append((line, e))
+
+            if len(records) >= batch_size:
+                count += write_records(model_obj, records, failed)
+                records = []
+
+        if records:
+            count += write_records(model_obj, records, failed)
+
+    return count, failed
+
+
+def import_reader(reader, model_obj, clear=True, batch_size=None):
+    """
+    Import data from a reader to the db model in one transaction.
+
+    Args:
+        reader: (DataReader) data reader, its first line must be fields' names
+        model_obj: (model) db model
+        clear: (boolean) clear old data or not.
+        batch_size: (int) number of records written at a time.
+
+    Returns:
+        (tuple) number of imported records, a list of failed (line number, error)
+    """
+    try:
+        # read title
+        title = reader.readln()
+    except StopIteration:
+        title = []
+
+    columns = get_columns(model_obj, title)
+    return write_rows(model_obj, parse_rows(reader, columns), clear, batch_size)
+
+
+def get_file_reader(file_name, file_type=None, widecard=True):
+    """
+    Get the reader of a data file.
+
+    Args:
+        file_name: (string) file's name
+        file_type: (string) the type of the file. If it's None, the function will get
+                   the file type from the extension name of the file.
+        widecard: (bool) add widecard as ext name or not.
+
+    Returns:
+        (tuple) the reader and the file's name, or (None, None) if there is no
+        supported file.
+    """
+    # get file list
+    if widecard:
+        file_names = glob.glob(file_name + ".*")
+    else:
+        file_names = [file_name]
+
+    for file_name in file_names:
+        reader_type = file_type
+        if not reader_type:
+            # get file's extension name
+            reader_type = os.path.splitext(file_name)[1].lower()
+            if len(reader_type) > 0:
+                reader_type = reader_type[1:]
+
+        reader_class = readers.get_reader(reader_type)
+        if not reader_class:
+            # Does support this file type, read next one.
+            continue
+
+        reader = reader_class(file_name)
+        if not reader:
+            # Does support this file type, read next one.
+            continue
+
+        return reader, file_name
+
+    return None, None
+
+
+def print_import_result(file_name, count, failed, cost):
+    """
+    Print the result of importing a data file.
+
+    Args:
+        file_name: (string) file's name
+        count: (int) number of imported records
+        failed: (list) a list of failed (line number, error)
+        cost: (float) seconds used
+
+    Returns:
+        None
+    """
+    for line, e in failed:
+        print("Can not load %s line %d: %s" % (file_name, line, e))
+    print("%s imported: %d rows, %d failed, %.1f rows/s." %
+          (file_name, count, len(failed), count / max(cost, 0.001)))
+
+
+def import_file(file_name, model_name, file_type=None, widecard=True, clear=True, batch_size=None):
     """
     Import data from a data file to the db model
 
@@ -28,145 +324,171 @@ def import_file(file_name, model_name, file_type=None, widecard=True, clear=True
                    the file type from the extension name of the file.
         widecard: (bool) add widecard as ext name or not.
         clear: (boolean) clear old data or not.
+        batch_size: (int) number of records written at a time. If it's None, use
+                    settings.IMPORT_BATCH_SIZE.
     """
     imported = False
 
     try:
-        # get file list
-        if widecard:
-            file_names = glob.glob(file_name + ".*")
-        else:
-            file_names = [file_name]
-
-        for file_name in file_names:
-            if not file_type:
-                # get file's extension name
-                file_type = os.path.splitext(file_name)[1].lower()
-                if len(file_type) > 0:
-                    file_type = file_type[1:]
-
-            reader_class = readers.get_reader(file_type)
-            if not reader_class:
-                # Does support this file type, read next one.
-                continue
-
-            reader = reader_class(file_name)
-            if not reader:
-                # Does support this file type, read next one.
-                continue
-
+        reader, data_file_name = get_file_reader(file_name, file_type, widecard)
+        if reader:
             # get model
             model_obj = apps.get_model(settings.WORLD_DATA_APP, model_name)
 
-            if clear:
-                # clear old data
-                model_obj.objects.all().delete()
-
-            try:
-                # read title
-                title = reader.readln()
-
-                # get field types
-                # type = 0    means common field
-                # type = 1    means Boolean field
-                # type = 2    means Integer field
-                # type = 3    means Float field
-                # type = 4    means ForeignKey field, not support
-                # type = 5    means ManyToManyField field, not support
-                # type = -1   means field does not exist
-
-                field_types = []
-                for field_name in title:
-                    field_type = 0
-
-                    try:
-                        # get field info
-                        field = model_obj._meta.get_field(field_name)
-
-                        if isinstance(field, models.BooleanField):
-                            field_type = 1
-                        elif isinstance(field, models.IntegerField):
-                            field_type = 2
-                        elif isinstance(field, models.FloatField):
-                            field_type = 3
-                        elif isinstance(field, models.ForeignKey):
-                            field_type = 4
-                        elif isinstance(field, models.ManyToManyField):
-                            field_type = 5
-                        else:
-                            field_type = 0
-                    except Exception, e:
-                        logger.log_errmsg("Field error: %s" % e)
-
-                    field_types.append(field_type)
-
-                # import values
-                # read next line
-                values = reader.readln()
-
-                while values:
-                    try:
-                        record = {}
-                        for item in zip(title, field_types, values):
-                            field_name = item[0]
-                            # skip "id" field
-                            if field_name == "id":
-                                continue
-
-                            field_type = item[1]
-                            value = item[2]
-
-                            try:
-                                # set field values
-                                if field_type == 0:
-                                    # default
-                                    record[field_name] = value
-                                elif field_type == 1:
-                                    # boolean value
-                                    if value:
-                                        if value == 'True':
-                                            record[field_name] = True
-                                        elif value == 'False':
-                                            record[field_name] = False
-                                        else:
-                                            record[field_name] = (int(value) != 0)
-                                elif field_type == 2:
-                                    # interger value
-                                    if value:
-                                        record[field_name] = int(value)
-                                elif field_type == 3:
-                                    # float value
-                                    if value:
-                                        record[field_name] = float(value)
-                            except Exception, e:
-                                print("value error: %s - '%s'" % (field_name, value))
-
-                        # create new record
-                        data = model_obj.objects.create(**record)
-                        data.save()
-                    except Exception, e:
-                        print("Can not load %s %s: %s" % (file_name, values, e))
-
-                    # read next line
-                    values = reader.readln()
-
-            except StopIteration:
-                # reach the end of file, pass this exception
-                pass
+            begin = time.time()
+            count, failed = import_reader(reader, model_obj, clear, batch_size)
+            print_import_result(data_file_name, count, failed, time.time() - begin)
 
             imported = True
-            break
     except Exception, e:
         print("Can not import file %s: %s" % (file_name, e))
 
-    if imported:
-        print("%s imported." % file_name)
-    else:
+    if not imported:
         print("Can not import file %s" % file_name)
 
     return imported
 
 
+def read_data_file(model_name, file_name):
+    """
+    Open a model's data file and read its title.
+
+    Args:
+        model_name: (string) db model's name
+        file_name: (string) file's name without the extension name
+
+    Returns:
+        (tuple) data file's name and a generator of rows which comes from parse_rows(),
+        or (None, None) if there is no supported file.
+    """
+    reader, data_file_name = get_file_reader(file_name)
+    if not reader:
+        return None, None
+
+    model_obj = apps.get_model(settings.WORLD_DATA_APP, model_name)
+
+    try:
+        # read title
+        title = reader.readln()
+    except StopIteration:
+        title = []
+
+    columns = get_columns(model_obj, title)
+    return data_file_name, parse_rows(reader, columns)
+
+
+def parse_data_file(params):
+    """
+    Read a model's data file and convert its values. It is called in worker
+    processes, so it does not touch the db.
+
+    Args:
+        params: (tuple) model's name, file's name without the extension name
+
+    Returns:
+        (tuple) model's name, data file's name, a list of rows, seconds used.
+        The data file's name is None if the file can not be read.
+    """
+    model_name, file_name = params
+    begin = time.time()
+
+    try:
+        data_file_name, rows = read_data_file(model_name, file_name)
+        if not data_file_name:
+            return model_name, None, None, 0
+
+        # Errors are sent back as strings.
+        rows = [(line, data, "%s" % error if error else None)
+                for line, data, error in rows]
+    except Exception, e:
+        print("Can not import file %s: %s" % (file_name, e))
+        return model_name, None, None, 0
+
+    return model_name, data_file_name, rows, time.time() - begin
+
+
+def stream_data_files(tasks):
+    """
+    Open data files one by one in this process. Rows are parsed while they are
+    written to the db.
+
+    Args:
+        tasks: (list) a list of (model's name, file's name without the extension name)
+
+    Returns:
+        (generator) yields model's name, data file's name, a generator of rows, None.
+    """
+    for model_name, file_name in tasks:
+        try:
+            data_file_name, rows = read_data_file(model_name, file_name)
+        except Exception, e:
+            print("Can not import file %s: %s" % (file_name, e))
+            data_file_name, rows = None, None
+
+        yield model_name, data_file_name, rows, None
+
+
+def import_models(model_names, path_name=None, clear=True, jobs=None):
+    """
+    Import data files to db models. Files are parsed in a pool of processes and
+    written to the db in the order of model_names.
+
+    Args:
+        model_names: (list) db models' names.
+        path_name: (string) the folder of data files.
+        clear: (boolean) clear old data or not.
+        jobs: (int) number of processes to parse files. If it's None, use
+              settings.IMPORT_JOBS.
+
+    Returns:
+        (list) names of imported models
+    """
+    if not path_name:
+        path_name = os.path.join(settings.GAME_DIR, settings.WORLD_DATA_FOLDER)
+
+    if not jobs:
+        jobs = settings.IMPORT_JOBS
+
+    tasks = [(model_name, os.path.join(path_name, model_name)) for model_name in model_names]
+
+    pool = None
+    if jobs > 1 and len(tasks) > 1:
+        pool = multiprocessing.Pool(min(jobs, len(tasks)))
+        results = pool.imap(parse_data_file, tasks)
+    else:
+        results = stream_data_files(tasks)
+
+    imported = []
+    try:
+        for model_name, file_name, rows, parse_cost in results:
+            if not file_name:
+                print("Can not import file %s" % os.path.join(path_name, model_name))
+                continue
+
+            try:
+                model_obj = apps.get_model(settings.WORLD_DATA_APP, model_name)
+
+                begin = time.time()
+                count, failed = write_rows(model_obj, rows, clear)
+                write_cost = time.time() - begin
+
+                if parse_cost is None:
+                    # Rows were parsed while they were written.
+                    print_import_result(file_name, count, failed, write_cost)
+                else:
+                    print_import_result(file_name, count, failed, parse_cost + write_cost)
+                    print("%s: parsed in %.3fs, written in %.3fs." % (model_name, parse_cost, write_cost))
+                imported.append(model_name)
+            except Exception, e:
+                print("Can not import file %s: %s" % (file_name, e))
+    finally:
+        if pool:
+            pool.close()
+            pool.join()
+
+    return imported
+
+
 def import_model(model_name, path_name=None, clear=True):
     """
     Import data from a data file to the db model
@@ -181,6 +503,38 @@ def import_model(model_name, path_name=None, clear=True):
     import_file(file_name, model_name, widecard=True, clear=clear)
 
 
+def import_bundle(file_name, clear=True):
+    """
+    Import all models in a data bundle.
+
+    Args:
+        file_name: (string) bundle file's name.
+        clear: (boolean) clear old data or not.
+
+    Returns:
+        (list) names of imported models
+    """
+    imported = []
+    for model_name, field_names, values in read_bundle(file_name):
+        try:
+            model_obj = apps.get_model(settings.WORLD_DATA_APP, model_name)
+
+            # skip "id" field
+            columns = [(index, field_name) for index, field_name in enumerate(field_names)
+                       if field_name != "id"]
+            rows = ((line, {field_name: value[index] for index, field_name in columns}, None)
+                    for line, value in enumerate(values, 1))
+
+            begin = time.time()
+            count, failed = write_rows(model_obj, rows, clear)
+            print_import_result("%s:%s" % (file_name, model_name), count, failed, time.time() - begin)
+            imported.append(model_name)
+        except Exception, e:
+            print("Can not import %s from %s: %s" % (model_name, file_name, e))
+
+    return imported
+
+
 def import_system_localized_strings(language=None):
     """
     Import localized strings.
@@ -214,26 +568,32 @@ def import_system_localized_strings(language=None):
             import_file(full_name, settings.SYSTEM_LOCALIZED_STRINGS, widecard=False, clear=False)
 
 
-def import_local_all():
+def import_local_all(jobs=None):
     """
     Import all local data files to models.
+
+    Args:
+        jobs: (int) number of processes to parse files.
     """
     # load models in order
     model_name_list = settings.BASIC_DATA_MODELS +\
                       settings.OBJECT_DATA_MODELS +\
                       settings.OTHER_DATA_MODELS
 
-    # import models one by one
-    for model_name in model_name_list:
-        import_model(model_name)
+    # import models
+    import_models(model_name_list, jobs=jobs)
 
     # import localized strings
     import_system_localized_strings(settings.LANGUAGE_CODE)
 
 
-def unzip_data_all(file):
+def unzip_data_all(file, jobs=None):
     """
     Import all data files from a zip file.
+
+    Args:
+        file: (file) zip file
+        jobs: (int) number of processes to parse files.
     """
     temp = tempfile.mkdtemp()
 
@@ -246,9 +606,8 @@ def unzip_data_all(file):
                           settings.OBJECT_DATA_MODELS +\
                           settings.OTHER_DATA_MODELS
 
-        # import models one by one
-        for model_name in model_name_list:
-            import_model(model_name, path_name=temp)
+        # import models
+        import_models(model_name_list, path_name=temp, jobs=jobs)
     finally:
         shutil.rmtree(temp)
 
@@ -1,78 +1,206 @@
 """
 LootHandler handles matters of loots.
+
+Loot records of a provider are compiled into a LootTable once. Tables are kept
+in world data's caches, so all objects of the same key share one table and
+tables are rebuilt when world data reloads.
 """
 
+import array
 import random
 from django.conf import settings
-from django.apps import apps
 from evennia.utils import logger
 from muddery.utils.localized_strings_handler import LS
 from muddery.statements.statement_handler import STATEMENT_HANDLER
 from muddery.utils.exception import MudderyError
+from muddery.utils.world_data_handler import WORLD_DATA_HANDLER
 
 
-class LootHandler(object):
+class LootTable(object):
     """
-    Handles matters of loots.
+    Loot records of a provider in arrays.
     """
 
-    def __init__(self, owner, model_name):
+    def __init__(self, loot_records):
         """
-        Initialize handler
+        Compile loot records.
+
+        Args:
+            loot_records: (list) loot records of a provider
         """
-        self.owner = owner
-        self.loot_list = []
+        self.objects = []
+        self.numbers = array.array("i")
+        self.odds = array.array("d")
+        self.quests = []
+        self.conditions = []
 
-        if not owner:
-            return
+        # positions of records that have a quest or a condition
+        self.conditional = set()
 
-        # load loot data
-        loot_list = []
-        try:
-            model_obj = apps.get_model(settings.WORLD_DATA_APP, model_name)
-            loot_records = model_obj.objects.filter(provider=self.owner.get_data_key())
-
-            for loot_record in loot_records:
-                loot_object = {"object": loot_record.serializable_value("object"),
-                               "number": loot_record.number,
-                               "odds": loot_record.odds,
-                               "quest": loot_record.serializable_value("quest"),
-                               "condition": loot_record.condition}
-                loot_list.append(loot_object)
-        except Exception, e:
-            logger.log_errmsg("Can't load loot info %s: %s" % (self.owner.get_data_key(), e))
+        for record in loot_records:
+            position = len(self.objects)
+            quest = record.serializable_value("quest") or None
+            condition = record.condition or None
 
-        self.loot_list = loot_list
+            self.objects.append(record.serializable_value("object"))
+            self.numbers.append(record.number)
+            self.odds.append(record.odds)
+            self.quests.append(quest)
+            self.conditions.append(condition)
 
-    def get_obj_list(self, looter):
+            if quest or condition:
+                self.conditional.add(position)
+
+    def __len__(self):
+        return len(self.objects)
+
+    def roll(self, looters, owners):
         """
-        Get a list of objects that dropped.
-        
+        Roll drops for looters.
+
+        Args:
+            looters: (list) looters, a looter can appear several times to loot
+                            several times.
+            owners: (list) the owner of loots of each looter, conditions are
+                           checked with it
+
         Returns:
-            (list) a list of object's information
+            (list) a list of dropped objects for each looter, dropped objects are
+                   {"object": object's key, "number": object's number}
         """
+        size = len(self.objects)
+        if not size:
+            return [[] for looter in looters]
 
-        def can_loot(self, looter, obj):
-            """
-            help function to decide which objects can be looted.
-            """
-            rand = random.random()
-            if obj["odds"] < rand:
-                return False
+        # Roll all looters' odds at once.
+        rand = random.random
+        rolls = [rand() for i in xrange(size * len(looters))]
 
-            if obj["quest"]:
-                if not looter.quest_handler.is_not_accomplished(obj["quest"]):
-                    return False
+        results = []
+        base = 0
+        for looter, owner in zip(looters, owners):
+            obj_list = []
+            for position in xrange(size):
+                if self.odds[position] < rolls[base + position]:
+                    continue
 
-            if not STATEMENT_HANDLER.match_condition(obj["condition"], looter, self.owner):
+                if position in self.conditional and not self.can_loot(position, looter, owner):
+                    continue
+
+                obj_list.append({"object": self.objects[position],
+                                 "number": self.numbers[position]})
+
+            results.append(obj_list)
+            base += size
+
+        return results
+
+    def can_loot(self, position, looter, owner):
+        """
+        Check a record's quest and condition.
+
+        Args:
+            position: (int) the record's position
+            looter: (object) the looter
+            owner: (object) the owner of loots
+
+        Returns:
+            (boolean) can loot or not
+        """
+        quest = self.quests[position]
+        if quest:
+            if not looter.quest_handler.is_not_accomplished(quest):
                 return False
 
-            return True
+        condition = self.conditions[position]
+        if condition:
+            if not STATEMENT_HANDLER.match_condition(condition, looter, owner):
+                return False
 
-        # Get objects that matches odds and conditions .
-        obj_list = [obj for obj in self.loot_list if can_loot(self, looter, obj)]
+        return True
+
+
+def get_loot_table(model_name, provider):
+    """
+    Get a provider's loot table, compile it if it has not been compiled.
+
+    Args:
+        model_name: (string) loot data's model name
+        provider: (string) provider's key
 
-        return obj_list
+    Returns:
+        (LootTable) loot table
+    """
+    cache = WORLD_DATA_HANDLER.get_cache("loot_tables")
+    cache_key = (model_name, provider)
+    table = cache.get(cache_key)
+    if table is None:
+        try:
+            table = LootTable(WORLD_DATA_HANDLER.filter(model_name, provider=provider))
+        except Exception, e:
+            logger.log_errmsg("Can't load loot info %s: %s" % (provider, e))
+            table = LootTable([])
+        cache[cache_key] = table
+
+    return table
+
+
+def roll_loots(rolls):
+    """
+    Roll drops for several looters from several owners at once. Owners of the
+    same key share a loot table, their rolls are done in one batch.
+
+    Args:
+        rolls: (list) (loot handler, looter) pairs
+
+    Returns:
+        (list) a list of dropped objects for each pair
+    """
+    # loot table -> positions of its rolls
+    batches = {}
+    for position, (loot_handler, looter) in enumerate(rolls):
+        batches.setdefault(loot_handler.loot_table, []).append(position)
+
+    results = [None] * len(rolls)
+    for table, positions in batches.iteritems():
+        looters = [rolls[position][1] for position in positions]
+        owners = [rolls[position][0].owner for position in positions]
+        for position, obj_list in zip(positions, table.roll(looters, owners)):
+            results[position] = obj_list
+
+    return results
+
+
+class LootHandler(object):
+    """
+    Handles matters of loots.
+    """
+
+    def __init__(self, owner, model_name):
+        """
+        Initialize handler
+        """
+        self.owner = owner
+        self.model_name = model_name
+
+    @property
+    def loot_table(self):
+        """
+        The owner's loot table.
+        """
+        if not self.owner:
+            return LootTable([])
+
+        return get_loot_table(self.model_name, self.owner.get_data_key())
+
+    def get_obj_list(self, looter):
+        """
+        Get a list of objects that dropped.
+
+        Returns:
+            (list) a list of object's information
+        """
+        return roll_loots([(self, looter)])[0]
 
     def loot(self, looter):
         """
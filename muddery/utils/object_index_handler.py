@@ -0,0 +1,143 @@
+"""
+ObjectIndexHandler maintains a bidirectional index between data keys and objects.
+
+Searching objects by their data keys needs to query the attribute table. This
+handler caches search results in memory. It is kept up to date when objects'
+data keys are set and when objects are deleted. Combat clones have their
+targets' data keys, they are kept out of the index.
+"""
+
+from django.conf import settings
+from evennia.objects.models import ObjectDB
+from evennia.utils import search
+
+
+class ObjectIndexHandler(object):
+    """
+    The handler maintains a dict of data key -> object ids and object id -> data key.
+    """
+    def __init__(self):
+        """
+        Initialize handler
+        """
+        self.clear()
+
+
+    def clear(self):
+        """
+        Clear data.
+        """
+        # data key -> a set of object ids, only has keys that have been searched
+        self.key_objects = {}
+
+        # object id -> data key
+        self.object_key = {}
+
+        # ids of objects which are kept out of the index
+        self.excluded = set()
+
+
+    def set_key(self, obj, key):
+        """
+        Set an object's data key.
+
+        Args:
+            obj: (object) the object
+            key: (string) the object's data key
+
+        Returns:
+            None
+        """
+        obj_id = obj.id
+        self.remove_object(obj_id)
+        if obj_id in self.excluded:
+            return
+
+        self.object_key[obj_id] = key
+        if key in self.key_objects:
+            self.key_objects[key].add(obj_id)
+
+
+    def remove_object(self, obj_id):
+        """
+        Remove an object from the index.
+
+        Args:
+            obj_id: (int) the object's id
+
+        Returns:
+            None
+        """
+        key = self.object_key.pop(obj_id, None)
+        if key in self.key_objects:
+            self.key_objects[key].discard(obj_id)
+
+
+    def exclude_object(self, obj_id):
+        """
+        Keep an object out of the index.
+
+        Args:
+            obj_id: (int) the object's id
+
+        Returns:
+            None
+        """
+        self.remove_object(obj_id)
+        self.excluded.add(obj_id)
+
+
+    def search(self, key):
+        """
+        Search objects which have the given data key.
+
+        Args:
+            key: (string) data key
+
+        Returns:
+            (list) objects
+        """
+        if key not in self.key_objects:
+            # Search in db.
+            objects = search.search_object_attribute(key="key", strvalue=key, category=settings.DATA_KEY_CATEGORY)
+
+            # Exclude combat clones in one query.
+            clone_ids = ObjectDB.objects.filter(id__in=[obj.id for obj in objects],
+                                                db_tags__db_category=settings.COMBAT_CLONE_CATEGORY)
+            self.excluded.update(clone_ids.values_list("id", flat=True))
+            objects = [obj for obj in objects if obj.id not in self.excluded]
+
+            obj_ids = set()
+            for obj in objects:
+                obj_ids.add(obj.id)
+                self.object_key[obj.id] = key
+            self.key_objects[key] = obj_ids
+
+            return list(objects)
+
+        # Get cached objects.
+        objects = []
+        missing = []
+        for obj_id in sorted(self.key_objects[key]):
+            obj = ObjectDB.get_cached_instance(obj_id)
+            if obj:
+                objects.append(obj)
+            else:
+                missing.append(obj_id)
+
+        if missing:
+            # Load objects that are not in the cache.
+            loaded = list(ObjectDB.objects.filter(id__in=missing))
+            objects.extend(loaded)
+
+            # Remove objects that do not exist any more.
+            loaded_ids = set(obj.id for obj in loaded)
+            for obj_id in missing:
+                if obj_id not in loaded_ids:
+                    self.remove_object(obj_id)
+
+        return objects
+
+
+# main object index handler
+OBJECT_INDEX_HANDLER = ObjectIndexHandler()
@@ -3,7 +3,7 @@ Object key handler, stores key's model name.
 """
 
 from django.conf import settings
-from django.apps import apps
+from muddery.utils.world_data_handler import WORLD_DATA_HANDLER
 
 
 class ObjectKeyHandler(object):
@@ -30,16 +30,12 @@ class ObjectKeyHandler(object):
 
         # Get model names.
         for model_name in settings.OBJECT_DATA_MODELS + settings.OBJECT_ADDITIONAL_DATA:
-            try:
-                model_obj = apps.get_model(settings.WORLD_DATA_APP, model_name)
-                for record in model_obj.objects.all():
-                    # Add key's model name.
-                    key = record.serializable_value("key")
-                    if key not in self.key_model:
-                        self.key_model[key] = []
-                    self.key_model[key].append(model_name)
-            except Exception, e:
-                pass
+            for record in WORLD_DATA_HANDLER.all(model_name):
+                # Add key's model name.
+                key = record.serializable_value("key")
+                if key not in self.key_model:
+                    self.key_model[key] = []
+                self.key_model[key].append(model_name)
 
     def get_models(self, key):
         """
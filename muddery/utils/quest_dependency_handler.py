@@ -3,11 +3,28 @@ QuestDependencyHandler deals quest's dependencies.
 """
 
 from muddery.utils import defines
+from muddery.utils.world_data_handler import WORLD_DATA_HANDLER
 from django.conf import settings
-from django.apps import apps
 from evennia.utils import logger
 
 
+# Dependency types which only depend on quests' states -> quest states that match them.
+DEPENDENCY_STATES = {
+    defines.DEPENDENCY_QUEST_ACCEPTED: frozenset([defines.QUEST_STATE_IN_PROGRESS,
+                                                  defines.QUEST_STATE_COMPLETED,
+                                                  defines.QUEST_STATE_IN_PROGRESS | defines.QUEST_STATE_COMPLETED]),
+    defines.DEPENDENCY_QUEST_NOT_ACCEPTED: frozenset([defines.QUEST_STATE_NONE]),
+    defines.DEPENDENCY_QUEST_IN_PROGRESS: frozenset([defines.QUEST_STATE_IN_PROGRESS,
+                                                     defines.QUEST_STATE_IN_PROGRESS | defines.QUEST_STATE_COMPLETED]),
+    defines.DEPENDENCY_QUEST_NOT_IN_PROGRESS: frozenset([defines.QUEST_STATE_NONE,
+                                                         defines.QUEST_STATE_COMPLETED]),
+    defines.DEPENDENCY_QUEST_COMPLETED: frozenset([defines.QUEST_STATE_COMPLETED,
+                                                   defines.QUEST_STATE_IN_PROGRESS | defines.QUEST_STATE_COMPLETED]),
+    defines.DEPENDENCY_QUEST_NOT_COMPLETED: frozenset([defines.QUEST_STATE_NONE,
+                                                       defines.QUEST_STATE_IN_PROGRESS]),
+}
+
+
 class QuestDependencyHandler(object):
     """
     This class handels the relation of quest.
@@ -16,49 +33,36 @@ class QuestDependencyHandler(object):
         """
         Initialize handler
         """
-        self.quest_depencences = {}
+        self.clear()
 
 
-    def get_quest_dependencies(self, quest):
+    def reload(self):
         """
-        Get quest's dependencies.
+        Load all quests' dependencies from world data.
         """
-        if not quest:
-            return
+        self.clear()
 
-        self.load_dependencies_cache(quest)
-        return self.quest_depencences[quest]
+        for record in WORLD_DATA_HANDLER.all(settings.QUEST_DEPENDENCIES):
+            self.quest_depencences.setdefault(record.quest, []).append({"quest": record.dependency,
+                                                                        "type": record.type})
 
+            if record.type in DEPENDENCY_STATES:
+                # Only need the quest's state.
+                self.state_dependencies.setdefault(record.quest, []).append((record.dependency,
+                                                                             DEPENDENCY_STATES[record.type]))
+            else:
+                self.other_dependencies.setdefault(record.quest, []).append((record.dependency,
+                                                                             record.type))
 
-    def load_dependencies_cache(self, quest):
+
+    def get_quest_dependencies(self, quest):
         """
-        To reduce database accesses, add a cache.
+        Get quest's dependencies.
         """
         if not quest:
             return
 
-        if quest in self.quest_depencences:
-            # already cached
-            return
-
-        # Add cache of the whole dialogue.
-        self.quest_depencences[quest] = []
-        
-        # Get db model
-        dependencies = []
-        model_dependencies = apps.get_model(settings.WORLD_DATA_APP, settings.QUEST_DEPENDENCIES)
-        if model_dependencies:
-            # Get records.
-            dependencies = model_dependencies.objects.filter(quest=quest)
-
-        # Add db fields to data object.
-        data = []
-        for dependency in dependencies:
-            data.append({"quest": dependency.dependency,
-                         "type": dependency.type})
-
-        # Add to cache.
-        self.quest_depencences[quest] = data
+        return self.quest_depencences.get(quest, [])
 
 
     def match_quest_dependencies(self, caller, quest):
@@ -71,9 +75,14 @@ class QuestDependencyHandler(object):
         if not quest:
             return False
 
-        for dependency in self.get_quest_dependencies(quest):
-            # match each dependency
-            if not self.match_dependency(caller, dependency["quest"], dependency["type"]):
+        # Match dependencies on quests' states first, they are cheap.
+        states = caller.quest_handler.states
+        for dependency, matched_states in self.state_dependencies.get(quest, ()):
+            if states.get(dependency, defines.QUEST_STATE_NONE) not in matched_states:
+                return False
+
+        for dependency, dependency_type in self.other_dependencies.get(quest, ()):
+            if not self.match_dependency(caller, dependency, dependency_type):
                 return False
 
         return True
@@ -83,15 +92,11 @@ class QuestDependencyHandler(object):
         """
         check a dependency
         """
-        if dependency_type == defines.DEPENDENCY_QUEST_CAN_PROVIDE:
+        if dependency_type in DEPENDENCY_STATES:
+            return caller.quest_handler.get_state(quest) in DEPENDENCY_STATES[dependency_type]
+        elif dependency_type == defines.DEPENDENCY_QUEST_CAN_PROVIDE:
             if not caller.quest_handler.can_provide(quest):
                 return False
-        elif dependency_type == defines.DEPENDENCY_QUEST_IN_PROGRESS:
-            if not caller.quest_handler.is_in_progress(quest):
-                return False
-        elif dependency_type == defines.DEPENDENCY_QUEST_NOT_IN_PROGRESS:
-            if caller.quest_handler.is_in_progress(quest):
-                return False
         elif dependency_type == defines.DEPENDENCY_QUEST_ACCOMPLISHED:
             if not caller.quest_handler.is_accomplished(quest):
                 return False
@@ -100,20 +105,6 @@ class QuestDependencyHandler(object):
                 return False
             if caller.quest_handler.is_accomplished(quest):
                 return False
-        elif dependency_type == defines.DEPENDENCY_QUEST_COMPLETED:
-            if not caller.quest_handler.is_completed(quest):
-                return False
-        elif dependency_type == defines.DEPENDENCY_QUEST_NOT_COMPLETED:
-            if caller.quest_handler.is_completed(quest):
-                return False
-        elif dependency_type == defines.DEPENDENCY_QUEST_ACCEPTED:
-            if not caller.quest_handler.is_completed(quest) and \
-               not caller.quest_handler.is_in_progress(quest):
-                return False
-        elif dependency_type == defines.DEPENDENCY_QUEST_NOT_ACCEPTED:
-            if caller.quest_handler.is_completed(quest) or \
-               caller.quest_handler.is_in_progress(quest):
-                return False
 
         return True
 
@@ -122,8 +113,15 @@ class QuestDependencyHandler(object):
         """
         clear cache
         """
+        # quest's key -> a list of dependencies
         self.quest_depencences = {}
 
+        # quest's key -> a list of (dependency, quest states that match it)
+        self.state_dependencies = {}
+
+        # quest's key -> a list of (dependency, dependency type)
+        self.other_dependencies = {}
+
 
 # main quest_dependendy_handler
 QUEST_DEP_HANDLER = QuestDependencyHandler()
@@ -2,16 +2,16 @@
 QuestHandler handles a character's quests.
 """
 
-from django.conf import settings
-from django.apps import apps
-from django.core.exceptions import ObjectDoesNotExist
 from evennia.utils import logger
+from evennia.utils.utils import delay
+from muddery.utils import defines
 from muddery.utils.builder import build_object
 from muddery.utils.quest_dependency_handler import QUEST_DEP_HANDLER
 from muddery.statements.statement_handler import STATEMENT_HANDLER
 from muddery.utils.localized_strings_handler import LS
 from muddery.utils.exception import MudderyError
 from muddery.utils.object_key_handler import OBJECT_KEY_HANDLER
+from muddery.utils.world_data_handler import WORLD_DATA_HANDLER
 from muddery.utils.game_settings import GAME_SETTINGS
 
 
@@ -28,6 +28,56 @@ class QuestHandler(object):
         self.current_quests = owner.db.current_quests
         self.completed_quests = owner.db.completed_quests
 
+        # Keep quests' states in memory, so checking them does not need to
+        # read attributes.
+        # quest's key -> quest's state bits
+        self.states = {}
+        for quest_key in self.completed_quests:
+            self.states[quest_key] = defines.QUEST_STATE_COMPLETED
+        for quest_key in self.current_quests:
+            self.states[quest_key] = self.states.get(quest_key, defines.QUEST_STATE_NONE) |\
+                                     defines.QUEST_STATE_IN_PROGRESS
+
+        # Index quests' objectives.
+        # (objective's type, object's key) -> a list of (quest's key, objective's ordinal)
+        self.objective_index = {}
+        for quest_key in self.current_quests:
+            self.add_objectives(quest_key)
+
+        # If quests will be sent to the owner.
+        self.quests_to_show = False
+
+    def add_objectives(self, quest_key):
+        """
+        Add a quest's objectives which are not accomplished to the index.
+
+        Args:
+            quest_key: (string) quest's key
+
+        Returns:
+            None
+        """
+        quest = self.current_quests[quest_key]
+        for type, object_key, ordinal in quest.get_not_accomplished_objectives():
+            self.objective_index.setdefault((type, object_key), []).append((quest_key, ordinal))
+
+    def remove_objectives(self, quest_key):
+        """
+        Remove a quest's objectives from the index.
+
+        Args:
+            quest_key: (string) quest's key
+
+        Returns:
+            None
+        """
+        for index_key in self.objective_index.keys():
+            targets = [target for target in self.objective_index[index_key] if target[0] != quest_key]
+            if targets:
+                self.objective_index[index_key] = targets
+            else:
+                del self.objective_index[index_key]
+
     def accept(self, quest_key):
         """
         Accept a quest.
@@ -48,6 +98,8 @@ class QuestHandler(object):
 
         new_quest.set_owner(self.owner)
         self.current_quests[quest_key] = new_quest
+        self.states[quest_key] = self.get_state(quest_key) | defines.QUEST_STATE_IN_PROGRESS
+        self.add_objectives(quest_key)
 
         self.owner.msg({"msg": LS("Accepted quest {c%s{n.") % new_quest.get_name()})
         self.show_quests()
@@ -71,10 +123,12 @@ class QuestHandler(object):
             raise MudderyError(LS("Can not find this quest."))
 
         del(self.current_quests[quest_key])
+        self.remove_objectives(quest_key)
 
         self.completed_quests.add(quest_key)
         if quest_key in self.completed_quests:
             self.completed_quests.remove(quest_key)
+        self.states.pop(quest_key, None)
 
         self.show_quests()
 
@@ -102,13 +156,27 @@ class QuestHandler(object):
 
         # Delete the quest.
         del (self.current_quests[quest_key])
+        self.remove_objectives(quest_key)
 
         self.completed_quests.add(quest_key)
+        self.states[quest_key] = defines.QUEST_STATE_COMPLETED
 
         self.owner.msg({"msg": LS("Completed quest {c%s{n.") % name})
         self.show_quests()
         self.owner.show_location()
 
+    def get_state(self, quest_key):
+        """
+        Get the state of a quest.
+
+        Args:
+            quest_key: (string) quest's key
+
+        Returns:
+            (int) quest's state bits
+        """
+        return self.states.get(quest_key, defines.QUEST_STATE_NONE)
+
     def get_accomplished_quests(self):
         """
         Get all quests that their objectives are accomplished.
@@ -130,7 +198,7 @@ class QuestHandler(object):
         Returns:
             None
         """
-        if quest_key not in self.current_quests:
+        if not self.is_in_progress(quest_key):
             return False
 
         return self.current_quests[quest_key].is_accomplished()
@@ -145,7 +213,7 @@ class QuestHandler(object):
         Returns:
             None
         """
-        if quest_key not in self.current_quests:
+        if not self.is_in_progress(quest_key):
             return False
         return not self.current_quests[quest_key].is_accomplished()
 
@@ -159,7 +227,7 @@ class QuestHandler(object):
         Returns:
             None
         """
-        return quest_key in self.completed_quests
+        return bool(self.get_state(quest_key) & defines.QUEST_STATE_COMPLETED)
 
     def is_in_progress(self, quest_key):
         """
@@ -171,7 +239,7 @@ class QuestHandler(object):
         Returns:
             None
         """
-        return quest_key in self.current_quests
+        return bool(self.get_state(quest_key) & defines.QUEST_STATE_IN_PROGRESS)
 
     def can_provide(self, quest_key):
         """
@@ -183,10 +251,8 @@ class QuestHandler(object):
         Returns:
             None
         """
-        if self.is_completed(quest_key):
-            return False
-
-        if self.is_in_progress(quest_key):
+        if self.get_state(quest_key) != defines.QUEST_STATE_NONE:
+            # The quest has been accepted.
             return False
 
         if not self.match_dependencies(quest_key):
@@ -224,22 +290,30 @@ class QuestHandler(object):
             return False
 
         for model_name in model_names:
-            model_quest = apps.get_model(settings.WORLD_DATA_APP, model_name)
-
-            try:
-                record = model_quest.objects.get(key=quest_key)
+            record = WORLD_DATA_HANDLER.get(model_name, quest_key)
+            if record and hasattr(record, "condition"):
                 return STATEMENT_HANDLER.match_condition(record.condition, self.owner, None)
-            except ObjectDoesNotExist:
-                continue
-            except AttributeError:
-                continue
 
         return True
 
     def show_quests(self):
         """
         Send quests to player.
+
+        Quests may change many times in one command, so they are sent after
+        the command once.
+        """
+        if self.quests_to_show:
+            return
+
+        self.quests_to_show = True
+        delay(0, self.send_quests)
+
+    def send_quests(self):
         """
+        Send quests to player now.
+        """
+        self.quests_to_show = False
         quests = self.return_quests()
         self.owner.msg({"quests": quests})
 
@@ -271,13 +345,24 @@ class QuestHandler(object):
         Returns:
             None
         """
-        status_changed = False
-        for quest in self.current_quests.values():
-            if quest.at_objective(object_type, object_key, number):
-                status_changed = True
-                if quest.is_accomplished():
-                    self.owner.msg({"msg":
-                        LS("Quest {c%s{n's goals are accomplished.") % quest.name})
-
-        if status_changed:
-            self.show_quests()
+        targets = self.objective_index.get((object_type, object_key))
+        if not targets:
+            return
+
+        changed_quests = set()
+        for quest_key, ordinal in list(targets):
+            changed_quests.add(quest_key)
+            if self.current_quests[quest_key].add_accomplished(ordinal, number):
+                # The objective is accomplished, remove it.
+                targets.remove((quest_key, ordinal))
+
+        if not targets:
+            del self.objective_index[(object_type, object_key)]
+
+        for quest_key in changed_quests:
+            quest = self.current_quests[quest_key]
+            if quest.is_accomplished():
+                self.owner.msg({"msg":
+                    LS("Quest {c%s{n's goals are accomplished.") % quest.name})
+
+        self.show_quests()
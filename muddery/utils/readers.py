@@ -40,6 +40,21 @@ class DataReader(object):
         # No data.
         raise StopIteration
 
+    def __iter__(self):
+        """
+        Readers can be iterated line by line.
+        """
+        return self
+
+    def next(self):
+        """
+        Read next data line.
+
+        Returns:
+            list: data line
+        """
+        return self.readln()
+
 
 class CSVReader(DataReader):
     """
@@ -5,11 +5,12 @@ Skill handler handles a character's skills.
 
 import time
 import random
+import array
 from django.conf import settings
-from evennia import TICKER_HANDLER
 from muddery.utils.builder import build_object
 from muddery.utils.localized_strings_handler import LS
 from muddery.utils.game_settings import GAME_SETTINGS
+from muddery.utils.combat_engine import COMBAT_ENGINE
 
 
 class SkillHandler(object):
@@ -33,12 +34,21 @@ class SkillHandler(object):
         self.skill_target = None
         self.gcd_finish_time = 0
 
+        # Skills' cd are kept in memory, they are saved when the owner logs out
+        # or the server stops.
+        # skill's key -> the position of its cd finish time
+        self.cd_positions = {}
+        self.cd_finish_times = array.array("d")
+
+        # skills whose cd have not been saved
+        self.unsaved_cd = set()
+
     def __del__(self):
         """
-        Remove tickers.
+        Stop casting skills automatically.
         """
         if self.can_auto_cast:
-            TICKER_HANDLER.remove(callback=self.owner.auto_cast_skill)
+            COMBAT_ENGINE.remove_auto_caster(self.owner)
 
     def get_all(self):
         """
@@ -151,6 +161,71 @@ class SkillHandler(object):
 
         return
 
+    def get_cd_finish_time(self, skill_key):
+        """
+        Get the time when the skill's cd finishes.
+
+        Args:
+            skill_key: (string) skill's key
+
+        Returns:
+            (float) the finish time
+        """
+        position = self.cd_positions.get(skill_key)
+        if position is None:
+            # Load the saved cd.
+            finish_time = 0
+            if skill_key in self.skills:
+                finish_time = self.skills[skill_key].db.cd_finish_time or 0
+
+            position = len(self.cd_finish_times)
+            self.cd_finish_times.append(finish_time)
+            self.cd_positions[skill_key] = position
+
+        return self.cd_finish_times[position]
+
+    def set_cd_finish_time(self, skill_key, finish_time):
+        """
+        Set the time when the skill's cd finishes.
+
+        Args:
+            skill_key: (string) skill's key
+            finish_time: (float) the finish time
+
+        Returns:
+            None
+        """
+        if skill_key not in self.cd_positions:
+            self.cd_positions[skill_key] = len(self.cd_finish_times)
+            self.cd_finish_times.append(finish_time)
+        else:
+            self.cd_finish_times[self.cd_positions[skill_key]] = finish_time
+
+        self.unsaved_cd.add(skill_key)
+
+    def save_cd(self):
+        """
+        Save skills' cd to the db.
+        """
+        for skill_key in self.unsaved_cd:
+            if skill_key in self.skills:
+                self.skills[skill_key].db.cd_finish_time = self.cd_finish_times[self.cd_positions[skill_key]]
+
+        self.unsaved_cd = set()
+
+    def reset_cd(self):
+        """
+        Clear all skills' cd and the gcd.
+        """
+        self.gcd_finish_time = 0
+        self.cd_positions = {}
+        self.cd_finish_times = array.array("d")
+        self.unsaved_cd = set()
+
+        for skill in self.skills.values():
+            if skill.db.cd_finish_time:
+                skill.db.cd_finish_time = 0
+
     def auto_cast_skill(self):
         """
         Cast a new skill automatically.
@@ -162,8 +237,8 @@ class SkillHandler(object):
             return
 
         if not self.owner.ndb.combat_handler:
-            # combat is finished, stop ticker
-            TICKER_HANDLER.remove(self.auto_cast_skill_cd, self.owner.auto_cast_skill)
+            # combat is finished, stop auto cast
+            self.stop_auto_combat_skill()
             return
 
         # Get target.
@@ -240,12 +315,12 @@ class SkillHandler(object):
         # Cast a skill immediately
         self.auto_cast_skill()
 
-        # Set timer of auto cast.
-        TICKER_HANDLER.add(self.auto_cast_skill_cd, self.owner.auto_cast_skill)
+        # Let the combat engine cast skills.
+        COMBAT_ENGINE.add_auto_caster(self.owner, self.auto_cast_skill_cd)
 
     def stop_auto_combat_skill(self):
         """
         Stop auto cast skill.
         """
         self.can_auto_cast = False
-        TICKER_HANDLER.remove(self.auto_cast_skill_cd, self.owner.auto_cast_skill)
+        COMBAT_ENGINE.remove_auto_caster(self.owner)
@@ -9,6 +9,7 @@ be of use when designing your own game.
 import os
 from django.conf import settings
 from evennia.utils import search, logger
+from muddery.utils.object_index_handler import OBJECT_INDEX_HANDLER
 
 
 def get_muddery_version():
@@ -28,6 +29,7 @@ def set_obj_data_key(obj, key):
         key: (string) key of the data.
     """
     obj.attributes.add("key", key, category=settings.DATA_KEY_CATEGORY, strattr=True)
+    OBJECT_INDEX_HANDLER.set_key(obj, key)
 
 
 def search_obj_data_key(key):
@@ -40,8 +42,7 @@ def search_obj_data_key(key):
     if not key:
         return None
 
-    obj = search.search_object_attribute(key="key", strvalue=key, category=settings.DATA_KEY_CATEGORY)
-    return obj
+    return OBJECT_INDEX_HANDLER.search(key)
 
 
 def set_obj_unique_type(obj, type):
@@ -55,6 +56,27 @@ def set_obj_unique_type(obj, type):
     obj.attributes.add("type", type, category=settings.DATA_KEY_CATEGORY, strattr=True)
 
 
+def set_obj_data_hash(obj, data_hash):
+    """
+    Set the hash of the world data that the object was built with.
+
+    Args:
+        obj: (object) object to be set
+        data_hash: (string) hash of the object's data.
+    """
+    obj.attributes.add("hash", data_hash, category=settings.DATA_KEY_CATEGORY, strattr=True)
+
+
+def get_obj_data_hash(obj):
+    """
+    Get the hash of the world data that the object was built with.
+
+    Args:
+        obj: (object) object
+    """
+    return obj.attributes.get(key="hash", category=settings.DATA_KEY_CATEGORY, strattr=True)
+
+
 def search_obj_unique_type(type):
     """
     Search objects which have the given unique type.
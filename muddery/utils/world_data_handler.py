@@ -0,0 +1,301 @@
+"""
+WorldDataHandler keeps a read-only snapshot of all world data in memory.
+
+Records are loaded once and indexed by their keys and by the columns in
+settings.WORLD_DATA_INDEX_FIELDS, so objects can load their data without
+querying the database.
+"""
+
+import os
+import gc
+import hashlib
+from django.conf import settings
+from django.apps import apps
+from django.db.models.base import ModelState
+from evennia.utils import logger
+from muddery.utils.data_bundle import read_bundle
+
+
+def get_record_hash(record):
+    """
+    Get the hash of a record's values.
+
+    Args:
+        record: (model) a world data record
+
+    Returns:
+        (string) hash
+    """
+    values = [record.serializable_value(field.name) for field in record._meta.fields
+              if not field.primary_key]
+    return hashlib.md5(repr(values)).hexdigest()
+
+
+class WorldDataHandler(object):
+    """
+    The handler maintains a dict of model name -> records and indexes of these records.
+    """
+    def __init__(self):
+        """
+        Initialize handler
+        """
+        self.clear()
+
+
+    def clear(self):
+        """
+        Clear data.
+        """
+        # model name -> a list of records
+        self.records = {}
+
+        # model name -> {field name -> {field value -> a list of records}}
+        self.indexes = {}
+
+        # cache name -> data derived from world data
+        self.caches = {}
+
+
+    def reload(self, bundle=None):
+        """
+        Reload all world data models.
+
+        Args:
+            bundle: (string) a data bundle's file name. If the file exists, load
+                    models from it instead of the db.
+        """
+        self.clear()
+
+        if bundle and os.path.exists(bundle):
+            try:
+                self.load_bundle(bundle)
+            except Exception, e:
+                logger.log_errmsg("Can not load world data bundle %s: %s" % (bundle, e))
+                self.clear()
+
+        model_names = settings.BASIC_DATA_MODELS +\
+                      settings.OBJECT_DATA_MODELS +\
+                      settings.OTHER_DATA_MODELS
+
+        for model_name in model_names:
+            if model_name not in self.records:
+                self.load_model(model_name)
+
+
+    def load_bundle(self, file_name):
+        """
+        Load models from a data bundle.
+
+        Args:
+            file_name: (string) bundle file's name
+
+        Returns:
+            None
+        """
+        # Creating lots of records triggers the garbage collector again and again,
+        # but no garbage is produced here.
+        gc_enabled = gc.isenabled()
+        gc.disable()
+
+        try:
+            for model_name, field_names, values in read_bundle(file_name):
+                try:
+                    model_obj = apps.get_model(settings.WORLD_DATA_APP, model_name)
+                except LookupError:
+                    continue
+
+                fields = model_obj._meta.concrete_fields
+                if field_names != [field.name for field in fields]:
+                    # The model has changed, load it from the db.
+                    continue
+
+                # Records are read-only, so set their values directly instead of
+                # calling the model's __init__(), which is much slower.
+                attnames = [field.attname for field in fields]
+                records = []
+                for value in values:
+                    record = model_obj.__new__(model_obj)
+                    record.__dict__.update(zip(attnames, value))
+                    record._state = ModelState()
+                    record._state.adding = False
+                    records.append(record)
+
+                self.set_records(model_name, model_obj, records)
+        finally:
+            if gc_enabled:
+                gc.enable()
+
+
+    def load_model(self, model_name):
+        """
+        Load a model's records and build its indexes.
+
+        Args:
+            model_name: (string) the name of the data model
+
+        Returns:
+            None
+        """
+        try:
+            model_obj = apps.get_model(settings.WORLD_DATA_APP, model_name)
+            self.set_records(model_name, model_obj, list(model_obj.objects.all()))
+        except Exception, e:
+            logger.log_errmsg("Can not load world data %s: %s" % (model_name, e))
+            self.records[model_name] = []
+            self.indexes[model_name] = {}
+
+
+    def set_records(self, model_name, model_obj, records):
+        """
+        Set a model's records and build their indexes.
+
+        Args:
+            model_name: (string) the name of the data model
+            model_obj: (model) the data model
+            records: (list) records
+
+        Returns:
+            None
+        """
+        indexes = {}
+        field_names = set(field.name for field in model_obj._meta.fields)
+        for field_name in settings.WORLD_DATA_INDEX_FIELDS:
+            if field_name not in field_names:
+                continue
+
+            index = {}
+            for record in records:
+                value = record.serializable_value(field_name)
+                if value in index:
+                    index[value].append(record)
+                else:
+                    index[value] = [record]
+            indexes[field_name] = index
+
+        self.records[model_name] = records
+        self.indexes[model_name] = indexes
+
+
+    def all(self, model_name):
+        """
+        Get all records of a model.
+
+        Args:
+            model_name: (string) the name of the data model
+
+        Returns:
+            (list) records
+        """
+        if model_name not in self.records:
+            self.load_model(model_name)
+
+        return self.records[model_name]
+
+
+    def filter(self, model_name, **kwargs):
+        """
+        Get records which match all the given field values.
+
+        Args:
+            model_name: (string) the name of the data model
+            kwargs: field names and values
+
+        Returns:
+            (list) records
+        """
+        if model_name not in self.records:
+            self.load_model(model_name)
+
+        indexes = self.indexes[model_name]
+
+        # Use an index to get candidates.
+        records = None
+        conditions = []
+        for field_name, value in kwargs.items():
+            if records is None and field_name in indexes:
+                records = indexes[field_name].get(value, [])
+            else:
+                conditions.append((field_name, value))
+
+        if records is None:
+            records = self.records[model_name]
+
+        if conditions:
+            records = [record for record in records
+                       if all(record.serializable_value(field_name) == value
+                              for field_name, value in conditions)]
+
+        return records
+
+
+    def get(self, model_name, key):
+        """
+        Get a record by its key.
+
+        Args:
+            model_name: (string) the name of the data model
+            key: (string) the record's key
+
+        Returns:
+            a record or None
+        """
+        records = self.filter(model_name, key=key)
+        if records:
+            return records[0]
+        return None
+
+
+    def get_cache(self, name):
+        """
+        Get a cache to keep data derived from world data. Caches are cleared
+        when world data reloads.
+
+        Args:
+            name: (string) the cache's name
+
+        Returns:
+            (dict) the cache
+        """
+        if name not in self.caches:
+            self.caches[name] = {}
+        return self.caches[name]
+
+
+    def is_linked_model(self, model_name):
+        """
+        If the model's records link to objects with settings.OBJECT_LINK_FIELDS.
+
+        Args:
+            model_name: (string) the name of the data model
+
+        Returns:
+            (boolean) result
+        """
+        if model_name not in self.records:
+            self.load_model(model_name)
+
+        indexes = self.indexes[model_name]
+        return any(field_name in indexes for field_name in settings.OBJECT_LINK_FIELDS)
+
+
+    def get_linked_records(self, key):
+        """
+        Get records which link to an object with settings.OBJECT_LINK_FIELDS.
+
+        Args:
+            key: (string) the object's key
+
+        Returns:
+            (list) a list of (model name, record)
+        """
+        records = []
+        for model_name, indexes in self.indexes.items():
+            for field_name in settings.OBJECT_LINK_FIELDS:
+                if field_name in indexes:
+                    records.extend((model_name, record) for record in indexes[field_name].get(key, []))
+
+        return records
+
+
+# main world data handler
+WORLD_DATA_HANDLER = WorldDataHandler()
@@ -0,0 +1,131 @@
+"""
+WorldMapHandler keeps the graph of the world map in memory.
+
+The graph is built from world rooms and world exits. Characters' revealed maps
+are assembled from it without searching room objects.
+"""
+
+import ast
+import hashlib
+from django.conf import settings
+from evennia.utils import logger
+from muddery.utils.world_data_handler import WORLD_DATA_HANDLER
+
+
+class WorldMapHandler(object):
+    """
+    The handler maintains rooms, exits and the adjacency of rooms.
+    """
+    def __init__(self):
+        """
+        Initialize handler
+        """
+        self.clear()
+
+
+    def clear(self):
+        """
+        Clear data.
+        """
+        # room's key -> (room's name, room's position)
+        self.rooms = {}
+
+        # room's key -> {exit's key: (room's key, destination's key)}
+        self.room_exits = {}
+
+        # the hash of the map data
+        self.version = ""
+
+
+    def reload(self):
+        """
+        Build the map from world data.
+        """
+        self.clear()
+
+        for record in WORLD_DATA_HANDLER.all(settings.WORLD_ROOMS):
+            position = None
+            try:
+                if record.position:
+                    position = ast.literal_eval(record.position)
+            except Exception, e:
+                logger.log_errmsg("load %s's position error: %s" % (record.key, e))
+
+            self.rooms[record.key] = (record.name, position)
+            self.room_exits[record.key] = {}
+
+        for record in WORLD_DATA_HANDLER.all(settings.WORLD_EXITS):
+            self.add_exit(record.key, record.location, record.destination)
+
+            if record.typeclass == settings.TWO_WAY_EXIT_TYPECLASS_KEY:
+                # Add the reverse exit.
+                self.add_exit(settings.REVERSE_EXIT_PREFIX + record.key, record.destination, record.location)
+
+        data = (sorted(self.rooms.items()),
+                sorted((room_key, sorted(exits.items())) for room_key, exits in self.room_exits.items()))
+        self.version = hashlib.md5(repr(data)).hexdigest()
+
+
+    def add_exit(self, exit_key, location, destination):
+        """
+        Add an exit to the map.
+
+        Args:
+            exit_key: (string) exit's key
+            location: (string) the key of the exit's location
+            destination: (string) the key of the exit's destination
+
+        Returns:
+            None
+        """
+        if location not in self.room_exits or destination not in self.rooms:
+            return
+
+        self.room_exits[location][exit_key] = (location, destination,)
+
+
+    def get_exits(self, room_key):
+        """
+        Get a room's exits.
+
+        Args:
+            room_key: (string) room's key
+
+        Returns:
+            (dict) {exit's key: (room's key, destination's key)}
+        """
+        return self.room_exits.get(room_key, {})
+
+
+    def get_map(self, room_keys):
+        """
+        Get the map of given rooms and their neighbours.
+
+        Args:
+            room_keys: (iterable) rooms' keys
+
+        Returns:
+            {
+                "rooms": {room1's key: (name, position),
+                          room2's key: (name, position),
+                          ...},
+                "exits": {exit1's key: (room1's key, room2's key),
+                          exit2's key: (room3's key, room4's key},
+                          ...}
+            }
+        """
+        room_keys = set(room_keys).intersection(self.rooms)
+
+        exits = {}
+        for room_key in room_keys:
+            exits.update(self.room_exits[room_key])
+
+        # add rooms' neighbours
+        map_rooms = room_keys.union(path[1] for path in exits.values())
+        rooms = dict((room_key, self.rooms[room_key]) for room_key in map_rooms)
+
+        return {"rooms": rooms, "exits": exits}
+
+
+# main world map handler
+WORLD_MAP_HANDLER = WorldMapHandler()
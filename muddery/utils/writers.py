@@ -18,6 +18,51 @@ except ImportError:
     xlsxwriter = None
 
 
+class LineBuffer(object):
+    """
+    A file-like object which keeps written data in memory.
+    """
+    def __init__(self):
+        self.data = []
+        self.size = 0
+
+    def write(self, data):
+        self.data.append(data)
+        self.size += len(data)
+
+    def pop(self):
+        """
+        Get written data and clear the buffer.
+        """
+        data = "".join(self.data)
+        self.data = []
+        self.size = 0
+        return data
+
+
+def stream_csv(lines, chunk_size):
+    """
+    Convert data lines to csv content.
+
+    Args:
+        lines: (iterable) data lines
+        chunk_size: (int) the size of each piece
+
+    Returns:
+        (generator) pieces of csv content
+    """
+    buffer = LineBuffer()
+    writer = csv.writer(buffer, dialect='excel')
+
+    for line in lines:
+        writer.writerow(line)
+        if buffer.size >= chunk_size:
+            yield buffer.pop()
+
+    if buffer.size:
+        yield buffer.pop()
+
+
 class DataWriter(object):
     """
     Game data file writer.
@@ -27,6 +72,9 @@ class DataWriter(object):
     file_ext = None
     binary = True
 
+    # If the writer can write data to a stream.
+    streamable = False
+
     def __init__(self, filename = None):
         """
         Args:
@@ -59,6 +107,21 @@ class DataWriter(object):
         """
         pass
 
+    @classmethod
+    def stream(cls, lines, chunk_size=65536):
+        """
+        Write data lines to a stream instead of a file.
+
+        Args:
+            lines: (iterable) data lines
+            chunk_size: (int) the size of each piece
+
+        Returns:
+            (iterable) pieces of the file
+        """
+        # No data.
+        return []
+
 
 class CSVWriter(DataWriter):
     """
@@ -68,6 +131,7 @@ class CSVWriter(DataWriter):
     name = "csv"
     file_ext = "csv"
     binary = False
+    streamable = True
 
     def __init__(self, filename=None):
         """
@@ -114,6 +178,20 @@ class CSVWriter(DataWriter):
 
         self.data_file.close()
 
+    @classmethod
+    def stream(cls, lines, chunk_size=65536):
+        """
+        Write data lines to a stream instead of a file.
+
+        Args:
+            lines: (iterable) data lines
+            chunk_size: (int) the size of each piece
+
+        Returns:
+            (generator) pieces of the file
+        """
+        return stream_csv(lines, chunk_size)
+
 
 class CSVWindowsWriter(DataWriter):
     """
@@ -123,6 +201,7 @@ class CSVWindowsWriter(DataWriter):
     name = "csv (For Windows)"
     file_ext = "csv"
     binary = False
+    streamable = True
 
     def __init__(self, filename=None):
         """
@@ -170,6 +249,22 @@ class CSVWindowsWriter(DataWriter):
 
         self.data_file.close()
 
+    @classmethod
+    def stream(cls, lines, chunk_size=65536):
+        """
+        Write data lines to a stream instead of a file.
+
+        Args:
+            lines: (iterable) data lines
+            chunk_size: (int) the size of each piece
+
+        Returns:
+            (generator) pieces of the file
+        """
+        yield codecs.BOM_UTF8
+        for data in stream_csv(lines, chunk_size):
+            yield data
+
 
 class XLSWriter(DataWriter):
     """
@@ -0,0 +1,120 @@
+"""
+This module writes zip archives as streams.
+
+zipfile.ZipFile needs to seek back to write files' sizes, so it can not write to
+a stream. ZipStream writes files' sizes in data descriptors after files' data
+instead, so the archive can be sent while it is being generated.
+"""
+
+import struct
+import time
+import zipfile
+import zlib
+
+
+class ZipStream(object):
+    """
+    Generate a zip archive in pieces.
+
+    Usage:
+        stream = ZipStream()
+        for data in stream.write_file("a.csv", chunks):
+            ...
+        for data in stream.close():
+            ...
+    """
+    def __init__(self, compression=zipfile.ZIP_DEFLATED):
+        """
+        Args:
+            compression: (int) ZIP_STORED or ZIP_DEFLATED
+
+        Returns:
+            None
+        """
+        self.compression = compression
+        self.entries = []
+        self.offset = 0
+
+    def write_file(self, arcname, chunks):
+        """
+        Add a file to the archive.
+
+        Args:
+            arcname: (string) file's name in the archive.
+            chunks: (iterable) file's content in pieces.
+
+        Returns:
+            (generator) pieces of the archive
+        """
+        if isinstance(arcname, unicode):
+            arcname = arcname.encode("utf-8")
+
+        date_time = time.localtime(time.time())[:6]
+        dos_time = date_time[3] << 11 | date_time[4] << 5 | (date_time[5] // 2)
+        dos_date = (date_time[0] - 1980) << 9 | date_time[1] << 5 | date_time[2]
+
+        # Bit 3 means sizes and crc are in the data descriptor.
+        flag_bits = 0x08
+        header_offset = self.offset
+
+        header = struct.pack(zipfile.structFileHeader, zipfile.stringFileHeader,
+                             20, 0, flag_bits, self.compression, dos_time, dos_date,
+                             0, 0, 0, len(arcname), 0)
+        yield self._output(header + arcname)
+
+        compressor = None
+        if self.compression == zipfile.ZIP_DEFLATED:
+            compressor = zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED, -15)
+
+        crc = 0
+        file_size = 0
+        compress_size = 0
+        for data in chunks:
+            if not data:
+                continue
+
+            crc = zlib.crc32(data, crc) & 0xffffffff
+            file_size += len(data)
+            if compressor:
+                data = compressor.compress(data)
+                if not data:
+                    continue
+            compress_size += len(data)
+            yield self._output(data)
+
+        if compressor:
+            data = compressor.flush()
+            compress_size += len(data)
+            yield self._output(data)
+
+        yield self._output(struct.pack("<4sLLL", "PK\x07\x08", crc, compress_size, file_size))
+
+        self.entries.append((arcname, flag_bits, dos_time, dos_date,
+                             crc, compress_size, file_size, header_offset))
+
+    def close(self):
+        """
+        Finish the archive.
+
+        Returns:
+            (generator) pieces of the archive
+        """
+        directory_offset = self.offset
+        for arcname, flag_bits, dos_time, dos_date, crc, compress_size, file_size, header_offset in self.entries:
+            header = struct.pack(zipfile.structCentralDir, zipfile.stringCentralDir,
+                                 20, 3, 20, 0, flag_bits, self.compression, dos_time, dos_date,
+                                 crc, compress_size, file_size, len(arcname), 0, 0, 0, 0,
+                                 0600 << 16, header_offset)
+            yield self._output(header + arcname)
+
+        directory_size = self.offset - directory_offset
+        yield self._output(struct.pack(zipfile.structEndArchive, zipfile.stringEndArchive,
+                                       0, 0, len(self.entries), len(self.entries),
+                                       directory_size, directory_offset, 0))
+
+    def _output(self, data):
+        """
+        Count the size of the output.
+        """
+        self.offset += len(data)
+        return data
@@ -5,12 +5,14 @@ Client Data Handler
 var data_handler = {
     character_dbref: "",
     character_name: "",
+    character_status: {},
     current_target: "",
     name_list: {},
     skill_cd_time: {},
     dialogue_target: "",
     dialogues_list: [],
     shop_data: {},
+    message_keys: {},
 
     getEscapes: function() {
         return {"$PLAYER_NAME": this.character_name};
@@ -13,16 +13,20 @@ var map = {
 
     _current_location: null,
 
+    _version: "",       // the version of the map, used to request map's changes
+
     clearData: function() {
         this._map_rooms = {};
         this._map_exits = {};
         this._map_paths = {};
+        this._version = "";
     },
 
     setData: function(data) {
         // set map data
         this._map_rooms = data.rooms;
         this._map_exits = data.exits;
+        this._map_paths = {};
 
         for (var exit in data.exits) {
             var location = data.exits[exit][0];
@@ -34,6 +38,50 @@ var map = {
                 this._map_paths[location] = [destination];
             }
         }
+
+        this.setVersion(data.version);
+    },
+
+    setVersion: function(version) {
+        // set map's version and cache the map
+        if (!version) {
+            return;
+        }
+
+        this._version = version;
+
+        try {
+            var cache = {"version": this._version,
+                         "rooms": this._map_rooms,
+                         "exits": this._map_exits};
+            localStorage.setItem(this.getCacheKey(), JSON.stringify(cache));
+        }
+        catch(error) {
+            // Can not use the local storage.
+        }
+    },
+
+    getCacheKey: function() {
+        return "map_" + data_handler.character_dbref;
+    },
+
+    checkVersion: function(version) {
+        // load the cached map and request changes if it is out of date
+        if (!this._version) {
+            try {
+                var cache = JSON.parse(localStorage.getItem(this.getCacheKey()));
+                if (cache) {
+                    this.setData(cache);
+                }
+            }
+            catch(error) {
+                // Can not use the local storage.
+            }
+        }
+
+        if (this._version != version) {
+            Evennia.msg("text", commands.cmdString("revealed_map", this._version));
+        }
     },
 
     setCurrentLocation: function(location) {
@@ -69,6 +117,8 @@ var map = {
                 }
             }
         }
+
+        this.setVersion(data.version);
     },
 
     showMap: function() {
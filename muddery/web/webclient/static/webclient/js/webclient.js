@@ -21,6 +21,10 @@ var webclient = {
                     // Json object.
                     data = decode;
                 }
+                else if (type == "[object Array]" && decode.length == 4 && decode[0] == "~") {
+                    // Compact message.
+                    data = this.expandCompact(decode);
+                }
                 else if (type == "[object String]") {
                     // String
                     data = {"msg": decode};
@@ -54,6 +58,46 @@ var webclient = {
         this.displayData(data);
     },
 
+    // expand a compact message: ["~", <position of new names>, [<new names>], <data>]
+    expandCompact : function(message) {
+        var start = message[1];
+        var names = message[2];
+        for (var i = 0; i < names.length; i++) {
+            data_handler.message_keys[(start + i).toString(36)] = names[i];
+        }
+
+        return this.expandKeys(message[3]);
+    },
+
+    // replace keys' ids with their names
+    expandKeys : function(data) {
+        var type = Object.prototype.toString.call(data);
+        if (type == "[object Array]") {
+            var list = [];
+            for (var i = 0; i < data.length; i++) {
+                list.push(this.expandKeys(data[i]));
+            }
+            return list;
+        }
+        else if (type == "[object Object]") {
+            var obj = {};
+            for (var key in data) {
+                var name = key;
+                if (key.charAt(0) == "~") {
+                    // A marked name.
+                    name = key.substring(1);
+                }
+                else if (data_handler.message_keys.hasOwnProperty(key)) {
+                    name = data_handler.message_keys[key];
+                }
+                obj[name] = this.expandKeys(data[key]);
+            }
+            return obj;
+        }
+
+        return data;
+    },
+
     // display all kinds of data
     displayData : function(data) {
         for (var key in data) {
@@ -106,6 +150,9 @@ var webclient = {
                 else if (key == "status") {
                     this.displayStatus(data[key]);
                 }
+                else if (key == "status_delta") {
+                    this.displayStatusDelta(data[key]);
+                }
                 else if (key == "equipments") {
                     this.displayEquipments(data[key]);
                 }
@@ -150,6 +197,11 @@ var webclient = {
                 else if (key == "skill_result") {
                     this.displaySkillResult(data[key]);
                 }
+                else if (key == "skill_results") {
+                    for (var i in data[key]) {
+                        this.displaySkillResult(data[key][i]);
+                    }
+                }
                 else if (key == "get_exp") {
                     this.displayGetExp(data[key])
                 }
@@ -162,6 +214,9 @@ var webclient = {
                 else if (key == "revealed_map") {
                     map.setData(data[key]);
                 }
+                else if (key == "map_version") {
+                    map.checkVersion(data[key]);
+                }
                 else if (key == "login") {
                     this.onLogin(data[key]);
                 }
@@ -687,7 +742,14 @@ var webclient = {
         }
     },
 
+    displayStatusDelta : function(data) {
+        // only changed fields are sent, merge them into the last status
+        this.displayStatus($.extend({}, data_handler.character_status, data));
+    },
+
     displayStatus : function(data) {
+        data_handler.character_status = data;
+
         // refresh prompt bar
         var bar = $("#prompt_bar");
         var prompt = $("<div>");
@@ -1021,6 +1083,10 @@ var webclient = {
     },
     
     onConnectionOpen: function() {
+        // ask for compact messages
+        data_handler.message_keys = {};
+        Evennia.msg("client_options", [], {"compact": true});
+
         $("#msg_wnd").empty();
         $("#prompt_bar").empty();
         webclient.showUnloginTabs();
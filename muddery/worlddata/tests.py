@@ -1,7 +1,14 @@
+import os
+import tempfile
+import zipfile
+from cStringIO import StringIO
 from django.test import TestCase
 from django.test.client import Client
 from django.conf import settings
 from django.contrib import auth
+from django.apps import apps
+from muddery.utils import importer, exporter
+from muddery.utils.world_data_handler import WorldDataHandler
 
 class TestEditor(TestCase):
 
@@ -210,3 +217,68 @@ class TestEditor(TestCase):
         
         response = self.client.get('/worlddata/editor/localization/localized_strings/form.html')
         self.failUnlessEqual(response.status_code, 200)
+
+
+class TestImporter(TestCase):
+
+    def test_import_file(self):
+        lines = ["key,name,typeclass,desc,position,background,id",
+                 "room_1,Room 1,CLASS_ROOM,,,,1",
+                 "room_2,Room 2,CLASS_ROOM,,\"(1,2)\",,",
+                 "room_1,Room 3,CLASS_ROOM,,,,",
+                 "room_4,Room 4,CLASS_ROOM,,,,"]
+
+        handle, file_name = tempfile.mkstemp(suffix=".csv")
+        os.write(handle, "\n".join(lines))
+        os.close(handle)
+
+        try:
+            imported = importer.import_file(file_name, settings.WORLD_ROOMS, widecard=False, batch_size=2)
+        finally:
+            os.remove(file_name)
+
+        self.assertTrue(imported)
+        model_obj = apps.get_model(settings.WORLD_DATA_APP, settings.WORLD_ROOMS)
+        self.assertEqual(sorted(model_obj.objects.values_list("key", "name")),
+                         [("room_1", "Room 1"), ("room_2", "Room 2"), ("room_4", "Room 4")])
+
+    def test_bundle(self):
+        model_obj = apps.get_model(settings.WORLD_DATA_APP, settings.WORLD_ROOMS)
+        model_obj.objects.create(key="room_1", name=u"\u623f\u95f4", typeclass="CLASS_ROOM", position="(1,2)")
+        model_obj.objects.create(key="room_2", name="Room 2", typeclass="CLASS_ROOM")
+
+        handle, file_name = tempfile.mkstemp(suffix=".bundle")
+        os.close(handle)
+
+        try:
+            exporter.export_bundle(file_name, [settings.WORLD_ROOMS, settings.GAME_SETTINGS])
+
+            handler = WorldDataHandler()
+            handler.reload(file_name)
+            record = handler.get(settings.WORLD_ROOMS, "room_1")
+            self.assertEqual(record.name, u"\u623f\u95f4")
+            self.assertEqual(record.position, "(1,2)")
+
+            model_obj.objects.all().delete()
+            imported = importer.import_bundle(file_name)
+        finally:
+            os.remove(file_name)
+
+        self.assertEqual(imported, [settings.WORLD_ROOMS, settings.GAME_SETTINGS])
+        self.assertEqual(sorted(model_obj.objects.values_list("key", "name")),
+                         [("room_1", u"\u623f\u95f4"), ("room_2", "Room 2")])
+
+
+class TestExporter(TestCase):
+
+    def test_stream_zip_all(self):
+        model_obj = apps.get_model(settings.WORLD_DATA_APP, settings.WORLD_ROOMS)
+        model_obj.objects.create(key="room_1", name=u"\u623f\u95f4", typeclass="CLASS_ROOM")
+
+        data = "".join(exporter.stream_zip_all("csv", chunk_size=1024))
+        archive = zipfile.ZipFile(StringIO(data))
+        self.assertEqual(archive.testzip(), None)
+
+        lines = archive.read(settings.WORLD_ROOMS + ".csv").splitlines()
+        self.assertEqual(lines[0], "id,key,typeclass,name,desc,position,background")
+        self.assertTrue(lines[1].endswith(",room_1,CLASS_ROOM,\xe6\x88\xbf\xe9\x97\xb4,,,"))
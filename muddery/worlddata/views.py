@@ -18,7 +18,7 @@ from muddery.utils import exporter
 from muddery.utils import importer
 from muddery.utils import readers
 from muddery.utils import writers
-from muddery.utils.builder import build_all
+from muddery.utils.builder import build_all, refresh_world
 from muddery.utils.localized_strings_handler import LS, LOCALIZED_STRINGS_HANDLER
 from muddery.utils.game_settings import CLIENT_SETTINGS
 from muddery.worlddata.editor import page_view
@@ -90,6 +90,21 @@ def export_game_data(request):
     response = http.HttpResponseNotModified()
     file_type = request.GET.get("file_type", None)
 
+    writer_class = writers.get_writer(file_type or "csv")
+    if writer_class and writer_class.streamable:
+        # generate the zip while sending it
+        try:
+            filename = time.strftime("worlddata_%Y%m%d_%H%M%S.zip", time.localtime())
+            response = http.StreamingHttpResponse(exporter.stream_zip_all(file_type))
+            response['Content-Type'] = 'application/octet-stream'
+            response['Content-Disposition'] = 'attachment;filename="%s"' % filename
+        except Exception, e:
+            message = "Can't export game data: %s" % e
+            logger.log_tracemsg(message)
+            return render(request, 'fail.html', {"message": message})
+
+        return response
+
     # get data's zip
     zipfile = None
     try:
@@ -128,6 +143,20 @@ def export_data_single(request):
     if not writer_class:
         return render(request, 'fail.html', {"message": "Can not export this type of file."})
 
+    if writer_class.streamable:
+        # write the file while sending it
+        try:
+            filename = model_name + "." + writer_class.file_ext
+            response = http.StreamingHttpResponse(exporter.stream_file(model_name, file_type))
+            response['Content-Type'] = 'application/octet-stream'
+            response['Content-Disposition'] = 'attachment;filename="%s"' % filename
+        except Exception, e:
+            message = "Can't export game data: %s" % e
+            logger.log_tracemsg(message)
+            return render(request, 'fail.html', {"message": message})
+
+        return response
+
     # Get tempfile's name.
     temp_name = tempfile.mktemp()
     temp_file = None
@@ -311,14 +340,22 @@ def apply_changes(request):
         # rebuild the world
         build_all()
 
-        # send client settings
-        CLIENT_SETTINGS.reset()
-        text = json.dumps({"settings": CLIENT_SETTINGS.all_values()})
-        SESSIONS.announce_all(text)
+        if settings.HOT_APPLY_WORLD_CHANGES:
+            # apply changes to the running server
+            refresh_world()
 
-        # restart the server
-        SESSIONS.announce_all(" Server restarting ...")
-        SESSIONS.server.shutdown(mode='reload')
+            # send client settings
+            text = json.dumps({"settings": CLIENT_SETTINGS.all_values()})
+            SESSIONS.announce_all(text)
+        else:
+            # send client settings
+            CLIENT_SETTINGS.reset()
+            text = json.dumps({"settings": CLIENT_SETTINGS.all_values()})
+            SESSIONS.announce_all(text)
+
+            # restart the server
+            SESSIONS.announce_all(" Server restarting ...")
+            SESSIONS.server.shutdown(mode='reload')
     except Exception, e:
         message = "Can't build world: %s" % e
         logger.log_tracemsg(message)